@@ -288,7 +288,7 @@ class Base1DNeuronAnalyzer(BaseNeuronAnalyzer):
                     print(f'SymPy solve derivative of "{self.x_eq_group.func_name}'
                           f'({argument})" by "{x_var}", ', end='')
                     x_eq = x_eq.expr
-                    f = utils.timeout(time_out)(lambda: sympy.diff(x_eq, x_symbol))
+                    f = utils.timeout(time_out)(lambda: sympy_analysis.cached_diff(x_eq, x_symbol))
                     dfxdx_expr = f()
 
                     # check
@@ -352,7 +352,7 @@ class Base1DNeuronAnalyzer(BaseNeuronAnalyzer):
 
                     # solver
                     f = utils.timeout(timeout_len)(
-                        lambda: sympy.solve(x_eq.expr, sympy.Symbol(self.x_var, real=True)))
+                        lambda: sympy_analysis.cached_solve(x_eq.expr, sympy.Symbol(self.x_var, real=True)))
                     results = f()
                     for res in results:
                         all_vars = set(scope.keys())
@@ -532,7 +532,7 @@ class Base2DNeuronAnalyzer(Base1DNeuronAnalyzer):
                     print(f'SymPy solve derivative of "{self.x_eq_group.func_name}'
                           f'({argument})" by "{y_var}", ', end='')
                     x_eq = x_eq.expr
-                    f = utils.timeout(time_out)(lambda: sympy.diff(x_eq, y_symbol))
+                    f = utils.timeout(time_out)(lambda: sympy_analysis.cached_diff(x_eq, y_symbol))
                     dfxdy_expr = f()
 
                     # check
@@ -595,7 +595,7 @@ class Base2DNeuronAnalyzer(Base1DNeuronAnalyzer):
                     print(f'SymPy solve derivative of "{self.y_eq_group.func_name}'
                           f'({argument})" by "{x_var}", ', end='')
                     y_eq = y_eq.expr
-                    f = utils.timeout(time_out)(lambda: sympy.diff(y_eq, x_symbol))
+                    f = utils.timeout(time_out)(lambda: sympy_analysis.cached_diff(y_eq, x_symbol))
                     dfydx_expr = f()
 
                     # check
@@ -659,7 +659,7 @@ class Base2DNeuronAnalyzer(Base1DNeuronAnalyzer):
                     print(f'SymPy solve derivative of "{self.y_eq_group.func_name}'
                           f'({argument})" by "{y_var}", ', end='')
                     y_eq = y_eq.expr
-                    f = utils.timeout(time_out)(lambda: sympy.diff(y_eq, y_symbol))
+                    f = utils.timeout(time_out)(lambda: sympy_analysis.cached_diff(y_eq, y_symbol))
                     dfydx_expr = f()
 
                     # check
@@ -1059,7 +1059,7 @@ class Base2DNeuronAnalyzer(Base1DNeuronAnalyzer):
                           f'{",".join(self.dvar_names[2:] + self.dpar_names)})", ',
                           end='')
                     # solve the expression
-                    f = utils.timeout(timeout_len)(lambda: sympy.solve(y_eq, y_symbol))
+                    f = utils.timeout(timeout_len)(lambda: sympy_analysis.cached_solve(y_eq, y_symbol))
                     y_by_x_in_y_eq = f()
                     if len(y_by_x_in_y_eq) > 1:
                         raise NotImplementedError('Do not support multiple values.')
@@ -1134,7 +1134,7 @@ class Base2DNeuronAnalyzer(Base1DNeuronAnalyzer):
                           end='')
 
                     # solve the expression
-                    f = utils.timeout(timeout_len)(lambda: sympy.solve(x_eq, y_symbol))
+                    f = utils.timeout(timeout_len)(lambda: sympy_analysis.cached_solve(x_eq, y_symbol))
                     y_by_x_in_x_eq = f()
                     if len(y_by_x_in_x_eq) > 1:
                         raise NotImplementedError('Do not support multiple values.')
@@ -1206,7 +1206,7 @@ class Base2DNeuronAnalyzer(Base1DNeuronAnalyzer):
                           f'"{self.x_var} = f({",".join(self.dvar_names[1:] + self.dpar_names)})", ',
                           end='')
                     # solve the expression
-                    f = utils.timeout(timeout_len)(lambda: sympy.solve(y_eq, x_symbol))
+                    f = utils.timeout(timeout_len)(lambda: sympy_analysis.cached_solve(y_eq, x_symbol))
                     x_by_y_in_y_eq = f()
                     if len(x_by_y_in_y_eq) > 1:
                         raise NotImplementedError('Do not support multiple values.')
@@ -1279,7 +1279,7 @@ class Base2DNeuronAnalyzer(Base1DNeuronAnalyzer):
                           f'"{self.x_var} = f({",".join(self.dvar_names[1:] + self.dpar_names)})", ',
                           end='')
                     # solve the expression
-                    f = utils.timeout(timeout_len)(lambda: sympy.solve(x_eq, x_symbol))
+                    f = utils.timeout(timeout_len)(lambda: sympy_analysis.cached_solve(x_eq, x_symbol))
                     x_by_y_in_x_eq = f()
                     if len(x_by_y_in_x_eq) > 1:
                         raise NotImplementedError('Do not support multiple values.')
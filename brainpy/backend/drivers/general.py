@@ -5,6 +5,7 @@ from pprint import pprint
 from brainpy import backend
 from brainpy import errors
 from brainpy.backend import ops
+from brainpy.integrators.sde import noise
 from brainpy.simulation import drivers
 from . import utils
 
@@ -170,6 +171,9 @@ class GeneralNodeDriver(drivers.BaseNodeDriver):
                 setattr(self.host.mon, var, ops.vstack([data, append]))
 
     def get_steps_func(self, show_code=False):
+        # the SDE integrators of the node draw from their own noise buffers
+        noise.node_buffers(self.host, bind=True)
+
         for func_name, step in self.steps.items():
             class_args, arguments = utils.get_args(step)
             host_name = self.host.name
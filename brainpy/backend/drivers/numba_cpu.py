@@ -10,6 +10,7 @@ from brainpy import backend
 from brainpy import errors
 from brainpy import tools
 from brainpy.integrators import constants as diffint_cons
+from brainpy.integrators.sde import noise
 from brainpy.simulation import delays
 from brainpy.simulation import drivers
 from . import utils
@@ -84,6 +85,8 @@ class NumbaCpuDiffIntDriver(drivers.BaseDiffIntDriver):
         if not has_jitted:
             if self.func_name.startswith(diffint_cons.ODE_PREFIX):
                 self.code_scope['f'] = numba.jit(**get_numba_profile())(self.code_scope['f'])
+            elif self.func_name.startswith(diffint_cons.DDE_PREFIX):
+                self.code_scope['f'] = numba.jit(**get_numba_profile())(self.code_scope['f'])
             elif self.func_name.startswith(diffint_cons.SDE_PREFIX):
                 self.code_scope['f'] = numba.jit(**get_numba_profile())(self.code_scope['f'])
                 self.code_scope['g'] = numba.jit(**get_numba_profile())(self.code_scope['g'])
@@ -284,6 +287,59 @@ class _CPUReader(ast.NodeVisitor):
                                             rep_call=rep_expression,
                                             data_need_pass=data_need_pass)
 
+        # TASK 2 : extract event delay push and pull
+        # ------
+        # Replace the "push" by the call of the jitted push kernel,
+        # and the "pull" by the slicing of the current event bucket.
+        # The events overflowing the queues are pushed by the
+        # "update()" of the delay, which is called in Python.
+        # ------
+
+        elif calls[-1] in ['push', 'pull'] and isinstance(obj, delays.EventDelay) and callable(obj_func):
+            dvar4call = '.'.join(calls[0:-1])
+            if calls[-1] == 'push':
+                if len(args) + len(kw_args) != 1:
+                    raise errors.CodeError(f'Cannot analyze the code: \n\n'
+                                           f'{tools.ast2code(ast.fix_missing_locations(node))}')
+                spike = kw_args['spike'] if len(args) == 0 else args[0]
+                data_need_pass = [f'{dvar4call}.push_kernel', f'{dvar4call}.queue',
+                                  f'{dvar4call}.queue_len', f'{dvar4call}.cursor',
+                                  f'{dvar4call}.delay_step', f'{dvar4call}.pre_indptr',
+                                  f'{dvar4call}.pre_syn_ids', f'{dvar4call}.pending',
+                                  f'{dvar4call}.pending_spike']
+                rep_expression = f'{data_need_pass[0]}({", ".join(data_need_pass[1:])}, {spike})'
+            else:
+                if len(args) + len(kw_args) != 0:
+                    raise errors.CodeError(f'Cannot analyze the code: \n\n'
+                                           f'{tools.ast2code(ast.fix_missing_locations(node))}')
+                data_need_pass = [f'{dvar4call}.queue', f'{dvar4call}.queue_len', f'{dvar4call}.cursor']
+                rep_expression = f'{dvar4call}.queue[{dvar4call}.cursor, ' \
+                                 f':{dvar4call}.queue_len[{dvar4call}.cursor]]'
+
+            org_call = tools.ast2code(ast.fix_missing_locations(node))
+            self.visited_calls[node] = dict(type=calls[-1],
+                                            org_call=org_call,
+                                            rep_call=rep_expression,
+                                            data_need_pass=data_need_pass)
+
+        # TASK 3 : pass the noise buffer into the SDE integrator
+        # ------
+        # Append the arrays of the noise buffer of the node
+        # (such as "self.int_V_noise") to the integrator call.
+        # ------
+
+        elif getattr(obj_func, 'noise_buffer', False) and \
+                isinstance(getattr(obj, f'{calls[-1]}_noise', None), noise.WienerBuffer):
+            buffer4call = '.'.join(calls) + '_noise'
+            data_need_pass = [f'{buffer4call}.key', f'{buffer4call}.block', f'{buffer4call}.state']
+            org_call = tools.ast2code(ast.fix_missing_locations(node))
+            noise_args = [f'{arg}={data}' for arg, data in zip(noise.NOISE_ARGS, data_need_pass)]
+            rep_expression = f'{org_call[:-1]}, {", ".join(noise_args)})'
+            self.visited_calls[node] = dict(type='noise',
+                                            org_call=org_call,
+                                            rep_call=rep_expression,
+                                            data_need_pass=data_need_pass)
+
         self.generic_visit(node)
 
     def visit_If(self, node, level=0):
@@ -600,6 +656,9 @@ def _class2func(cls_func, host, func_name=None, show_code=False):
 
 class NumbaCPUNodeDriver(GeneralNodeDriver):
     def get_steps_func(self, show_code=False):
+        # the noise buffers of the SDE integrators, which are passed into the steps
+        noise.node_buffers(self.host)
+
         for func_name, step in self.steps.items():
             if hasattr(step, '__self__'):
                 host = step.__self__
@@ -607,6 +666,15 @@ class NumbaCPUNodeDriver(GeneralNodeDriver):
                 host = self.host
             assert hasattr(host, 'name')
 
+            # the event queues grow in Python
+            if isinstance(host, delays.EventDelay) and step == host.update:
+                self.formatted_funcs[func_name] = {
+                    'func': step,
+                    'scope': {host.name: host},
+                    'call': [f'{host.name}.update()']
+                }
+                continue
+
             func, calls, assigns = _class2func(cls_func=step, host=host, func_name=func_name, show_code=show_code)
             setattr(host, f'new_{func_name}', func)
 
@@ -21,7 +21,11 @@ def set_seed(seed):
 # necessary ops for integrators
 
 def normal(loc, scale, size):
-    return loc + scale * random.normal(key, shape=size)
+    # split the key at each call, so that the
+    # following calls get the different numbers
+    global key
+    key, subkey = random.split(key)
+    return loc + scale * random.normal(subkey, shape=size)
 
 
 exp = numpy.exp
@@ -2,6 +2,8 @@
 
 import numpy as np
 
+from brainpy.tools import rng
+
 __all__ = [
     'normal',
     'shape',
@@ -26,8 +28,17 @@ __all__ = [
     'float64'
 ]
 
+
 # necessary ops for integrators
-normal = np.random.normal
+
+def normal(loc=0.0, scale=1.0, size=None):
+    # drawn from the shared counter-based random stream under the seed set by
+    # "brainpy.tools.set_seed()", otherwise, from the NumPy random state
+    if rng.get_seed() is None:
+        return np.random.normal(loc, scale, size)
+    return rng.get_stream('global', 'ops.normal').normal(loc, scale, size)
+
+
 sum = np.sum
 shape = np.shape
 exp = np.exp
@@ -6,6 +6,7 @@ import numpy as np
 
 from brainpy import backend
 from brainpy import errors
+from brainpy import tools
 from brainpy.backend import ops
 from brainpy.simulation import NeuGroup
 from brainpy.simulation import size2len
@@ -281,12 +282,12 @@ class PoissonInput(NeuGroup):
         self.t_last_spike = -1e7 * ops.ones(self.num)
 
         if backend.get_backend_name() == 'numba-cuda':
-            super(PoissonInput, self).__init__(steps={'update': self.numba_cuda_update}, **kwargs)
+            super(PoissonInput, self).__init__(size=size, steps=self.numba_cuda_update, **kwargs)
         else:
-            super(PoissonInput, self).__init__(steps={'update': self.non_numba_cuda_update}, **kwargs)
+            super(PoissonInput, self).__init__(size=size, steps=self.non_numba_cuda_update, **kwargs)
 
     def non_numba_cuda_update(self, _t):
-        self.spike = np.random.random(self.num) <= self.freqs * self.dt
+        self.spike = tools.stream_uniforms(self.rng_key, self.rng_counter, self.num) <= self.freqs * self.dt
         self.t_last_spike = np.where(self.spike, _t, self.t_last_spike)
 
     def numba_cuda_update(self, _t):
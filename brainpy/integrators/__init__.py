@@ -5,6 +5,10 @@ from . import fde
 from . import ode
 from . import sde
 from .ast_analysis import *
+from .caching import *
 from .constants import *
 from .delay_vars import *
 from .integrate_wrapper import *
+from .joint_eq import *
+from .optimization import *
+from .tables import *
@@ -0,0 +1,483 @@
+# -*- coding: utf-8 -*-
+
+"""
+The cache of the generated integrators.
+
+An integrator is determined by the derivative function (its byte code,
+default arguments, and the values of the closure and global variables
+it uses), the numerical method, the method settings (such as ``dt``
+and ``var_type``), and the backend. The integrators generated from the
+same determinants are reused from the memory cache, instead of being
+generated, compiled and JIT compiled again. Optionally, the generated
+code can also be cached in the disk, so that it is reused by the
+following Python processes.
+
+The values of the variables used by the derivative function are
+compared by value if they are the numbers, strings, modules, or the
+importable functions. The functions using the other values (such as
+the arrays, or the bound methods of the model objects) are not cached,
+since keeping them in the cache would keep the objects alive forever,
+while they could never be hit by the other objects. The integrators
+with the lookup tables are keyed by the derivative function and the
+table ranges, and are only cached in the memory.
+
+The symbolic derivations by SymPy (such as the linear parts of the
+exponential Euler method, and the derivatives and the solutions in the
+dynamics analysis) are cached separately. They are the pure functions of
+the expression strings, and are cached in the disk by default, keyed by
+the normalized expression strings, the format of the results, and the
+versions of BrainPy and SymPy.
+"""
+
+import hashlib
+import json
+import marshal
+import os
+import pickle
+import sys
+import types
+
+import numpy as np
+
+from brainpy import backend
+from brainpy.integrators import joint_eq
+from brainpy.integrators import optimization
+from brainpy.integrators import tables
+
+__all__ = [
+    'set_integrator_cache',
+    'get_integrator_cache',
+    'clear_integrator_cache',
+
+    'set_sympy_cache',
+    'clear_sympy_cache',
+    'cached_derivation',
+]
+
+_MEMORY_CACHE = {}
+# the version of the generated code in the disk cache, which should be
+# increased once the generated code (such as its arguments) is changed
+_CODE_FORMAT = 1
+_RECORDS = []
+_OPTIMIZE = []
+_SETTINGS = {
+    'memory': True,
+    'disk': False,
+    'directory': os.path.join(os.path.expanduser('~'), '.brainpy', 'integrators'),
+}
+
+_SYMPY_CACHE = {}
+# the version of the derivation results, which should be increased
+# once the generated code (such as by "sympy2str") is changed
+_DERIVATION_FORMAT = 1
+_SYMPY_SETTINGS = {
+    'disk': True,
+    'directory': os.path.join(os.path.expanduser('~'), '.brainpy', 'sympy'),
+}
+
+_CONSTANT_TYPES = (type(None), bool, int, float, complex, str, bytes)
+
+
+def set_integrator_cache(memory=None, disk=None, directory=None):
+    """Set the cache of the generated integrators.
+
+    Parameters
+    ----------
+    memory : bool, optional
+        Whether to reuse the integrators generated in this process.
+    disk : bool, optional
+        Whether to save and reuse the generated code in the disk.
+    directory : str, optional
+        The directory of the disk cache.
+    """
+    if memory is not None:
+        _SETTINGS['memory'] = memory
+    if disk is not None:
+        _SETTINGS['disk'] = disk
+    if directory is not None:
+        _SETTINGS['directory'] = directory
+
+
+def get_integrator_cache():
+    """Get the settings of the integrator cache.
+
+    Returns
+    -------
+    settings : dict
+        The settings of "memory", "disk" and "directory".
+    """
+    return dict(_SETTINGS)
+
+
+def clear_integrator_cache(disk=False):
+    """Clear the cache of the generated integrators.
+
+    Parameters
+    ----------
+    disk : bool
+        Whether to also remove the cache files in the disk.
+    """
+    _MEMORY_CACHE.clear()
+    directory = _SETTINGS['directory']
+    if disk and os.path.isdir(directory):
+        for filename in os.listdir(directory):
+            if filename.endswith('.pkl'):
+                os.remove(os.path.join(directory, filename))
+
+
+# key of the integrator
+# ---------------------
+
+class _Uncacheable(Exception):
+    pass
+
+
+class _KeyState(object):
+    def __init__(self):
+        self.visiting = set()
+
+
+def _import_path(value):
+    # the (module, qualified name) path of the importable object
+    module = 'numpy' if isinstance(value, np.ufunc) else getattr(value, '__module__', None)
+    name = getattr(value, '__qualname__', None) or getattr(value, '__name__', None)
+    if not isinstance(module, str) or not isinstance(name, str) or '<' in name:
+        return None
+    if module not in sys.modules:
+        return None
+    target = sys.modules[module]
+    for attr in name.split('.'):
+        target = getattr(target, attr, None)
+    return (module, name) if target is value else None
+
+
+def _code_names(code):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names.update(_code_names(const))
+    return names
+
+
+def _func_key(f, state):
+    if id(f) in state.visiting:
+        return 'recursive', f.__qualname__
+    state.visiting.add(id(f))
+    code = f.__code__
+    code_hash = hashlib.sha1(marshal.dumps(code)).hexdigest()
+    # the closure variables
+    nonlocals = []
+    for name, cell in zip(code.co_freevars, f.__closure__ or ()):
+        try:
+            nonlocals.append((name, _value_key(cell.cell_contents, state)))
+        except ValueError:  # the empty cell
+            raise _Uncacheable
+    # the global variables
+    globals_ = [(name, _value_key(f.__globals__[name], state))
+                for name in sorted(_code_names(code)) if name in f.__globals__]
+    defaults = _value_key(f.__defaults__, state)
+    kwdefaults = _value_key(f.__kwdefaults__, state)
+    state.visiting.remove(id(f))
+    return code_hash, tuple(nonlocals), tuple(globals_), defaults, kwdefaults
+
+
+def _value_key(value, state):
+    if isinstance(value, _CONSTANT_TYPES):
+        return type(value).__name__, value
+    if isinstance(value, np.generic) and value.ndim == 0:
+        return 'numpy', str(value.dtype), value.item()
+    if isinstance(value, tuple):
+        return 'tuple', tuple(_value_key(v, state) for v in value)
+    if isinstance(value, dict):
+        return 'dict', tuple((_value_key(k, state), _value_key(v, state))
+                             for k, v in sorted(value.items(), key=lambda kv: repr(kv[0])))
+    if isinstance(value, types.ModuleType):
+        return 'module', value.__name__
+    if isinstance(value, types.FunctionType):
+        return 'function', _func_key(value, state)
+    if isinstance(value, types.MethodType):
+        return 'method', _value_key(value.__func__, state), _value_key(value.__self__, state)
+    if hasattr(value, 'py_func') and isinstance(value.py_func, types.FunctionType):
+        # the JIT compiled function
+        return 'jit', type(value).__name__, _func_key(value.py_func, state)
+    path = _import_path(value)
+    if path is not None:
+        return ('import',) + path
+    # the values compared by the identity are not cached
+    raise _Uncacheable
+
+
+def _integrator_key(f, module, method, kwargs):
+    state = _KeyState()
+    try:
+        key = (module.__name__, method, backend.get_backend_name(), _CODE_FORMAT,
+               _value_key(f, state), _value_key(kwargs, state))
+    except _Uncacheable:
+        return None, state
+    return key, state
+
+
+# disk cache
+# ----------
+
+def _dump(value, refs):
+    for name, ref in refs.items():
+        if value is ref:
+            return 'ref', name
+    if isinstance(value, _CONSTANT_TYPES):
+        return 'constant', value
+    if isinstance(value, np.generic) and value.ndim == 0:
+        return 'constant', value
+    if isinstance(value, (tuple, list)):
+        return type(value).__name__, [_dump(v, refs) for v in value]
+    if isinstance(value, dict):
+        return 'dict', [(k, _dump(v, refs)) for k, v in value.items()]
+    if isinstance(value, types.ModuleType):
+        return 'module', value.__name__
+    path = _import_path(value)
+    if path is not None:
+        return ('import',) + path
+    raise _Uncacheable
+
+
+def _load(data, refs):
+    kind = data[0]
+    if kind == 'ref':
+        return refs[data[1]]
+    if kind == 'constant':
+        return data[1]
+    if kind == 'tuple':
+        return tuple(_load(v, refs) for v in data[1])
+    if kind == 'list':
+        return [_load(v, refs) for v in data[1]]
+    if kind == 'dict':
+        return {k: _load(v, refs) for k, v in data[1]}
+    if kind == 'module':
+        if data[1] not in sys.modules:
+            raise _Uncacheable
+        return sys.modules[data[1]]
+    if kind == 'import':
+        module, name = data[1], data[2]
+        if module not in sys.modules:
+            raise _Uncacheable
+        target = sys.modules[module]
+        for attr in name.split('.'):
+            target = getattr(target, attr)
+        return target
+    raise _Uncacheable
+
+
+def _disk_path(key):
+    key_hash = hashlib.sha1(repr(key).encode()).hexdigest()
+    return os.path.join(_SETTINGS['directory'], f'{key_hash}.pkl')
+
+
+def _disk_save(path, record, refs):
+    try:
+        data = dict(code_lines=list(record['code_lines']),
+                    code_scope=_dump(record['code_scope'], refs),
+                    func_name=record['func_name'],
+                    uploads=_dump(record['uploads'], refs))
+    except _Uncacheable:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        pickle.dump(data, f)
+
+
+def _disk_load(path, refs):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        code_scope = _load(data['code_scope'], refs)
+        uploads = _load(data['uploads'], refs)
+    except (_Uncacheable, AttributeError, EOFError, KeyError, pickle.UnpicklingError):
+        return None
+    # the cached code has been optimized
+    _OPTIMIZE.append(False)
+    try:
+        return build(code_lines=data['code_lines'], code_scope=code_scope,
+                     func_name=data['func_name'], show_code=False, uploads=uploads)
+    finally:
+        _OPTIMIZE.pop()
+
+
+# integrator building
+# -------------------
+
+def build(code_lines, code_scope, func_name, show_code, uploads):
+    """Build the integrator from the generated code by the backend driver."""
+    if _OPTIMIZE and _OPTIMIZE[-1]:
+        code_lines, code_scope = optimization.optimize_code(code_lines, code_scope, func_name)
+    if _RECORDS:
+        _RECORDS[-1].append(dict(code_lines=code_lines, code_scope=dict(code_scope),
+                                 func_name=func_name, uploads=dict(uploads)))
+    driver_cls = backend.get_diffint_driver()
+    driver = driver_cls(code_scope=code_scope, code_lines=code_lines, func_name=func_name,
+                        show_code=show_code, uploads=uploads)
+    int_f = driver.build()
+    if joint_eq.is_joint_eq(uploads.get('origin_f', None)):
+        int_f = joint_eq.element_loop(int_f, code_lines, uploads)
+    return int_f
+
+
+def cached_integrator(integrator, f, module, method, kwargs, optimize=False, table_settings=None):
+    """Get the integrator of ``f`` from the cache, or generate it by
+    ``integrator(f, **kwargs)``. If ``optimize`` is true, the generated
+    code is optimized by :py:func:`brainpy.integrators.optimize_code`.
+    If ``table_settings`` is provided, ``f`` is tabulated by
+    :py:func:`brainpy.integrators.tabulate` before the generation."""
+    _OPTIMIZE.append(optimize)
+    try:
+        return _cached_integrator(integrator, f, module, method, kwargs, optimize, table_settings)
+    finally:
+        _OPTIMIZE.pop()
+
+
+def _build(integrator, f, kwargs, table_settings):
+    if table_settings is None:
+        return integrator(f, **kwargs)
+    f = tables.tabulate(f, tables=table_settings, show_code=kwargs.get('show_code', False))
+    int_f = integrator(f, **kwargs)
+    int_f.table_errors = f.table_errors
+    return int_f
+
+
+def _cached_integrator(integrator, f, module, method, kwargs, optimize, table_settings):
+    if kwargs.get('show_code', False) or not (_SETTINGS['memory'] or _SETTINGS['disk']):
+        return _build(integrator, f, kwargs, table_settings)
+    key_kwargs = dict(kwargs)
+    if key_kwargs.get('dt', None) is None:
+        key_kwargs['dt'] = backend.get_dt()
+    if optimize:
+        key_kwargs['optimize'] = True
+    if table_settings is not None:
+        # keyed by the original function and the table ranges,
+        # rather than the table arrays of the tabulated function
+        key_kwargs['tables'] = {var: tuple(table) for var, table in table_settings.items()}
+    key, state = _integrator_key(f, module, method, key_kwargs)
+    if key is None:
+        return _build(integrator, f, kwargs, table_settings)
+
+    # memory cache
+    if _SETTINGS['memory'] and key in _MEMORY_CACHE:
+        return _MEMORY_CACHE[key]
+
+    # disk cache, in which the table arrays are not saved
+    int_f = None
+    use_disk = _SETTINGS['disk'] and table_settings is None
+    refs = {'f': f}
+    if 'g' in kwargs:
+        refs['g'] = kwargs['g']
+    if use_disk:
+        int_f = _disk_load(_disk_path(key), refs)
+    if int_f is None:
+        _RECORDS.append([])
+        try:
+            int_f = _build(integrator, f, kwargs, table_settings)
+        finally:
+            records = _RECORDS.pop()
+        if use_disk and len(records) == 1:
+            _disk_save(_disk_path(key), records[0], refs)
+
+    if _SETTINGS['memory']:
+        _MEMORY_CACHE[key] = int_f
+    return int_f
+
+
+# symbolic derivations
+# --------------------
+
+def set_sympy_cache(disk=None, directory=None):
+    """Set the cache of the symbolic derivations.
+
+    Parameters
+    ----------
+    disk : bool, optional
+        Whether to save and reuse the derivations in the disk.
+    directory : str, optional
+        The directory of the disk cache.
+    """
+    if disk is not None:
+        _SYMPY_SETTINGS['disk'] = disk
+    if directory is not None:
+        _SYMPY_SETTINGS['directory'] = directory
+
+
+def clear_sympy_cache(disk=False):
+    """Clear the cache of the symbolic derivations.
+
+    Parameters
+    ----------
+    disk : bool
+        Whether to also remove the cache files in the disk.
+    """
+    _SYMPY_CACHE.clear()
+    directory = _SYMPY_SETTINGS['directory']
+    if disk and os.path.isdir(directory):
+        for filename in os.listdir(directory):
+            if filename.endswith('.json'):
+                os.remove(os.path.join(directory, filename))
+
+
+def _normalize(key):
+    if isinstance(key, str):
+        return ' '.join(key.split())
+    if isinstance(key, (tuple, list)):
+        return [_normalize(k) for k in key]
+    return key
+
+
+def cached_derivation(kind, key, derive):
+    """Get the result of the symbolic derivation ``derive()`` from the cache.
+
+    Parameters
+    ----------
+    kind : str
+        The kind of the derivation, such as "diff" and "solve".
+    key : tuple
+        The expression strings and the other values (numbers, strings,
+        or the lists of them) which determine the result.
+    derive : callable
+        The function to derive the result, which is a string, a number,
+        or the lists of them. The exceptions (such as the timeout) are
+        raised without caching.
+
+    Returns
+    -------
+    result : str, list
+        The derivation result.
+    """
+    import sympy
+    from brainpy import __version__
+    key = json.dumps([kind, _DERIVATION_FORMAT, __version__, sympy.__version__, _normalize(key)])
+    if key in _SYMPY_CACHE:
+        return _SYMPY_CACHE[key]
+    path = os.path.join(_SYMPY_SETTINGS['directory'],
+                        hashlib.sha1(key.encode()).hexdigest() + '.json')
+    result = None
+    if _SYMPY_SETTINGS['disk'] and os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if data['key'] == key:
+                result = data['result']
+        except (OSError, ValueError, KeyError):
+            result = None
+    if result is None:
+        result = derive()
+        if _SYMPY_SETTINGS['disk']:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # written to a temporary file first, so that the other
+                # processes never read the partially written file
+                temp = f'{path}.{os.getpid()}.tmp'
+                with open(temp, 'w') as f:
+                    json.dump({'key': key, 'result': result}, f)
+                os.replace(temp, path)
+            except OSError:
+                pass
+    _SYMPY_CACHE[key] = result
+    return result
@@ -106,5 +106,6 @@ SUPPORTED_VAR_TYPE = [
 DE_PREFIX = '_brainpy_int_of_'
 ODE_PREFIX = 'ode_brainpy_int_of_'
 SDE_PREFIX = 'sde_brainpy_int_of_'
+DDE_PREFIX = 'dde_brainpy_int_of_'
 
 
@@ -1 +1,7 @@
 # -*- coding: utf-8 -*-
+
+"""
+Numerical methods for delay differential equations.
+"""
+
+from .rk_methods import *
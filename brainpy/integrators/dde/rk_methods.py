@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+from brainpy import backend
+from brainpy.integrators import constants
+from .wrapper import rk_wrapper
+
+__all__ = [
+    'euler',
+    'midpoint',
+    'heun2',
+    'rk2',
+    'rk3',
+    'rk4',
+]
+
+
+def _base(A, B, C, f, show_code, dt, var_type, delay_vars):
+    dt = backend.get_dt() if dt is None else dt
+    show_code = False if show_code is None else show_code
+    var_type = constants.SCALAR_VAR if var_type is None else var_type
+
+    if f is None:
+        return lambda f: rk_wrapper(f=f, show_code=show_code, dt=dt, A=A, B=B, C=C,
+                                    var_type=var_type, delay_vars=delay_vars)
+    else:
+        return rk_wrapper(f=f, show_code=show_code, dt=dt, A=A, B=B, C=C,
+                          var_type=var_type, delay_vars=delay_vars)
+
+
+def euler(f=None, show_code=None, dt=None, var_type=None, delay_vars=None):
+    """The Euler method for delay differential equations.
+    """
+    A = [(), ]
+    B = [1]
+    C = [0]
+    return _base(A=A, B=B, C=C, f=f, show_code=show_code, dt=dt,
+                 var_type=var_type, delay_vars=delay_vars)
+
+
+def midpoint(f=None, show_code=None, dt=None, var_type=None, delay_vars=None):
+    """The midpoint method for delay differential equations.
+    """
+    A = [(), (0.5,)]
+    B = [0, 1]
+    C = [0, 0.5]
+    return _base(A=A, B=B, C=C, f=f, show_code=show_code, dt=dt,
+                 var_type=var_type, delay_vars=delay_vars)
+
+
+def heun2(f=None, show_code=None, dt=None, var_type=None, delay_vars=None):
+    """The Heun's method for delay differential equations.
+    """
+    A = [(), (1,)]
+    B = [0.5, 0.5]
+    C = [0, 1]
+    return _base(A=A, B=B, C=C, f=f, show_code=show_code, dt=dt,
+                 var_type=var_type, delay_vars=delay_vars)
+
+
+def rk2(f=None, show_code=None, dt=None, beta=None, var_type=None, delay_vars=None):
+    """The generic second-order Runge–Kutta method for delay differential equations.
+    """
+    beta = 2 / 3 if beta is None else beta
+    A = [(), (beta,)]
+    B = [1 - 1 / (2 * beta), 1 / (2 * beta)]
+    C = [0, beta]
+    return _base(A=A, B=B, C=C, f=f, show_code=show_code, dt=dt,
+                 var_type=var_type, delay_vars=delay_vars)
+
+
+def rk3(f=None, show_code=None, dt=None, var_type=None, delay_vars=None):
+    """The classical third-order Runge-Kutta method for delay differential equations.
+    """
+    A = [(), (0.5,), (-1, 2)]
+    B = ['1/6', '2/3', '1/6']
+    C = [0, 0.5, 1]
+    return _base(A=A, B=B, C=C, f=f, show_code=show_code, dt=dt,
+                 var_type=var_type, delay_vars=delay_vars)
+
+
+def rk4(f=None, show_code=None, dt=None, var_type=None, delay_vars=None):
+    """The classical fourth-order Runge-Kutta method for delay differential equations.
+
+    Combined with the cubic Hermite interpolation of the delay
+    variables (``interp_method='hermite'``), the fourth-order
+    accuracy is maintained for the delays which are not multiples
+    of the time step.
+    """
+    A = [(), (0.5,), (0., 0.5), (0., 0., 1)]
+    B = ['1/6', '1/3', '1/3', '1/6']
+    C = [0, 0.5, 0.5, 1]
+    return _base(A=A, B=B, C=C, f=f, show_code=show_code, dt=dt,
+                 var_type=var_type, delay_vars=delay_vars)
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+import ast
+import inspect
+
+from brainpy import errors
+from brainpy import tools
+from brainpy.integrators import constants
+from brainpy.integrators import utils
+from brainpy.integrators.delay_vars import AbstractDelay
+from brainpy.integrators.ode.wrapper import Tools as ODETools
+
+__all__ = [
+    'rk_wrapper',
+]
+
+_DDE_UNKNOWN_NO = 0
+
+
+class _DelayTransformer(ast.NodeTransformer):
+    """Transform the delay variable retrievals into the kernel calls.
+
+    - ``xd(time)`` or ``xd[time]`` -> ``_xd_interp(xd_data, xd_state, _xd_dt, time)``
+    - ``xd.diff(time)`` -> ``_xd_diff(xd_data, xd_state, _xd_dt, time)``
+    """
+
+    def __init__(self, delay_names):
+        self.delay_names = delay_names
+        self.used_delays = []
+
+    def _kernel_call(self, name, kernel, time):
+        if name not in self.used_delays:
+            self.used_delays.append(name)
+        args = [ast.Name(id=f'{name}_data', ctx=ast.Load()),
+                ast.Name(id=f'{name}_state', ctx=ast.Load()),
+                ast.Name(id=f'_{name}_dt', ctx=ast.Load()),
+                time]
+        return ast.Call(func=ast.Name(id=f'_{name}_{kernel}', ctx=ast.Load()),
+                        args=args, keywords=[])
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        func = node.func
+        if isinstance(func, ast.Name) and func.id in self.delay_names:
+            if len(node.args) != 1 or len(node.keywords):
+                raise errors.DiffEqError(f'Delay variable "{func.id}" only receives '
+                                         f'one argument "time".')
+            return self._kernel_call(func.id, 'interp', node.args[0])
+        if isinstance(func, ast.Attribute) and func.attr == 'diff' and \
+                isinstance(func.value, ast.Name) and func.value.id in self.delay_names:
+            if len(node.args) != 1 or len(node.keywords):
+                raise errors.DiffEqError(f'"{func.value.id}.diff()" only receives '
+                                         f'one argument "time".')
+            return self._kernel_call(func.value.id, 'diff', node.args[0])
+        return node
+
+    def visit_Subscript(self, node):
+        self.generic_visit(node)
+        if isinstance(node.value, ast.Name) and node.value.id in self.delay_names:
+            time = node.slice
+            if hasattr(ast, 'Index') and isinstance(time, ast.Index):  # Python < 3.9
+                time = time.value
+            return self._kernel_call(node.value.id, 'interp', time)
+        return node
+
+
+class Tools(object):
+    @staticmethod
+    def f_names(f):
+        if f.__name__.isidentifier():
+            f_name = f.__name__
+        else:
+            global _DDE_UNKNOWN_NO
+            f_name = f'dde_unknown_{_DDE_UNKNOWN_NO}'
+            _DDE_UNKNOWN_NO += 1
+        f_new_name = constants.DDE_PREFIX + f_name
+        return f_new_name
+
+    @staticmethod
+    def transform_delays(f, dt):
+        """Rewrite the derivative function to retrieve the delay
+        variables through the history buffers.
+
+        Returns
+        -------
+        res : tuple
+            The new derivative function, the used delay variables,
+            and the appended argument names.
+        """
+        closure_vars = inspect.getclosurevars(f)
+        delay_names = dict(closure_vars.globals)
+        delay_names.update(closure_vars.nonlocals)
+        delay_names = {k: v for k, v in delay_names.items() if isinstance(v, AbstractDelay)}
+
+        # transform the source code
+        code = tools.deindent(tools.get_func_source(f))
+        tree = ast.parse(code)
+        transformer = _DelayTransformer(delay_names)
+        tree = transformer.visit(tree)
+        func_def = tree.body[0]
+        func_def.decorator_list = []
+
+        # the appended arguments
+        scope = dict(f.__globals__)
+        scope.update(closure_vars.nonlocals)
+        used_delays = {name: delay_names[name] for name in transformer.used_delays}
+        delay_args = []
+        for name, delay in used_delays.items():
+            if delay.dt != dt:
+                raise errors.DiffEqError(f'The time step of the delay variable "{name}" '
+                                         f'is {delay.dt}, which is different from '
+                                         f'the integration step {dt}.')
+            delay_args.extend([f'{name}_data', f'{name}_state'])
+            func_def.args.args.extend([ast.arg(arg=f'{name}_data'), ast.arg(arg=f'{name}_state')])
+            scope[f'_{name}_interp'] = delay.interp_kernel
+            scope[f'_{name}_diff'] = delay.diff_kernel
+            scope[f'_{name}_dt'] = delay.dt
+
+        # compile
+        code = tools.ast2code(ast.fix_missing_locations(tree))
+        exec(compile(code, '', 'exec'), scope)
+        return scope[func_def.name], used_delays, delay_args
+
+
+def rk_wrapper(f, show_code, dt, A, B, C, var_type, delay_vars):
+    """Runge–Kutta methods for delay differential equations.
+
+    The delay variables (instances of
+    :py:class:`brainpy.integrators.AbstractDelay`) referred in the
+    derivative function ``f`` are retrieved from their preallocated
+    history buffers, so that each lookup costs O(1) time. For each
+    used delay variable ``xd``, two arguments ``xd_data`` and ``xd_state``
+    are appended to the integrator (in the order of their first
+    appearance in ``f``), which should be provided as ``xd.data``
+    and ``xd.state``. In such a way, the integrator can be compiled by
+    Numba, and the history is updated in-place.
+
+    Parameters
+    ----------
+    f : callable
+        The derivative function.
+    show_code : bool
+        Whether show the formatted code.
+    dt : float
+        The numerical precision.
+    A : tuple, list
+        The A matrix in the Butcher tableau.
+    B : tuple, list
+        The B vector in the Butcher tableau.
+    C : tuple, list
+        The C vector in the Butcher tableau.
+    var_type : str
+        The variable type.
+    delay_vars : dict
+        The mapping from the variable name to the delay variable
+        which records its history. After each step, the new value
+        (and the exact derivative at the start of the step) is
+        pushed into the delay variable automatically.
+
+    Returns
+    -------
+    integral_func : callable
+        The one-step numerical integration function.
+    """
+    class_kw, variables, parameters, arguments = utils.get_args(f)
+    for arg in arguments:
+        if arg.startswith('*') or '=' in arg:
+            raise errors.DiffEqError(f'DDE integrators do not support the variable or '
+                                     f'default arguments, but got "{arg}".')
+    dt_var = 'dt'
+    func_name = Tools.f_names(f)
+
+    # the delay variables
+    new_f, used_delays, delay_args = Tools.transform_delays(f, dt)
+    delay_vars = dict() if delay_vars is None else delay_vars
+    recorded = []
+    for var, delay in delay_vars.items():
+        if var not in variables:
+            raise errors.DiffEqError(f'"{var}" is not a variable of {variables}.')
+        for name, d in used_delays.items():
+            if d is delay:
+                recorded.append((var, name))
+                break
+        else:
+            raise errors.DiffEqError(f'The delay variable of "{var}" is not '
+                                     f'used in the derivative function.')
+    parameters = parameters + delay_args
+    arguments = arguments + delay_args
+
+    # code scope
+    code_scope = {'f': new_f, 'dt': dt}
+
+    # code lines
+    code_lines = [f'def {func_name}({", ".join(arguments)}):']
+
+    # step stage
+    ODETools.step(variables, dt_var, A, C, code_lines, parameters)
+
+    # variable update
+    return_args = ODETools.update(variables, dt_var, B, code_lines)
+
+    # history update
+    for var, name in recorded:
+        code_scope[f'_{name}_push'] = used_delays[name].push_kernel
+        code_lines.append(f'  _{name}_push({name}_data, {name}_state, {dt_var}, '
+                          f'{var}_new, d{var}_k1, t + {dt_var})')
+
+    # returns
+    code_lines.append(f'  return {", ".join(return_args)}')
+
+    # compilation
+    return ODETools.compile_and_assign_attrs(
+        code_lines=code_lines, code_scope=code_scope, show_code=show_code,
+        func_name=func_name, variables=variables, parameters=parameters,
+        dt=dt, var_type=var_type)
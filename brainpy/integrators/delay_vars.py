@@ -1,74 +1,271 @@
 # -*- coding: utf-8 -*-
 
+"""
+Delay variables for the delay differential equations.
+
+The history of a delay variable is stored in a preallocated circular
+buffer ``data`` with the shape of ``(2, num_step) + size``, where
+``data[0]`` records the values and ``data[1]`` records the time
+derivatives at the grid points ``t_head - i * dt``. The head position
+and the head time are stored in the float array ``state``. Therefore,
+retrieving the history at an arbitrary time is a O(1) index computation
+plus a (linear or cubic Hermite) interpolation between two grid points,
+which is implemented as Numba-compilable kernels.
+"""
 
 import abc
 import math
 
+import numpy as np
+
 from brainpy import backend
-from brainpy.backend import ops
+from brainpy import errors
+from brainpy import tools
 
 __all__ = [
+    'SUPPORTED_INTERP_METHODS',
     'AbstractDelay',
     'ConstantDelay',
     'VaryingDelay',
     'NeutralDelay',
 ]
 
+SUPPORTED_INTERP_METHODS = ['linear', 'hermite']
+
+
+@tools.numba_jit
+def _locate(state, num, dt, time):
+    # Get the two grid points which enclose "time", and the relative
+    # position "theta" of "time" between the older point (theta=0)
+    # and the newer point (theta=1).
+    head = int(state[0])
+    step_back = (state[1] - time) / dt
+    if step_back <= 0.:
+        return head, head, 1.
+    k = int(math.floor(step_back))
+    if k >= num - 1:
+        oldest = (head + 1) % num
+        return oldest, oldest, 1.
+    i_new = (head - k + num) % num
+    i_old = (head - k - 1 + num) % num
+    return i_new, i_old, 1. - (step_back - k)
+
+
+@tools.numba_jit
+def _hermite_basis(theta):
+    h00 = (1. + 2. * theta) * (1. - theta) ** 2
+    h10 = theta * (1. - theta) ** 2
+    h01 = theta ** 2 * (3. - 2. * theta)
+    h11 = theta ** 2 * (theta - 1.)
+    return h00, h10, h01, h11
+
+
+@tools.numba_jit
+def _linear_interp(data, state, dt, time):
+    i_new, i_old, theta = _locate(state, data.shape[1], dt, time)
+    return data[0, i_old] + theta * (data[0, i_new] - data[0, i_old])
+
+
+@tools.numba_jit
+def _hermite_interp(data, state, dt, time):
+    i_new, i_old, theta = _locate(state, data.shape[1], dt, time)
+    h00, h10, h01, h11 = _hermite_basis(theta)
+    return (h00 * data[0, i_old] + h10 * dt * data[1, i_old] +
+            h01 * data[0, i_new] + h11 * dt * data[1, i_new])
+
+
+@tools.numba_jit
+def _diff_interp(data, state, dt, time):
+    i_new, i_old, theta = _locate(state, data.shape[1], dt, time)
+    return data[1, i_old] + theta * (data[1, i_new] - data[1, i_old])
+
+
+@tools.numba_jit
+def _linear_interp_elementwise(data, state, dt, times):
+    res = np.empty(times.shape[0])
+    for j in range(times.shape[0]):
+        i_new, i_old, theta = _locate(state, data.shape[1], dt, times[j])
+        res[j] = data[0, i_old, j] + theta * (data[0, i_new, j] - data[0, i_old, j])
+    return res
+
+
+@tools.numba_jit
+def _hermite_interp_elementwise(data, state, dt, times):
+    res = np.empty(times.shape[0])
+    for j in range(times.shape[0]):
+        i_new, i_old, theta = _locate(state, data.shape[1], dt, times[j])
+        h00, h10, h01, h11 = _hermite_basis(theta)
+        res[j] = (h00 * data[0, i_old, j] + h10 * dt * data[1, i_old, j] +
+                  h01 * data[0, i_new, j] + h11 * dt * data[1, i_new, j])
+    return res
+
+
+@tools.numba_jit
+def _diff_interp_elementwise(data, state, dt, times):
+    res = np.empty(times.shape[0])
+    for j in range(times.shape[0]):
+        i_new, i_old, theta = _locate(state, data.shape[1], dt, times[j])
+        res[j] = data[1, i_old, j] + theta * (data[1, i_new, j] - data[1, i_old, j])
+    return res
+
+
+@tools.numba_jit
+def _delay_push(data, state, dt, value, diff, time):
+    # "diff" is the derivative at the current head, which is
+    # known exactly after one integration step. The derivative at
+    # the new head is approximated by the backward difference, and
+    # will be corrected at the next push.
+    num = data.shape[1]
+    head = int(state[0])
+    new_head = (head + 1) % num
+    data[1, head] = diff
+    data[0, new_head] = value
+    data[1, new_head] = (value - data[0, head]) / dt
+    state[0] = new_head
+    state[1] = time
+
 
 class AbstractDelay(abc.ABC):
-    def __setitem__(self, time, value):
+    """The base class of delay variables.
+
+    A delay variable is pushed by ``delay[time] = value``, and
+    pulled by ``delay[time]`` or ``delay(time)``.
+    """
+
+    @abc.abstractmethod
+    def __setitem__(self, time, value):  # push
         pass
 
-    def __getitem__(self, time):
+    @abc.abstractmethod
+    def __getitem__(self, time):  # pull
         pass
 
+    def __call__(self, time):
+        return self.__getitem__(time)
+
 
 class ConstantDelay(AbstractDelay):
-    def __init__(self, v0, delay_len, before_t0=0., t0=0., dt=None):
+    """Delay variable with the constant delay length.
+
+    Parameters
+    ----------
+    v0 : int, float, np.ndarray
+        The initial value at ``t0``.
+    delay_len : float
+        The maximum delay length.
+    before_t0 : int, float, np.ndarray, callable
+        The history before ``t0``. It can be a constant value, or a
+        function ``before_t0(t)`` which returns the value at time ``t``.
+    t0 : float
+        The initial time.
+    dt : float, optional
+        The time step of the history grid. Default is ``backend.get_dt()``.
+    interp_method : str
+        The interpolation method to retrieve the history, can be
+        "linear" or "hermite" (cubic Hermite interpolation).
+    """
+
+    def __init__(self, v0, delay_len, before_t0=0., t0=0., dt=None, interp_method='linear'):
+        if interp_method not in SUPPORTED_INTERP_METHODS:
+            raise errors.DiffEqError(f'Unknown interpolation method "{interp_method}", '
+                                     f'only support {SUPPORTED_INTERP_METHODS}.')
+        self.interp_method = interp_method
+
         # size
-        self.size = ops.shape(v0)
+        self.size = np.shape(v0)
 
         # delay_len
         self.delay_len = delay_len
         self.dt = backend.get_dt() if dt is None else dt
         self.num_delay = int(math.ceil(delay_len / self.dt))
-
-        # other variables
-        self._delay_in = self.num_delay - 1
-        self._delay_out = 0
-        self.current_time = t0
+        self.num_step = self.num_delay + 2
 
         # before_t0
         self.before_t0 = before_t0
+        self.t0 = t0
 
         # delay data
-        self.data = ops.zeros((self.num_delay + 1,) + self.size)
+        self.data = np.zeros((2, self.num_step) + self.size)
         if callable(before_t0):
-            for i in range(self.num_delay):
-                self.data[i] = before_t0(t0 + (i - self.num_delay) * self.dt)
+            for i in range(self.num_step - 1):
+                self.data[0, i] = before_t0(t0 + (i + 1 - self.num_step) * self.dt)
+        else:
+            self.data[0, :-1] = before_t0
+        self.data[0, -1] = v0
+        self.data[1] = np.gradient(self.data[0], self.dt, axis=0)
+        self.state = np.array([self.num_step - 1, t0], dtype=np.float_)
+
+        # kernels
+        self._set_kernels()
+
+    def _set_kernels(self):
+        if self.interp_method == 'linear':
+            self.interp_kernel = _linear_interp
         else:
-            self.data[:-1] = before_t0
-        self.data[-1] = v0
+            self.interp_kernel = _hermite_interp
+        self.diff_kernel = _diff_interp
+        self.push_kernel = _delay_push
+
+    @property
+    def current_time(self):
+        return self.state[1]
+
+    def _format_time(self, time):
+        return time
 
     def __setitem__(self, time, value):  # push
-        self.data[self._delay_in] = value
-        self.current_time = time
+        head = int(self.state[0])
+        self.push_kernel(self.data, self.state, self.dt, value,
+                         self.data[1, head], time)
 
     def __getitem__(self, time):  # pull
-        diff = self.current_time - time
-        m = math.ceil(diff / self.dt)
-        return self.data[self._delay_out]
+        return self.interp_kernel(self.data, self.state, self.dt,
+                                  self._format_time(time))
 
-    def update(self):
-        self._delay_in = (self._delay_in + 1) % self.num_delay
-        self._delay_out = (self._delay_out + 1) % self.num_delay
+    def diff(self, time):
+        """Get the time derivative of the variable at ``time``."""
+        return self.diff_kernel(self.data, self.state, self.dt,
+                                self._format_time(time))
 
 
-class VaryingDelay(AbstractDelay):
-    def __init__(self):
-        pass
+class VaryingDelay(ConstantDelay):
+    """Delay variable with the time-varying or state-dependent delays.
 
+    Each element of the (one-dimensional) variable can be retrieved at
+    its own time, i.e., ``delay[times]`` where ``times`` is an array
+    with the same shape of the variable. The parameter ``delay_len``
+    denotes the maximum delay length.
+    """
 
-class NeutralDelay(AbstractDelay):
-    def __init__(self):
-        pass
+    def __init__(self, v0, delay_len, before_t0=0., t0=0., dt=None, interp_method='linear'):
+        if np.ndim(v0) != 1:
+            raise errors.DiffEqError(f'"{self.__class__.__name__}" only supports '
+                                     f'one-dimensional variable, but got the '
+                                     f'shape of {np.shape(v0)}.')
+        super(VaryingDelay, self).__init__(v0=v0, delay_len=delay_len, before_t0=before_t0,
+                                           t0=t0, dt=dt, interp_method=interp_method)
+
+    def _set_kernels(self):
+        if self.interp_method == 'linear':
+            self.interp_kernel = _linear_interp_elementwise
+        else:
+            self.interp_kernel = _hermite_interp_elementwise
+        self.diff_kernel = _diff_interp_elementwise
+        self.push_kernel = _delay_push
+
+    def _format_time(self, time):
+        return np.ascontiguousarray(np.broadcast_to(np.asarray(time, dtype=np.float_), self.size))
+
+
+class NeutralDelay(ConstantDelay):
+    """Delay variable for the neutral delay differential equations.
+
+    Besides the delayed values, the delayed derivatives can also be
+    retrieved by ``delay.diff(time)``, in which the derivatives at the
+    grid points are recorded exactly by the integrators. The cubic
+    Hermite interpolation is used by default.
+    """
+
+    def __init__(self, v0, delay_len, before_t0=0., t0=0., dt=None, interp_method='hermite'):
+        super(NeutralDelay, self).__init__(v0=v0, delay_len=delay_len, before_t0=before_t0,
+                                           t0=t0, dt=dt, interp_method=interp_method)
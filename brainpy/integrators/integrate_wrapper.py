@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 
+from . import caching
+from . import dde
 from . import ode
 from . import sde
 
 __all__ = [
     'SUPPORTED_ODE_METHODS',
     'SUPPORTED_SDE_METHODS',
+    'SUPPORTED_DDE_METHODS',
 
     'odeint',
     'sdeint',
@@ -18,13 +21,19 @@ __all__ = [
 
 _DEFAULT_ODE_METHOD = 'euler'
 _DEFAULT_SDE_METHOD = 'euler'
+_DEFAULT_DDE_METHOD = 'euler'
 SUPPORTED_ODE_METHODS = [m for m in dir(ode) if not m.startswith('__') and callable(getattr(ode, m))]
-SUPPORTED_SDE_METHODS = [m for m in dir(sde) if not m.startswith('__') and callable(getattr(sde, m))]
+SUPPORTED_SDE_METHODS = [m for m in dir(sde) if not m.startswith('__') and callable(getattr(sde, m))
+                         and m not in sde.noise.__all__]
+SUPPORTED_DDE_METHODS = [m for m in dir(dde) if not m.startswith('__') and callable(getattr(dde, m))]
 
 
 def _wrapper(f, module, method, **kwargs):
     integrator = getattr(module, method)
-    return integrator(f, **kwargs)
+    optimize = kwargs.pop('optimize', False)
+    table_settings = kwargs.pop('tables', None)
+    return caching.cached_integrator(integrator, f, module, method, kwargs,
+                                     optimize=optimize, table_settings=table_settings)
 
 
 def odeint(f=None, method=None, **kwargs):
@@ -35,6 +44,12 @@ def odeint(f=None, method=None, **kwargs):
     f : callable
     method : str
     kwargs :
+        The settings of the method. Besides, the ``tables`` of
+        :py:func:`brainpy.integrators.tabulate` can be provided to
+        evaluate the subexpressions by the lookup tables, and
+        ``optimize=True`` inlines the derivative function into the
+        generated code and eliminates the common subexpressions (see
+        :py:func:`brainpy.integrators.optimize_code`).
 
     Returns
     -------
@@ -66,8 +81,46 @@ def sdeint(f=None, method=None, **kwargs):
         return _wrapper(f, method=method, module=sde, **kwargs)
 
 
-def ddeint():
-    raise NotImplementedError
+def ddeint(f=None, method=None, **kwargs):
+    """Numerical integration for DDE.
+
+    The delay variables (see :py:class:`brainpy.integrators.ConstantDelay`,
+    :py:class:`brainpy.integrators.VaryingDelay` and
+    :py:class:`brainpy.integrators.NeutralDelay`) used in ``f`` are
+    retrieved by ``xd(time)`` or ``xd[time]``, and the delayed
+    derivatives by ``xd.diff(time)``. For each used delay variable,
+    its ``data`` and ``state`` should be appended to the arguments
+    when calling the integrator.
+
+    >>> xd = ConstantDelay(v0=1., delay_len=1., before_t0=1.)
+    >>>
+    >>> @ddeint(method='rk4', delay_vars={'x': xd})
+    >>> def f(x, t):
+    >>>     return -xd(t - 1.)
+    >>>
+    >>> x = f(x, t, xd.data, xd.state)
+
+    Parameters
+    ----------
+    f : callable
+    method : str
+    kwargs :
+
+    Returns
+    -------
+    int_f : callable
+        The numerical solver of `f`.
+    """
+    if method is None:
+        method = _DEFAULT_DDE_METHOD
+    if method not in SUPPORTED_DDE_METHODS:
+        raise ValueError(f'Unknown DDE numerical method "{method}". Currently '
+                         f'BrainPy only support: {SUPPORTED_DDE_METHODS}')
+
+    if f is None:
+        return lambda f: _wrapper(f, method=method, module=dde, **kwargs)
+    else:
+        return _wrapper(f, method=method, module=dde, **kwargs)
 
 
 def fdeint():
@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+
+"""
+The joint integration of several derivative functions.
+
+Neuron models usually define the derivative function of each variable
+separately (such as ``dm``, ``dh``, ``dn`` and ``dV`` of the HH model),
+and integrate them by the separate integrators. Then, each integrator
+reads the whole population arrays from the memory at each step.
+:py:func:`joint_eq` merges the derivative functions into one, so that
+all the variables are updated by one generated integrator:
+
+>>> def dm(m, t, V):
+>>>     ...
+>>>     return dmdt
+>>>
+>>> def dV(V, t, m, Iext):
+>>>     ...
+>>>     return dVdt
+>>>
+>>> int_V_m = odeint(joint_eq(dV, dm), method='exponential_euler')
+>>> V, m = int_V_m(V, m, t, Iext)
+
+With the Numba CPU backends, the integrator of the joint equation loops
+over the neurons once, and updates all the variables of a neuron in the
+registers, so that the population state is read from the memory once per
+step, rather than once per variable.
+"""
+
+import ast
+import builtins
+import inspect
+
+import numpy as np
+
+from brainpy import backend
+from brainpy import errors
+from brainpy import tools
+from brainpy.integrators import constants
+from brainpy.integrators import utils
+
+__all__ = [
+    'joint_eq',
+]
+
+_MISSING = object()
+
+
+class _Renamer(ast.NodeTransformer):
+    def __init__(self, names):
+        self.names = names
+
+    def visit_Name(self, node):
+        if node.id in self.names:
+            return ast.copy_location(ast.Name(id=self.names[node.id], ctx=node.ctx), node)
+        return node
+
+
+def _fresh_name(name, used):
+    new_name, i = name, 0
+    while new_name in used:
+        i += 1
+        new_name = f'{name}_{i}'
+    used.add(new_name)
+    return new_name
+
+
+def _parse_eq(eq):
+    if not inspect.isfunction(eq):
+        raise errors.IntegratorError(f'The joint equation only supports the Python functions, but got {eq}.')
+    try:
+        func_def = ast.parse(tools.deindent(tools.get_func_source(eq))).body[0]
+    except (OSError, TypeError, SyntaxError, IndexError):
+        raise errors.IntegratorError(f'Cannot get the source code of {eq}.')
+    body = func_def.body
+    if isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant):
+        body = body[1:]  # the docstring
+    if not body or not isinstance(body[-1], ast.Return) or body[-1].value is None:
+        raise errors.IntegratorError(f'The derivative function {eq} must end with the return statement.')
+    for node in ast.walk(ast.Module(body=body, type_ignores=[])):
+        if node is not body[-1] and isinstance(node, ast.Return):
+            raise errors.IntegratorError(f'The derivative function {eq} must only return at the end.')
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda,
+                             ast.Global, ast.Nonlocal)):
+            raise errors.IntegratorError(f'The joint equation does not support the nested '
+                                         f'definitions in the derivative function {eq}.')
+    return body[:-1], body[-1].value
+
+
+def joint_eq(*eqs):
+    """Merge the derivative functions into one derivative function.
+
+    The variables of the joint equation are the variables of the derivative
+    functions in order, followed by the time ``t`` and the other arguments
+    (the union of the arguments of the derivative functions, which are not
+    the variables). The arguments of a derivative function, which are the
+    variables of the other derivative functions, are given by the current
+    values of the variables. For example,
+
+    >>> def dm(m, t, V):
+    >>>     alpha = 0.1 * (V + 40) / (1 - np.exp(-(V + 40) / 10))
+    >>>     beta = 4.0 * np.exp(-(V + 65) / 18)
+    >>>     dmdt = alpha * (1 - m) - beta * m
+    >>>     return dmdt
+    >>>
+    >>> def dV(V, t, m, gNa, ENa, Iext):
+    >>>     dVdt = -gNa * m ** 3 * (V - ENa) + Iext
+    >>>     return dVdt
+    >>>
+    >>> joint_eq(dV, dm)
+
+    is equivalent to
+
+    >>> def dV_dm(V, m, t, gNa, ENa, Iext):
+    >>>     dVdt = -gNa * m ** 3 * (V - ENa) + Iext
+    >>>     alpha = 0.1 * (V + 40) / (1 - np.exp(-(V + 40) / 10))
+    >>>     beta = 4.0 * np.exp(-(V + 65) / 18)
+    >>>     dmdt = alpha * (1 - m) - beta * m
+    >>>     return dVdt, dmdt
+
+    The bodies of the derivative functions are merged into the source code
+    of the joint equation, so that it can be analyzed by all the integrators
+    (such as the exponential Euler method). The local variables shared by the
+    derivative functions are renamed.
+
+    Parameters
+    ----------
+    eqs : callable
+        The derivative functions, or a list of them.
+
+    Returns
+    -------
+    func : callable
+        The joint derivative function, whose ``joint_eqs`` attribute is
+        the merged derivative functions.
+    """
+    if len(eqs) == 1 and isinstance(eqs[0], (tuple, list)):
+        eqs = tuple(eqs[0])
+    if len(eqs) == 0:
+        raise errors.IntegratorError('Please provide the derivative functions to joint.')
+
+    # the variables and the arguments
+    variables = []
+    parameters = {}  # name => default value
+    for eq in eqs:
+        class_kw, vars_, pars, _ = utils.get_args(eq)
+        if class_kw:
+            raise errors.IntegratorError(f'The joint equation does not support the class method {eq}.')
+        for v in vars_:
+            if v in variables:
+                raise errors.IntegratorError(f'The variable "{v}" is defined by more than one '
+                                             f'derivative functions.')
+            variables.append(v)
+        signature = inspect.signature(eq)
+        for p in pars[1:]:
+            if p.startswith('*'):
+                raise errors.IntegratorError(f'The joint equation does not support the '
+                                             f'variable arguments "{p}" of {eq}.')
+            default = signature.parameters[p].default
+            default = _MISSING if default is inspect.Parameter.empty else default
+            if default is not _MISSING and not isinstance(default, (type(None), bool, int, float, str)):
+                raise errors.IntegratorError(f'The joint equation only supports the numbers and the '
+                                             f'strings as the default values, but got "{p}={default}".')
+            if p in parameters and parameters[p] is not default and parameters[p] != default:
+                raise errors.IntegratorError(f'The argument "{p}" has the different default values '
+                                             f'in the derivative functions.')
+            parameters[p] = default
+    parameters = {p: d for p, d in parameters.items() if p not in variables}
+    # the arguments with the default values follow the others
+    arguments = variables + ['t'] + [p for p, d in parameters.items() if d is _MISSING]
+    defaults = [p for p, d in parameters.items() if d is not _MISSING]
+
+    # the bodies of the derivative functions
+    parsed = [_parse_eq(eq) for eq in eqs]
+    local_names = []
+    for body, _ in parsed:
+        local_names.append(set(n.id for stmt in body for n in ast.walk(stmt)
+                               if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)))
+    used = set(arguments + defaults)
+    for names in local_names:
+        used |= names
+
+    code_scope = {}
+    new_body = []
+    returns = []
+    for eq, (body, ret), names in zip(eqs, parsed, local_names):
+        eq_args = set(inspect.signature(eq).parameters)
+        if names & eq_args:
+            raise errors.IntegratorError(f'The joint equation does not support assigning the arguments '
+                                         f'{sorted(names & eq_args)} in {eq}, please rename them.')
+        renames = {}
+        # the local variables shared with the other functions
+        for name in sorted(names):
+            shared = name in arguments or name in defaults
+            shared = shared or any(name in other for other in local_names if other is not names)
+            if shared:
+                renames[name] = _fresh_name(f'{name}_{eq.__name__}', used)
+        # the global variables
+        closure_vars = inspect.getclosurevars(eq)
+        eq_scope = dict(eq.__globals__)
+        eq_scope.update(closure_vars.nonlocals)
+        free_names = set(n.id for stmt in body + [ret] for n in ast.walk(stmt) if isinstance(n, ast.Name))
+        for name in sorted(free_names - names - eq_args):
+            value = eq_scope.get(name, getattr(builtins, name, _MISSING))
+            if value is _MISSING:
+                raise errors.IntegratorError(f'The name "{name}" used in {eq} is not defined.')
+            if name not in eq_scope and name not in code_scope and name not in used:
+                continue  # the builtins
+            if code_scope.get(name, _MISSING) is value:
+                continue
+            if name in code_scope or name in used:
+                renames[name] = _fresh_name(f'{name}_{eq.__name__}', used)
+                code_scope[renames[name]] = value
+            else:
+                code_scope[name] = value
+                used.add(name)
+
+        renamer = _Renamer(renames)
+        new_body.extend(renamer.visit(stmt) for stmt in body)
+        ret = renamer.visit(ret)
+        eq_vars = utils.get_args(eq)[1]
+        eq_locals = set(renames.get(name, name) for name in names)
+        elements = ret.elts if isinstance(ret, ast.Tuple) else [ret]
+        if len(elements) != len(eq_vars):
+            raise errors.IntegratorError(f'{eq} returns {len(elements)} derivatives, '
+                                         f'but it has {len(eq_vars)} variables.')
+        for var, expr in zip(eq_vars, elements):
+            if isinstance(expr, ast.Name) and expr.id in eq_locals and expr.id not in returns:
+                returns.append(expr.id)
+            else:
+                name = _fresh_name(f'd{var}', used)
+                new_body.append(ast.Assign(targets=[ast.Name(id=name, ctx=ast.Store())], value=expr, lineno=0))
+                returns.append(name)
+
+    # the code
+    func_name = '_'.join(eq.__name__ for eq in eqs)
+    header = ', '.join(arguments + [f'{p}={parameters[p]!r}' for p in defaults])
+    code_lines = [f'def {func_name}({header}):']
+    for stmt in new_body:
+        code_lines.append(tools.indent(tools.ast2code(ast.fix_missing_locations(stmt)).strip('\n'),
+                                       spaces_per_tab=2))
+    code_lines.append(f'  return {", ".join(returns)}')
+    func = utils.compile_code('\n'.join(code_lines), code_scope, func_name)
+    func.joint_eqs = eqs
+    return func
+
+
+def is_joint_eq(f):
+    """Whether the derivative function is the joint equation."""
+    return getattr(f, 'joint_eqs', None) is not None
+
+
+def element_loop(int_f, code_lines, uploads):
+    """Wrap the integrator of the joint equation by the loop over the elements.
+
+    The generated integrator ``int_f`` (JIT compiled by Numba) updates
+    one element of the variables. The new integrator calls it for each
+    element of the one-dimensional population variables in one compiled
+    loop, while the scalar variables and the multi-dimensional variables
+    are updated by ``int_f`` directly.
+
+    Parameters
+    ----------
+    int_f : callable
+        The integrator compiled by the Numba CPU backends.
+    code_lines : list of str
+        The generated code of ``int_f``.
+    uploads : dict
+        The attributes of the integrator.
+
+    Returns
+    -------
+    int_f : callable
+        The new integrator, or ``int_f`` itself if the loop is not supported.
+    """
+    if backend.get_backend_name() not in ['numba', 'numba-parallel']:
+        return int_f
+    if uploads.get('var_type', None) not in [constants.SCALAR_VAR, constants.POPU_VAR]:
+        return int_f
+    variables = uploads['variables']
+    parameters = uploads['parameters']
+    if any(p.startswith('*') for p in parameters):
+        return int_f
+    # the integrator must only return the new variables
+    returns = ast.parse('\n'.join(code_lines)).body[0].body[-1]
+    if not isinstance(returns, ast.Return):
+        return int_f
+    num = len(returns.value.elts) if isinstance(returns.value, ast.Tuple) else 1
+    if num != len(variables):
+        return int_f
+
+    import numba
+    from numba.core import types as nb_types
+    from numba.extending import overload
+    from brainpy.backend.drivers.numba_cpu import get_numba_profile
+    from brainpy.integrators.ode.wrapper import _elem
+
+    signature = inspect.signature(int_f.py_func)
+    names = list(signature.parameters)
+    header = ', '.join(str(par) for par in signature.parameters.values())
+    func_name = int_f.__name__
+    code_scope = {'np': np, 'numba': numba, 'nb_types': nb_types, '_elem': _elem, '_int_f': int_f,
+                  'overload': overload, '_profile': get_numba_profile()}
+    call_args = ', '.join(names)
+    var0 = variables[0]
+    elem_args = ', '.join(f'{n}[_i]' if n in variables else (n if n == 't' else f'_elem({n}, _i)')
+                          for n in names)
+
+    # the compiled loop
+    lines = [f'def {func_name}_loop({header}):']
+    for v in variables:
+        lines.append(f'  {v}_new = np.empty({var0}.shape)')
+    lines.append(f'  for _i in numba.prange({var0}.shape[0]):')
+    lines.append(f'    {", ".join(f"{v}_new[_i]" for v in variables)} = _int_f({elem_args})')
+    lines.append(f'  return {", ".join(f"{v}_new" for v in variables)}')
+    lines.append(f'{func_name}_loop = numba.jit(**_profile)({func_name}_loop)')
+    lines.append('')
+    # the integrator called in the Python code
+    lines.append(f'def {func_name}({header}):')
+    lines.append(f'  if np.ndim({var0}) == 1:')
+    lines.append(f'    return {func_name}_loop({call_args})')
+    lines.append(f'  return _int_f({call_args})')
+    lines.append('')
+    # the integrator called in the compiled code
+    lines.append(f'@overload({func_name})')
+    lines.append(f'def _{func_name}_impl({header}):')
+    lines.append(f'  if isinstance({var0}, nb_types.Array) and {var0}.ndim == 1:')
+    lines.append(f'    def impl({header}):')
+    lines.append(f'      return {func_name}_loop({call_args})')
+    lines.append(f'  else:')
+    lines.append(f'    def impl({header}):')
+    lines.append(f'      return _int_f({call_args})')
+    lines.append(f'  return impl')
+    exec(compile('\n'.join(lines), '', 'exec'), code_scope)
+    new_f = code_scope[func_name]
+    for key, value in uploads.items():
+        setattr(new_f, key, value)
+    new_f.element_f = int_f
+    return new_f
@@ -7,3 +7,4 @@ Numerical methods for ordinary differential equations.
 from .exp_euler_method import *
 from .adaptive_rk_methods import *
 from .general_rk_methods import *
+from .implicit_methods import *
@@ -26,7 +26,9 @@ def _base(A, B1, B2, C, f=None, tol=None, adaptive=None,
     C : list
     f : callable
     tol : float
-    adaptive : bool
+    adaptive : bool, str
+        Whether to adapt the step size. "element" for the step size of each
+        element of the population variables.
     im_return : list
         Intermediate value return.
     dt : float
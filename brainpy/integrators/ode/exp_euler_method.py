@@ -33,6 +33,11 @@ def exponential_euler(f=None, show_code=None, dt=None, var_type=None, im_return=
 
         y_{n+1}= y_{n}e^{hA}-B/A(1-e^{hA})
 
+For the coupled system variable (``var_type=brainpy.SYSTEM_VAR``), :math:`A`
+is the Jacobian matrix of each element, and the matrix function is computed
+by the exponential Rosenbrock-Euler method (see
+:py:func:`brainpy.integrators.ode.wrapper.exp_rosenbrock_wrapper`).
+
     Parameters
     ----------
 
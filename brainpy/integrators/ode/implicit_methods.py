@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+from brainpy import backend
+from brainpy.integrators import constants
+from .wrapper import bdf_wrapper
+from .wrapper import rosenbrock_w_wrapper
+
+__all__ = [
+    'backward_euler',
+    'bdf',
+    'rosenbrock_w',
+]
+
+
+def _base(wrapper, f, show_code, dt, var_type, **kwargs):
+    dt = backend.get_dt() if dt is None else dt
+    show_code = False if show_code is None else show_code
+    var_type = constants.SCALAR_VAR if var_type is None else var_type
+    jacobian = 'full' if kwargs.get('jacobian', None) is None else kwargs['jacobian']
+    kwargs['jacobian'] = jacobian
+
+    if f is None:
+        return lambda f: wrapper(f, show_code=show_code, dt=dt, var_type=var_type, **kwargs)
+    else:
+        return wrapper(f, show_code=show_code, dt=dt, var_type=var_type, **kwargs)
+
+
+def backward_euler(f=None, show_code=None, dt=None, var_type=None, jacobian=None, num_iter=None):
+    """The first order, implicit backward Euler method.
+
+    .. math::
+
+        y_{n+1} = y_n + h f(t_{n+1}, y_{n+1})
+
+    It is L-stable, so that the stiff equations, such as the fast gating
+    variables of the conductance-based models, can be integrated by the
+    large step sizes. The implicit equation is solved by the simplified
+    Newton iterations with the finite-difference Jacobian of the variables
+    of each element (see :py:func:`brainpy.integrators.ode.wrapper.bdf_wrapper`).
+
+    Parameters
+    ----------
+    f : callable
+        The derivative function.
+    show_code : bool
+        Whether show the formatted code.
+    dt : float
+        The numerical precision.
+    var_type : str
+        The variable type.
+    jacobian : str
+        "full" (default) for the Jacobian of all the variables of each
+        element, or "diagonal" for its diagonal.
+    num_iter : int
+        The number of the Newton iterations. Default is 3.
+
+    Returns
+    -------
+    func : callable
+        The one-step numerical integrator function.
+    """
+    num_iter = 3 if num_iter is None else num_iter
+    return _base(bdf_wrapper, f=f, show_code=show_code, dt=dt, var_type=var_type,
+                 jacobian=jacobian, num_iter=num_iter, order=1)
+
+
+def bdf(f=None, show_code=None, dt=None, var_type=None, jacobian=None, num_iter=None):
+    """The variable-order backward differentiation formula (BDF) method.
+
+    It uses the backward Euler method at the first step, and the second
+    order BDF method
+
+    .. math::
+
+        y_{n+1} = \\frac{4}{3} y_n - \\frac{1}{3} y_{n-1} + \\frac{2}{3} h f(t_{n+1}, y_{n+1})
+
+    once the previous values are available. The integrator receives and
+    returns the previous values of the variables,
+
+    >>> V, m, V_prev, m_prev = int_f(V, m, t, I, V_prev, m_prev)
+
+    in which ``V_prev`` and ``m_prev`` are ``None`` at the first step.
+
+    Parameters
+    ----------
+    f : callable
+        The derivative function.
+    show_code : bool
+        Whether show the formatted code.
+    dt : float
+        The numerical precision.
+    var_type : str
+        The variable type.
+    jacobian : str
+        "full" (default) for the Jacobian of all the variables of each
+        element, or "diagonal" for its diagonal.
+    num_iter : int
+        The number of the Newton iterations. Default is 3.
+
+    Returns
+    -------
+    func : callable
+        The one-step numerical integrator function.
+    """
+    num_iter = 3 if num_iter is None else num_iter
+    return _base(bdf_wrapper, f=f, show_code=show_code, dt=dt, var_type=var_type,
+                 jacobian=jacobian, num_iter=num_iter, order=2)
+
+
+def rosenbrock_w(f=None, show_code=None, dt=None, var_type=None, jacobian=None):
+    """The second order, L-stable Rosenbrock-W method (ROS2).
+
+    It solves two linear equations with the finite-difference Jacobian at
+    each step, rather than the nonlinear equations, and keeps the second
+    order for any approximation of the Jacobian (see
+    :py:func:`brainpy.integrators.ode.wrapper.rosenbrock_w_wrapper`).
+
+    Parameters
+    ----------
+    f : callable
+        The derivative function.
+    show_code : bool
+        Whether show the formatted code.
+    dt : float
+        The numerical precision.
+    var_type : str
+        The variable type.
+    jacobian : str
+        "full" (default) for the Jacobian of all the variables of each
+        element, or "diagonal" for its diagonal.
+
+    Returns
+    -------
+    func : callable
+        The one-step numerical integrator function.
+    """
+    return _base(rosenbrock_w_wrapper, f=f, show_code=show_code, dt=dt,
+                 var_type=var_type, jacobian=jacobian)
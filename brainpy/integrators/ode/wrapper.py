@@ -2,9 +2,12 @@
 
 import inspect
 
-from brainpy import backend
+import numpy as np
+
 from brainpy import errors
+from brainpy import tools
 from brainpy.backend import ops
+from brainpy.integrators import caching
 from brainpy.integrators import constants
 from brainpy.integrators import utils
 from brainpy.integrators.ast_analysis import separate_variables
@@ -12,6 +15,10 @@ from brainpy.integrators.ast_analysis import separate_variables
 __all__ = [
     'general_rk_wrapper',
     'adaptive_rk_wrapper',
+    'element_adaptive_rk_wrapper',
+    'bdf_wrapper',
+    'rosenbrock_w_wrapper',
+    'exp_rosenbrock_wrapper',
     'rk2_wrapper',
     'exp_euler_wrapper',
 ]
@@ -19,6 +26,58 @@ __all__ = [
 _ODE_UNKNOWN_NO = 0
 
 
+def _elem(x, i):
+    # the i-th element of the population parameter, or the scalar parameter
+    return x[i] if np.ndim(x) else x
+
+
+try:
+    from numba.core import types as nb_types
+    from numba.extending import overload
+
+
+    @overload(_elem)
+    def _elem_impl(x, i):
+        if isinstance(x, nb_types.Array):
+            return lambda x, i: x[i]
+        else:
+            return lambda x, i: x
+except ModuleNotFoundError:
+    pass
+
+
+@tools.numba_jit
+def _phi1_mv(jacobian, f0, dt):
+    # "dt * phi1(dt * J) f0" of each element, in which "jacobian[j, i]" is
+    # the derivative of "f_i" with respect to "x_j", by the exponential of
+    # the augmented matrix [[dt * J, dt * f0], [0, 0]]
+    num, size = f0.shape
+    res = np.zeros((num, size))
+    aug = np.zeros((num + 1, num + 1))
+    for k in range(size):
+        aug[:, :] = 0.
+        for i in range(num):
+            for j in range(num):
+                aug[i, j] = dt * jacobian[j, i, k]
+            aug[i, num] = dt * f0[i, k]
+        # scaling and squaring with the Taylor series
+        norm = 0.
+        for j in range(num + 1):
+            norm = max(norm, np.sum(np.abs(aug[:, j])))
+        squaring = max(0, int(np.ceil(np.log2(norm))) + 1) if norm > 0. else 0
+        aug /= 2. ** squaring
+        exp = np.eye(num + 1)
+        term = np.eye(num + 1)
+        for n in range(1, 13):
+            term = term @ aug / n
+            exp += term
+        for _ in range(squaring):
+            exp = exp @ exp
+        for i in range(num):
+            res[i, k] = exp[i, num]
+    return res
+
+
 class Tools(object):
 
     @staticmethod
@@ -84,21 +143,69 @@ class Tools(object):
             return_args.append(f'{v}_new')
         return return_args
 
+    @staticmethod
+    def jacobian(vars, t_arg, other_args, jacobian, code_lines):
+        # the finite-difference Jacobian of each element, "_J_i_j",
+        # and the derivatives at the current values, "_f0_v"
+        f0 = [f'_f0_{v}' for v in vars]
+        code_lines.append(f'  {", ".join(f0)} = f({", ".join(vars + [t_arg] + other_args)})')
+        for j, vj in enumerate(vars):
+            code_lines.append(f'  _eps_{vj} = 1.49e-8 * ({vj} * {vj} + 1.) ** 0.5')
+            perturbed = [f'{v} + _eps_{vj}' if v == vj else v for v in vars]
+            fj = [f'_f{j + 1}_{v}' for v in vars]
+            code_lines.append(f'  {", ".join(fj)} = f({", ".join(perturbed + [t_arg] + other_args)})')
+            for i in range(len(vars)):
+                if jacobian == 'full' or i == j:
+                    code_lines.append(f'  _J_{i}_{j} = ({fj[i]} - {f0[i]}) / _eps_{vj}')
+        return f0
+
+    @staticmethod
+    def lu_factor(num, coefficient, jacobian, code_lines):
+        # the in-place LU factorization of "_W = I - coefficient * _J"
+        nonzeros = set()
+        for i in range(num):
+            for j in range(num):
+                if i == j:
+                    code_lines.append(f'  _W_{i}_{j} = 1. - {coefficient} * _J_{i}_{j}')
+                    nonzeros.add((i, j))
+                elif jacobian == 'full':
+                    code_lines.append(f'  _W_{i}_{j} = -{coefficient} * _J_{i}_{j}')
+                    nonzeros.add((i, j))
+        for k in range(num):
+            for i in range(k + 1, num):
+                if (i, k) not in nonzeros:
+                    continue
+                code_lines.append(f'  _W_{i}_{k} = _W_{i}_{k} / _W_{k}_{k}')
+                for j in range(k + 1, num):
+                    if (k, j) in nonzeros:
+                        code_lines.append(f'  _W_{i}_{j} = _W_{i}_{j} - _W_{i}_{k} * _W_{k}_{j}')
+                        nonzeros.add((i, j))
+        return nonzeros
+
+    @staticmethod
+    def lu_solve(nonzeros, rhs, results, code_lines):
+        # solve "_W * results = rhs" by the factorized "_W"
+        num = len(rhs)
+        for i in range(num):
+            terms = ''.join([f' - _W_{i}_{k} * {results[k]}' for k in range(i) if (i, k) in nonzeros])
+            code_lines.append(f'  {results[i]} = {rhs[i]}{terms}')
+        for i in reversed(range(num)):
+            terms = ''.join([f' - _W_{i}_{j} * {results[j]}' for j in range(i + 1, num) if (i, j) in nonzeros])
+            code_lines.append(f'  {results[i]} = ({results[i]}{terms}) / _W_{i}_{i}')
+
     @staticmethod
     def compile_and_assign_attrs(code_lines, code_scope, show_code,
                                  func_name, variables, parameters,
                                  dt, var_type):
-        driver_cls = backend.get_diffint_driver()
-        driver = driver_cls(code_scope=code_scope,
-                            code_lines=code_lines,
-                            func_name=func_name,
-                            show_code=show_code,
-                            uploads=dict(variables=variables,
-                                         parameters=parameters,
-                                         origin_f=code_scope['f'],
-                                         var_type=var_type,
-                                         dt=dt))
-        return driver.build()
+        return caching.build(code_lines=code_lines,
+                             code_scope=code_scope,
+                             func_name=func_name,
+                             show_code=show_code,
+                             uploads=dict(variables=variables,
+                                          parameters=parameters,
+                                          origin_f=code_scope['f'],
+                                          var_type=var_type,
+                                          dt=dt))
 
 
 def general_rk_wrapper(f, show_code, dt, A, B, C, var_type, im_return):
@@ -229,7 +336,10 @@ def adaptive_rk_wrapper(f, dt, A, B1, B2, C, tol, adaptive, show_code, var_type,
         The B2 vector in the Butcher tableau.
     C : tuple, list
         The C vector in the Butcher tableau.
-    adaptive : bool
+    adaptive : bool, str
+        If ``True``, the integrator receives the step size as the last argument,
+        and returns the new step size. If ``'element'``, each element of the
+        population variables has its own step size (see :py:func:`element_adaptive_rk_wrapper`).
     tol : float
     var_type : str
 
@@ -240,6 +350,9 @@ def adaptive_rk_wrapper(f, dt, A, B1, B2, C, tol, adaptive, show_code, var_type,
     """
     if var_type not in constants.SUPPORTED_VAR_TYPE:
         raise errors.IntegratorError(f'"var_type" only supports {constants.SUPPORTED_VAR_TYPE}, not {var_type}.')
+    if adaptive == 'element':
+        return element_adaptive_rk_wrapper(f, dt=dt, A=A, B1=B1, B2=B2, C=C, tol=tol,
+                                           show_code=show_code, var_type=var_type)
 
     class_kw, variables, parameters, arguments = utils.get_args(f)
     dt_var = 'dt'
@@ -297,6 +410,124 @@ def adaptive_rk_wrapper(f, dt, A, B1, B2, C, tol, adaptive, show_code, var_type,
         dt=dt, var_type=var_type)
 
 
+def element_adaptive_rk_wrapper(f, dt, A, B1, B2, C, tol, show_code, var_type):
+    """Adaptive Runge-Kutta numerical method, in which each element of the
+    population variables has its own step size.
+
+    The integrator advances each element from :math:`t` to :math:`t + \\Delta t`
+    (the global step ``dt``) by its own sub-steps. The sub-step :math:`h_i` of
+    the element :math:`i` is accepted if the local error estimated by the
+    embedded method :math:`e_i \\le tol`, and the next sub-step is
+
+    .. math::
+
+        h_i \\leftarrow \\min(\\max(0.9 h_i (tol / e_i)^{0.2}, 0.2 h_i), 5 h_i).
+
+    Therefore, a stiff element only reduces its own step size, rather than the
+    step size of the whole population. The integrator receives the per-element
+    step sizes as the last argument (a scalar for the first call), and returns
+    the new ones, like
+
+    >>> V, m, dts = int_f(V, m, t, I, dts)
+
+    The variables must be the one-dimensional arrays, and the parameters can be
+    the arrays of the same length or the scalars. With the Numba backend, the
+    loop over the elements is compiled together with the derivative function.
+
+    Parameters
+    ----------
+    f : callable
+        The derivative function.
+    dt : float
+        The global step size.
+    A : tuple, list
+        The A matrix in the Butcher tableau.
+    B1 : tuple, list
+        The B1 vector in the Butcher tableau.
+    B2 : tuple, list
+        The B2 vector in the Butcher tableau.
+    C : tuple, list
+        The C vector in the Butcher tableau.
+    tol : float
+        The tolerance of the local error of each element.
+    show_code : bool
+        Whether show the formatted code.
+    var_type : str
+        The variable type, must be the population variable.
+
+    Returns
+    -------
+    integral_func : callable
+        The one-step numerical integration function.
+    """
+    if var_type != constants.POPU_VAR:
+        raise errors.IntegratorError(f'The element-wise adaptive step size only supports the '
+                                     f'"{constants.POPU_VAR}" variables, not "{var_type}".')
+    class_kw, variables, parameters, arguments = utils.get_args(f)
+    for p in parameters:
+        if p.startswith('*'):
+            raise errors.IntegratorError(f'The element-wise adaptive step size does not '
+                                         f'support the variable arguments "{p}".')
+    func_name = Tools.f_names(f)
+    code_scope = {'f': f, 'tol': tol, '_DT': dt, '_elem': _elem}
+    arguments = list(arguments) + [f'dt={dt}']
+    elem_vars = [f'{v}_i' for v in variables]
+    elem_args = ['t'] + [f'{p}_i' for p in parameters[1:]]
+
+    # the element loop
+    code_lines = [f'def {func_name}({", ".join(arguments)}):',
+                  f'  _t0 = t',
+                  f'  _t_end = t + _DT']
+    for v in variables:
+        code_lines.append(f'  {v}_new = {v} + 0.')
+    code_lines.append(f'  dt_new = {variables[0]} * 0.')
+    code_lines.append(f'  for _i in range({variables[0]}.shape[0]):')
+    for v in variables:
+        code_lines.append(f'    {v}_i = {v}[_i]')
+    for p in parameters[1:]:
+        code_lines.append(f'    {p}_i = _elem({p}, _i)')
+    code_lines.append(f'    h = _elem(dt, _i)')
+    code_lines.append(f'    t = _t0')
+
+    # the sub-steps of the element
+    code_lines.append(f'    while _t_end - t > _DT * 1e-9:')
+    code_lines.append(f'      h_i = min(h, _t_end - t)')
+    step_lines = []
+    Tools.step(elem_vars, 'h_i', A, C, step_lines, elem_args)
+    Tools.update(elem_vars, 'h_i', B1, step_lines)
+    errors_ = []
+    for v in elem_vars:
+        result = []
+        for i, (b1, b2) in enumerate(zip(B1, B2)):
+            diff = (eval(b1) if isinstance(b1, str) else b1) - (eval(b2) if isinstance(b2, str) else b2)
+            if diff != 0.:
+                result.append(f'd{v}_k{i + 1} * h_i * {diff}')
+        if len(result) > 0:
+            step_lines.append(f'  {v}_te = abs({" + ".join(result)})')
+            errors_.append(f'{v}_te')
+    code_lines.extend('    ' + line for line in step_lines)
+    code_lines.append(f'      error = {" + ".join(errors_) if errors_ else "0."}')
+    code_lines.append(f'      if error <= tol or h_i <= _DT * 1e-6:')
+    code_lines.append(f'        t = t + h_i')
+    for v in elem_vars:
+        code_lines.append(f'        {v} = {v}_new')
+    code_lines.append(f'        if h_i < h:')
+    code_lines.append(f'          continue')
+    code_lines.append(f'      h = min(max(0.9 * h_i * (tol / max(error, 1e-300)) ** 0.2, 0.2 * h_i), 5. * h_i)')
+
+    # the results of the element
+    for v in variables:
+        code_lines.append(f'    {v}_new[_i] = {v}_i')
+    code_lines.append(f'    dt_new[_i] = h')
+    return_args = [f'{v}_new' for v in variables] + ['dt_new']
+    code_lines.append(f'  return {", ".join(return_args)}')
+
+    return Tools.compile_and_assign_attrs(
+        code_lines=code_lines, code_scope=code_scope, show_code=show_code,
+        func_name=func_name, variables=variables, parameters=parameters,
+        dt=dt, var_type=var_type)
+
+
 def rk2_wrapper(f, show_code, dt, beta, var_type, im_return):
     class_kw, variables, parameters, arguments = utils.get_args(f)
     func_name = Tools.f_names(f)
@@ -327,15 +558,15 @@ def rk2_wrapper(f, show_code, dt, beta, var_type, im_return):
 
 
 def exp_euler_wrapper(f, show_code, dt, var_type, im_return):
+    if var_type == constants.SYSTEM_VAR:
+        return exp_rosenbrock_wrapper(f, show_code=show_code, dt=dt, var_type=var_type)
+
     try:
         import sympy
         from brainpy.integrators import sympy_analysis
     except ModuleNotFoundError:
         raise errors.PackageMissingError('SymPy must be installed when using exponential euler methods.')
 
-    if var_type == constants.SYSTEM_VAR:
-        raise errors.IntegratorError(f'Exponential Euler method do not support {var_type} variable type.')
-
     dt_var = 'dt'
     class_kw, variables, parameters, arguments = utils.get_args(f)
     func_name = Tools.f_names(f)
@@ -362,55 +593,269 @@ def exp_euler_wrapper(f, show_code, dt, var_type, im_return):
             sd_variables.append(v[0])
         expressions = expressions_for_returns[key]
         var_name = variables[vi]
-        diff_eq = sympy_analysis.SingleDiffEq(var_name=var_name,
-                                              variables=sd_variables,
-                                              expressions=expressions,
-                                              derivative_expr=key,
-                                              scope=code_scope,
-                                              func_name=func_name)
-
-        f_expressions = diff_eq.get_f_expressions(substitute_vars=diff_eq.var_name)
-
-        # code lines
-        code_lines.extend([f"  {str(expr)}" for expr in f_expressions[:-1]])
-
-        # get the linear system using sympy
-        f_res = f_expressions[-1]
-        df_expr = sympy_analysis.str2sympy(f_res.code).expr.expand()
-        s_df = sympy.Symbol(f"{f_res.var_name}")
-        code_lines.append(f'  {s_df.name} = {sympy_analysis.sympy2str(df_expr)}')
-        var = sympy.Symbol(diff_eq.var_name, real=True)
-
-        # get df part
-        s_linear = sympy.Symbol(f'_{diff_eq.var_name}_linear')
-        s_linear_exp = sympy.Symbol(f'_{diff_eq.var_name}_linear_exp')
-        s_df_part = sympy.Symbol(f'_{diff_eq.var_name}_df_part')
-        if df_expr.has(var):
-            # linear
-            linear = sympy.collect(df_expr, var, evaluate=False)[var]
-            code_lines.append(f'  {s_linear.name} = {sympy_analysis.sympy2str(linear)}')
-            # linear exponential
-            linear_exp = sympy.exp(linear * dt)
-            code_lines.append(f'  {s_linear_exp.name} = {sympy_analysis.sympy2str(linear_exp)}')
-            # df part
-            df_part = (s_linear_exp - 1) / s_linear * s_df
-            code_lines.append(f'  {s_df_part.name} = {sympy_analysis.sympy2str(df_part)}')
+        lines, update = sympy_analysis.exp_euler_derivation(var_name=var_name,
+                                                            variables=sd_variables,
+                                                            expressions=expressions,
+                                                            derivative_expr=key,
+                                                            dt=dt,
+                                                            func_name=func_name)
+        code_lines.extend(lines)
+
+        # The actual update step
+        code_lines.append(f'  {var_name}_new = {update}')
+        code_lines.append('')
+
+    code_lines.append(f'  return {", ".join([f"{v}_new" for v in variables])}')
+    return Tools.compile_and_assign_attrs(
+        code_lines=code_lines, code_scope=code_scope, show_code=show_code,
+        func_name=func_name, variables=variables, parameters=parameters,
+        dt=dt, var_type=var_type)
+
+
+def _check_implicit(var_type, jacobian):
+    if var_type == constants.SYSTEM_VAR:
+        raise errors.IntegratorError(f'The implicit methods do not support {var_type} variable type.')
+    if var_type not in constants.SUPPORTED_VAR_TYPE:
+        raise errors.IntegratorError(f'"var_type" only supports {constants.SUPPORTED_VAR_TYPE}, not {var_type}.')
+    if jacobian not in ['full', 'diagonal']:
+        raise errors.IntegratorError(f'"jacobian" only supports "full" and "diagonal", not "{jacobian}".')
+
+
+def bdf_wrapper(f, show_code, dt, var_type, jacobian, num_iter, order):
+    """The backward differentiation formula (BDF) methods for the stiff
+    ordinary differential equations.
+
+    The implicit equation of the BDF method of the order :math:`q`,
+
+    .. math::
+
+        y_{n+1} - \\sum_{j=0}^{q-1} \\alpha_j y_{n-j} = \\beta h f(t_{n+1}, y_{n+1}),
+
+    is solved by ``num_iter`` simplified Newton iterations starting from
+    :math:`y_n`, in which the Jacobian :math:`J` is evaluated once at
+    :math:`(t_{n+1}, y_n)` by the finite differences. The Jacobian is the
+    matrix of the variables of each element ("full") or its diagonal
+    ("diagonal"), so that the linear equations :math:`(I - \\beta h J) \\delta = r`
+    are solved element-wise over the population by the unrolled LU
+    factorization.
+
+    ``order=1`` is the backward Euler method. ``order=2`` is the variable-order
+    method, which uses the backward Euler method if the previous values
+    are not provided, and the second order BDF method otherwise. Its
+    integrator receives and returns the previous values, like
+
+    >>> V, m, V_prev, m_prev = int_f(V, m, t, I, V_prev, m_prev)
+
+    where ``V_prev`` and ``m_prev`` are ``None`` at the first step.
+
+    Parameters
+    ----------
+    f : callable
+        The derivative function.
+    show_code : bool
+        Whether show the formatted code.
+    dt : float
+        The numerical precision.
+    var_type : str
+        The variable type.
+    jacobian : str
+        "full" or "diagonal".
+    num_iter : int
+        The number of the Newton iterations.
+    order : int
+        The maximum order.
+
+    Returns
+    -------
+    integral_func : callable
+        The one-step numerical integration function.
+    """
+    _check_implicit(var_type, jacobian)
+    class_kw, variables, parameters, arguments = utils.get_args(f)
+    func_name = Tools.f_names(f)
+    code_scope = {'f': f, 'dt': dt}
+    if order == 2:
+        arguments = list(arguments) + [f'{v}_prev=None' for v in variables]
 
+    # the formula
+    code_lines = [f'def {func_name}({", ".join(arguments)}):']
+    if order == 2:
+        code_lines.append(f'  if {variables[0]}_prev is None:')
+        code_lines.extend([f'    {v}_base = {v}' for v in variables])
+        code_lines.append(f'    _beta_dt = dt')
+        code_lines.append(f'  else:')
+        code_lines.extend([f'    {v}_base = {v} * 4 / 3 - {v}_prev / 3' for v in variables])
+        code_lines.append(f'    _beta_dt = dt * 2 / 3')
+    else:
+        code_lines.extend([f'  {v}_base = {v}' for v in variables])
+        code_lines.append(f'  _beta_dt = dt')
+
+    # the Jacobian and the factorization
+    code_lines.append(f'  _t_new = t + dt')
+    f0 = Tools.jacobian(variables, '_t_new', parameters[1:], jacobian, code_lines)
+    nonzeros = Tools.lu_factor(len(variables), '_beta_dt', jacobian, code_lines)
+
+    # the Newton iterations
+    news = [f'{v}_new' for v in variables]
+    code_lines.extend([f'  {v}_new = {v}' for v in variables])
+    for i in range(num_iter):
+        if i == 0:
+            derivatives = f0
         else:
-            # linear exponential
-            code_lines.append(f'  {s_linear_exp.name} = sqrt({dt})')
-            # df part
-            code_lines.append(f'  {s_df_part.name} = {sympy_analysis.sympy2str(dt * s_df)}')
+            derivatives = [f'_F_{v}' for v in variables]
+            code_lines.append(f'  {", ".join(derivatives)} = f({", ".join(news + ["_t_new"] + parameters[1:])})')
+        for v, d in zip(variables, derivatives):
+            code_lines.append(f'  _r_{v} = {v}_new - {v}_base - _beta_dt * {d}')
+        deltas = [f'_d_{v}' for v in variables]
+        Tools.lu_solve(nonzeros, [f'_r_{v}' for v in variables], deltas, code_lines)
+        code_lines.extend([f'  {v}_new = {v}_new - _d_{v}' for v in variables])
 
-        # update expression
-        update = var + s_df_part
+    # returns
+    return_args = news + (list(variables) if order == 2 else [])
+    code_lines.append(f'  return {", ".join(return_args)}')
+    return Tools.compile_and_assign_attrs(
+        code_lines=code_lines, code_scope=code_scope, show_code=show_code,
+        func_name=func_name, variables=variables, parameters=parameters,
+        dt=dt, var_type=var_type)
 
-        # The actual update step
-        code_lines.append(f'  {diff_eq.var_name}_new = {sympy_analysis.sympy2str(update)}')
-        code_lines.append('')
 
+def rosenbrock_w_wrapper(f, show_code, dt, var_type, jacobian):
+    """The second order, L-stable Rosenbrock-W method (ROS2) for the stiff
+    ordinary differential equations [1]_.
+
+    .. math::
+
+        (I - \\gamma h J) k_1 & = f(t_n, y_n) + \\gamma h f_t \\\\
+        (I - \\gamma h J) k_2 & = f(t_n + h, y_n + h k_1) - 2 k_1 - \\gamma h f_t \\\\
+        y_{n+1} & = y_n + \\frac{3}{2} h k_1 + \\frac{1}{2} h k_2
+
+    where :math:`\\gamma = 1 + 1 / \\sqrt{2}`. As a W-method, it keeps the
+    second order for any approximation :math:`J` of the Jacobian, which is
+    evaluated by the finite differences of the variables of each element
+    ("full") or its diagonal ("diagonal"). The time derivative :math:`f_t`
+    of the non-autonomous equations is also evaluated by the finite difference.
+
+    Parameters
+    ----------
+    f : callable
+        The derivative function.
+    show_code : bool
+        Whether show the formatted code.
+    dt : float
+        The numerical precision.
+    var_type : str
+        The variable type.
+    jacobian : str
+        "full" or "diagonal".
+
+    Returns
+    -------
+    integral_func : callable
+        The one-step numerical integration function.
+
+    References
+    ----------
+    .. [1] Verwer, Jan G., et al. "A second-order Rosenbrock method applied to
+           photochemical dispersion problems." SIAM Journal on Scientific
+           Computing 20.4 (1999): 1456-1480.
+    """
+    _check_implicit(var_type, jacobian)
+    class_kw, variables, parameters, arguments = utils.get_args(f)
+    func_name = Tools.f_names(f)
+    code_scope = {'f': f, 'dt': dt, '_gamma_dt': (1 + 1 / 2 ** 0.5) * dt}
+
+    code_lines = [f'def {func_name}({", ".join(arguments)}):']
+    f0 = Tools.jacobian(variables, 't', parameters[1:], jacobian, code_lines)
+    nonzeros = Tools.lu_factor(len(variables), '_gamma_dt', jacobian, code_lines)
+    # the time derivative
+    code_lines.append(f'  _eps_t = 1.49e-8 * (t * t + 1.) ** 0.5')
+    ft = [f'_ft_{v}' for v in variables]
+    code_lines.append(f'  {", ".join(ft)} = f({", ".join(variables + ["t + _eps_t"] + parameters[1:])})')
+    code_lines.extend([f'  _ft_{v} = (_ft_{v} - _f0_{v}) / _eps_t * _gamma_dt' for v in variables])
+    # stage 1
+    k1 = [f'd{v}_k1' for v in variables]
+    Tools.lu_solve(nonzeros, [f'{a} + {b}' for a, b in zip(f0, ft)], k1, code_lines)
+    # stage 2
+    k2_args = [f'{v} + dt * d{v}_k1' for v in variables]
+    f2 = [f'_f_{v}_k2' for v in variables]
+    code_lines.append(f'  {", ".join(f2)} = f({", ".join(k2_args + ["t + dt"] + parameters[1:])})')
+    k2 = [f'd{v}_k2' for v in variables]
+    Tools.lu_solve(nonzeros, [f'{a} - 2 * {b} - {c}' for a, b, c in zip(f2, k1, ft)], k2, code_lines)
+    # update
+    for v in variables:
+        code_lines.append(f'  {v}_new = {v} + dt * (1.5 * d{v}_k1 + 0.5 * d{v}_k2)')
     code_lines.append(f'  return {", ".join([f"{v}_new" for v in variables])}')
     return Tools.compile_and_assign_attrs(
         code_lines=code_lines, code_scope=code_scope, show_code=show_code,
         func_name=func_name, variables=variables, parameters=parameters,
         dt=dt, var_type=var_type)
+
+
+def exp_rosenbrock_wrapper(f, show_code, dt, var_type):
+    """The exponential Rosenbrock-Euler method for the coupled system variable.
+
+    For the system :math:`x^{\\prime} = f(t, x)` of :math:`n` coupled
+    variables, the linear part is the Jacobian :math:`J = f^{\\prime}(x_n)`
+    of each element, and the schema is
+
+    .. math::
+
+        x_{n+1} = x_n + h \\varphi_1(h J) f(t_n, x_n)
+
+    where :math:`\\varphi_1(z) = (e^{z} - 1) / z`. It is exact for the linear
+    systems with the constant coefficients, and is of the second order for
+    the autonomous nonlinear systems. The Jacobian is evaluated by the
+    finite differences, and :math:`h \\varphi_1(h J) f` is the last column of
+    the exponential of the augmented matrix
+
+    .. math::
+
+        \\exp \\begin{pmatrix} hJ & hf \\\\ 0 & 0 \\end{pmatrix},
+
+    which is computed element by element by the scaling and squaring method.
+
+    The system variable ``x`` has the shape of ``(n,)`` for a single element,
+    or ``(n, ...)`` for a population, of which the first axis is the variables.
+
+    Parameters
+    ----------
+    f : callable
+        The derivative function.
+    show_code : bool
+        Whether show the formatted code.
+    dt : float
+        The numerical precision.
+    var_type : str
+        The variable type.
+
+    Returns
+    -------
+    integral_func : callable
+        The one-step numerical integration function.
+    """
+    class_kw, variables, parameters, arguments = utils.get_args(f)
+    if len(variables) != 1:
+        raise errors.IntegratorError(f'The {constants.SYSTEM_VAR} variable type only supports one '
+                                     f'variable, but we got {variables}.')
+    x = variables[0]
+    func_name = Tools.f_names(f)
+    code_scope = {'f': f, 'dt': dt, 'zeros': ops.zeros, '_phi1_mv': _phi1_mv}
+    f_args = ", ".join(parameters)
+
+    code_lines = [f'def {func_name}({", ".join(arguments)}):',
+                  f'  _f0 = f({x}, {f_args})',
+                  f'  _num = {x}.shape[0]',
+                  f'  _size = _f0.size // _num',
+                  f'  _J = zeros((_num,) + {x}.shape)',
+                  f'  for _j in range(_num):',
+                  f'    _eps = 1.49e-8 * ({x}[_j] * {x}[_j] + 1.) ** 0.5',
+                  f'    _x = {x} + 0.',
+                  f'    _x[_j] = {x}[_j] + _eps',
+                  f'    _J[_j] = (f(_x, {f_args}) - _f0) / _eps',
+                  f'  _dx = _phi1_mv(_J.reshape((_num, _num, _size)), _f0.reshape((_num, _size)), dt)',
+                  f'  {x}_new = {x} + _dx.reshape({x}.shape)',
+                  f'  return {x}_new']
+    return Tools.compile_and_assign_attrs(
+        code_lines=code_lines, code_scope=code_scope, show_code=show_code,
+        func_name=func_name, variables=variables, parameters=parameters,
+        dt=dt, var_type=var_type)
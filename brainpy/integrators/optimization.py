@@ -0,0 +1,540 @@
+# -*- coding: utf-8 -*-
+
+"""
+Optimization of the generated integrator code.
+
+The Runge-Kutta and the stochastic Runge-Kutta methods call the
+derivative functions ``f`` (and ``g``) several times in each step, as
+the opaque functions. The optimization inlines the bodies of the
+derivative functions into the generated code, and then eliminates the
+common subexpressions across the stages. Therefore, the terms which
+only depend on the parameters (like ``gNa * ENa``) or on the arguments
+shared by the stages (like the time ``t``) are evaluated once per step,
+rather than once per stage. Moreover, the subexpressions which only
+depend on the numbers and the numerical constants (like ``dt * 0.5``)
+are folded at the code generation, and the unused assignments (like
+the time of the stages, if ``f`` does not use ``t``) are removed.
+
+The optimization is opt-in in the integrators, by the ``optimize`` keyword:
+
+>>> @odeint(method='rk4', optimize=True)
+>>> def int_v(v, t, p):
+>>>     ...
+
+The bound methods of the models (such as ``self.dev_V``) are inlined
+with the bound instance, whose attributes are read at each step rather
+than folded. The optimized code is shown by ``show_code=True``, and is
+cached like the other generated code. Only the straight-line code of the assignments
+is optimized. The derivative functions with the control flows (such as
+the ``if`` conditions and the ``for`` loops) are not inlined, and the
+generated code with the control flows (such as the adaptive Runge-Kutta
+methods) is kept unchanged.
+"""
+
+import ast
+import builtins
+import copy
+import inspect
+
+import numpy as np
+
+from brainpy import backend
+from brainpy import tools
+from brainpy.integrators import tables
+
+__all__ = [
+    'optimize_code',
+]
+
+# the derivative functions to inline
+_DERIVATIVE_NAMES = ('f', 'g')
+# the modules of the pure functions
+_PURE_MODULES = ('numpy', 'math', 'cmath')
+_PURE_BUILTINS = (abs, min, max, pow, round, float, int)
+# the nodes to be replaced by the common subexpressions
+_CSE_NODES = (ast.BinOp, ast.UnaryOp, ast.Compare, ast.BoolOp, ast.IfExp, ast.Call, ast.Subscript)
+# the nodes to be folded if they only depend on the constants
+_FOLD_NODES = (ast.BinOp, ast.UnaryOp, ast.Call)
+# "ast.NamedExpr" is only defined from Python 3.8
+_UNSUPPORTED_NODES = (ast.Lambda, ast.comprehension, ast.Starred, ast.Yield,
+                      ast.YieldFrom, ast.Await) + ((ast.NamedExpr,) if hasattr(ast, 'NamedExpr') else ())
+_MISSING = object()
+
+
+class _NotOptimizable(Exception):
+    pass
+
+
+# utilities
+# ---------
+
+def _resolve(node, scope):
+    """Get the value of a name, or an attribute of a name, in the scope."""
+    if isinstance(node, ast.Name):
+        value = scope.get(node.id, _MISSING)
+        if value is _MISSING:
+            value = getattr(builtins, node.id, _MISSING)
+        return value
+    if isinstance(node, ast.Attribute):
+        value = _resolve(node.value, scope)
+        return _MISSING if value is _MISSING else getattr(value, node.attr, _MISSING)
+    return _MISSING
+
+
+def _is_pure(func):
+    if isinstance(func, np.ufunc) or func is tables.table_interp:
+        return True
+    if any(func is f for f in _PURE_BUILTINS):
+        return True
+    if getattr(func, '__self__', None) is not None:
+        # the bound methods, such as "np.random.normal"
+        return False
+    module = getattr(func, '__module__', None) or ''
+    return module.split('.')[0] in _PURE_MODULES and 'random' not in module
+
+
+def _stored_names(stmts):
+    return [n.id for stmt in stmts for n in ast.walk(stmt)
+            if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)]
+
+
+def _loaded_names(node):
+    return set(n.id for n in ast.walk(node) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load))
+
+
+def _fresh_name(name, used):
+    new_name, i = name, 0
+    while new_name in used:
+        i += 1
+        new_name = f'{name}_{i}'
+    used.add(new_name)
+    return new_name
+
+
+def _assign(name, value):
+    return ast.Assign(targets=[ast.Name(id=name, ctx=ast.Store())], value=value, lineno=0)
+
+
+def _check_straight_line(stmts, aug_assign=True):
+    for stmt in stmts:
+        if isinstance(stmt, ast.Assign):
+            for target in stmt.targets:
+                elements = target.elts if isinstance(target, ast.Tuple) else [target]
+                if not all(isinstance(t, ast.Name) for t in elements):
+                    raise _NotOptimizable
+        elif isinstance(stmt, ast.AugAssign):
+            if not (aug_assign and isinstance(stmt.target, ast.Name)):
+                raise _NotOptimizable
+        elif not isinstance(stmt, (ast.Expr, ast.Return)):
+            raise _NotOptimizable
+        if any(isinstance(n, _UNSUPPORTED_NODES) for n in ast.walk(stmt)):
+            raise _NotOptimizable
+
+
+class _Renamer(ast.NodeTransformer):
+    def __init__(self, names, values):
+        self.names = names  # name => new name
+        self.values = values  # name => the substituted expression
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Load) and node.id in self.values:
+            return ast.copy_location(copy.deepcopy(self.values[node.id]), node)
+        if node.id in self.names:
+            return ast.copy_location(ast.Name(id=self.names[node.id], ctx=node.ctx), node)
+        return node
+
+
+# inlining
+# --------
+
+def _parse_derivative(func):
+    if not inspect.isfunction(func):
+        raise _NotOptimizable
+    try:
+        func_def = ast.parse(tools.deindent(tools.get_func_source(func))).body[0]
+    except (OSError, TypeError, SyntaxError, IndexError):
+        raise _NotOptimizable
+    if not isinstance(func_def, ast.FunctionDef):
+        raise _NotOptimizable
+    body = func_def.body
+    if isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant):
+        body = body[1:]  # the docstring
+    _check_straight_line(body)
+    if not body or not isinstance(body[-1], ast.Return) or body[-1].value is None:
+        raise _NotOptimizable
+    if any(isinstance(stmt, ast.Return) for stmt in body[:-1]):
+        raise _NotOptimizable
+    for par in inspect.signature(func).parameters.values():
+        if par.kind not in (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY):
+            raise _NotOptimizable
+    # the augmented assignments are not in-place, so that the arguments are not modified
+    stmts = []
+    for stmt in copy.deepcopy(body[:-1]):
+        if isinstance(stmt, ast.AugAssign):
+            value = ast.BinOp(left=ast.Name(id=stmt.target.id, ctx=ast.Load()), op=stmt.op, right=stmt.value)
+            stmt = ast.Assign(targets=[stmt.target], value=value, lineno=0)
+        stmts.append(stmt)
+    return stmts, copy.deepcopy(body[-1].value)
+
+
+def _inline(stmt, func, tag, code_scope, used, instances):
+    """Inline the call ``targets = func(args)`` as the body of ``func``."""
+    call = stmt.value
+    if len(stmt.targets) != 1 or any(k.arg is None for k in call.keywords):
+        raise _NotOptimizable
+    call_args = list(call.args)
+    if inspect.ismethod(func):
+        # the bound instance is passed by a name of the code scope
+        instance, func = func.__self__, func.__func__
+        pars = list(inspect.signature(func).parameters)
+        if not pars:
+            raise _NotOptimizable
+        name = next((n for n in instances if code_scope[n] is instance), None)
+        if name is None:
+            name = _fresh_name(pars[0], used)
+            code_scope[name] = instance
+            instances.add(name)
+        call_args.insert(0, ast.Name(id=name, ctx=ast.Load()))
+    body, returns = _parse_derivative(func)
+    try:
+        bound = inspect.signature(func).bind(*call_args, **{k.arg: k.value for k in call.keywords})
+    except TypeError:
+        raise _NotOptimizable
+    bound.apply_defaults()
+
+    assigned = set(_stored_names(body))
+    names, values, new_stmts = {}, {}, []
+
+    # the arguments
+    for par, arg in bound.arguments.items():
+        if not isinstance(arg, ast.AST):
+            # the default value
+            if isinstance(arg, (type(None), bool, int, float, str)):
+                arg = ast.Constant(value=arg, kind=None)
+            else:
+                name = _fresh_name(f'{par}_{tag}_default', used)
+                code_scope[name] = arg
+                arg = ast.Name(id=name, ctx=ast.Load())
+        if isinstance(arg, (ast.Name, ast.Constant)) and par not in assigned:
+            values[par] = arg
+        else:
+            names[par] = _fresh_name(f'{par}_{tag}', used)
+            new_stmts.append(_assign(names[par], arg))
+
+    # the local variables, the returned variables are directly assigned to the targets
+    target = stmt.targets[0]
+    arg_names = _loaded_names(call)
+    if isinstance(target, ast.Tuple) and isinstance(returns, ast.Tuple) and len(target.elts) == len(returns.elts):
+        pairs = list(zip(target.elts, returns.elts))
+    else:
+        pairs = [(target, returns)]
+    for t, r in pairs:
+        if (isinstance(t, ast.Name) and isinstance(r, ast.Name) and r.id in assigned and r.id not in names
+                and t.id not in arg_names and t.id not in assigned):
+            names[r.id] = t.id
+    for name in assigned:
+        if name not in names:
+            names[name] = _fresh_name(f'{name}_{tag}', used)
+
+    # the global variables
+    closure_vars = inspect.getclosurevars(func)
+    func_scope = dict(func.__globals__)
+    func_scope.update(closure_vars.nonlocals)
+    for node in body + [returns]:
+        for name in _loaded_names(node) - assigned - set(bound.arguments):
+            value = _resolve(ast.Name(id=name, ctx=ast.Load()), func_scope)
+            if value is _MISSING:
+                raise _NotOptimizable
+            if code_scope.get(name, _MISSING) is value:
+                continue
+            if name not in code_scope and name not in used and getattr(builtins, name, _MISSING) is value:
+                continue
+            if name in code_scope or name in used:
+                names[name] = _fresh_name(f'{name}_{tag}', used)
+                code_scope[names[name]] = value
+            else:
+                used.add(name)
+                code_scope[name] = value
+
+    renamer = _Renamer(names, values)
+    new_stmts.extend(renamer.visit(s) for s in body)
+    returns = renamer.visit(returns)
+    if len(pairs) > 1:
+        pairs = list(zip(target.elts, returns.elts))
+    else:
+        pairs = [(target, returns)]
+    results = []
+    for t, r in pairs:
+        if not (isinstance(r, ast.Name) and isinstance(t, ast.Name) and r.id == t.id):
+            results.append((t, r))
+    target_names = set(_stored_names([stmt]))
+    if len(results) > 1 and any(target_names & _loaded_names(r) for _, r in results):
+        new_stmts.append(ast.Assign(targets=[target], value=returns, lineno=0))
+    else:
+        new_stmts.extend(ast.Assign(targets=[t], value=r, lineno=0) for t, r in results)
+    return new_stmts
+
+
+def _inline_all(body, code_scope, used, instances):
+    new_body = []
+    num = {}
+    for stmt in body:
+        if (isinstance(stmt, ast.Assign) and isinstance(stmt.value, ast.Call)
+                and isinstance(stmt.value.func, ast.Name) and stmt.value.func.id in _DERIVATIVE_NAMES):
+            name = stmt.value.func.id
+            num[name] = num.get(name, 0) + 1
+            try:
+                new_body.extend(_inline(stmt, code_scope.get(name), f'{name}{num[name]}',
+                                        code_scope, used, instances))
+                continue
+            except _NotOptimizable:
+                pass
+        new_body.append(stmt)
+    return new_body
+
+
+# constant folding
+# ----------------
+
+class _Folder(ast.NodeTransformer):
+    def __init__(self, local_names, scope):
+        self.local_names = local_names
+        self.scope = scope
+
+    def _is_constant(self, node):
+        if isinstance(node, ast.Constant):
+            return isinstance(node.value, (bool, int, float))
+        if isinstance(node, (ast.Name, ast.Attribute)):
+            if any(n.id in self.local_names for n in ast.walk(node) if isinstance(n, ast.Name)):
+                return False
+            return isinstance(_resolve(node, self.scope), (bool, int, float, np.number))
+        if isinstance(node, ast.BinOp):
+            return self._is_constant(node.left) and self._is_constant(node.right)
+        if isinstance(node, ast.UnaryOp):
+            return self._is_constant(node.operand)
+        if isinstance(node, ast.Call):
+            if node.keywords or any(n.id in self.local_names for n in ast.walk(node.func) if isinstance(n, ast.Name)):
+                return False
+            return _is_pure(_resolve(node.func, self.scope)) and all(self._is_constant(a) for a in node.args)
+        return False
+
+    def visit(self, node):
+        if (isinstance(node, _FOLD_NODES) and self._is_constant(node)
+                and any(isinstance(n, (ast.Name, ast.Call)) for n in ast.walk(node))):
+            try:
+                with np.errstate(all='raise'):
+                    value = eval(compile(ast.fix_missing_locations(ast.Expression(body=node)), '', 'eval'),
+                                 dict(self.scope))
+            except Exception:
+                return super(_Folder, self).visit(node)
+            if isinstance(value, (bool, np.bool_)):
+                value = bool(value)
+            elif isinstance(value, (int, np.integer)):
+                value = int(value)
+            elif isinstance(value, (float, np.floating)):
+                value = float(value)
+            else:
+                return super(_Folder, self).visit(node)
+            if value < 0:
+                constant = ast.UnaryOp(op=ast.USub(), operand=ast.Constant(value=-value, kind=None))
+            else:
+                constant = ast.Constant(value=value, kind=None)
+            return ast.copy_location(constant, node)
+        return super(_Folder, self).visit(node)
+
+
+# common subexpression elimination
+# --------------------------------
+
+class _Numbering(object):
+    """The value numbering of the expressions in the straight-line code.
+
+    The key of an expression is its structure, in which the local names
+    are versioned by their assignments. Therefore, two expressions with the
+    same key evaluate to the same value.
+    """
+
+    def __init__(self, local_names, scope):
+        self.local_names = local_names
+        self.scope = scope
+        self.versions = {}
+        self.occurrences = {}  # key => [(statement index, node, size)]
+
+    def key(self, node):
+        if isinstance(node, ast.Name):
+            if node.id in self.local_names:
+                return 'name', node.id, self.versions.get(node.id, 0)
+            return 'global', node.id
+        if isinstance(node, ast.AST):
+            return (type(node).__name__,) + tuple(self.key(v) for f, v in ast.iter_fields(node) if f != 'ctx')
+        if isinstance(node, list):
+            return tuple(self.key(v) for v in node)
+        return type(node).__name__, repr(node)
+
+    def _visit(self, node, index):
+        """Record the candidate subexpressions, and return whether the node is pure."""
+        pure = True
+        if isinstance(node, (ast.IfExp, ast.BoolOp)):
+            # the lazily evaluated operands are not moved out
+            for n in ast.walk(node):
+                if isinstance(n, ast.Call) and not _is_pure(_resolve(n.func, self.scope)):
+                    pure = False
+        else:
+            for child in ast.iter_child_nodes(node):
+                pure = self._visit(child, index) and pure
+            if isinstance(node, ast.Call) and not _is_pure(_resolve(node.func, self.scope)):
+                pure = False
+        if pure and isinstance(node, _CSE_NODES):
+            if not (isinstance(node, ast.UnaryOp) and isinstance(node.operand, ast.Constant)):
+                size = sum(1 for _ in ast.walk(node))
+                self.occurrences.setdefault(self.key(node), []).append((index, node, size))
+        return pure
+
+    def run(self, body):
+        for i, stmt in enumerate(body):
+            if isinstance(stmt, (ast.Assign, ast.AugAssign, ast.Return, ast.Expr)) and stmt.value is not None:
+                self._visit(stmt.value, i)
+            for name in _stored_names([stmt]):
+                self.versions[name] = self.versions.get(name, 0) + 1
+        return self
+
+
+class _Replacer(ast.NodeTransformer):
+    def __init__(self, nodes, name):
+        self.nodes = set(id(n) for n in nodes)
+        self.name = name
+
+    def visit(self, node):
+        if id(node) in self.nodes:
+            return ast.copy_location(ast.Name(id=self.name, ctx=ast.Load()), node)
+        return super(_Replacer, self).visit(node)
+
+
+def _eliminate_common(body, local_names, scope, used):
+    assign_times = {}
+    for name in _stored_names(body):
+        assign_times[name] = assign_times.get(name, 0) + 1
+    while True:
+        numbering = _Numbering(local_names, scope).run(body)
+        repeated = [occ for occ in numbering.occurrences.values() if len(occ) > 1]
+        if not repeated:
+            return body
+        occurrences = max(repeated, key=lambda occ: (occ[0][2], -occ[0][0]))
+        index, first, _ = occurrences[0]
+        stmt = body[index]
+        if (isinstance(stmt, ast.Assign) and stmt.value is first and isinstance(stmt.targets[0], ast.Name)
+                and len(stmt.targets) == 1 and assign_times[stmt.targets[0].id] == 1
+                and stmt.targets[0].id not in local_names.args):
+            # reuse the variable of the first occurrence
+            name = stmt.targets[0].id
+            replacer = _Replacer([n for _, n, _ in occurrences[1:]], name)
+            body = [replacer.visit(s) for s in body]
+        else:
+            name = _fresh_name('cse', used)
+            local_names.add(name)
+            assign_times[name] = 1
+            replacer = _Replacer([n for _, n, _ in occurrences], name)
+            body = [replacer.visit(s) for s in body]
+            body.insert(index, _assign(name, first))
+
+
+class _LocalNames(set):
+    def __init__(self, args, body):
+        super(_LocalNames, self).__init__(list(args) + _stored_names(body))
+        self.args = set(args)
+
+
+# dead code elimination
+# ---------------------
+
+def _eliminate_dead(body, scope):
+    live = set()
+    new_body = []
+    for stmt in reversed(body):
+        if isinstance(stmt, ast.Assign):
+            targets = _stored_names([stmt])
+            if not (set(targets) & live) and not any(isinstance(n, ast.Call) and not _is_pure(_resolve(n.func, scope))
+                                                     for n in ast.walk(stmt.value)):
+                continue
+            live -= set(targets)
+        live |= _loaded_names(stmt)
+        new_body.append(stmt)
+    return new_body[::-1]
+
+
+def _release(body, args):
+    """Delete the local variables after their last use, so that the
+    memory of the intermediate arrays is reused by the following stages."""
+    last_use = {}
+    for i, stmt in enumerate(body):
+        for name in _loaded_names(stmt):
+            last_use[name] = i
+    local_names = set(_stored_names(body)) - set(args)
+    new_body = []
+    for i, stmt in enumerate(body):
+        new_body.append(stmt)
+        names = sorted(n for n in local_names if last_use.get(n, None) == i)
+        if names and not isinstance(stmt, ast.Return):
+            new_body.append(ast.Delete(targets=[ast.Name(id=n, ctx=ast.Del()) for n in names], lineno=0))
+    return new_body
+
+
+def optimize_code(code_lines, code_scope, func_name):
+    """Optimize the generated code of the integrator.
+
+    The calls of the derivative functions ``f`` and ``g`` are inlined, and
+    then the constant subexpressions are folded, the common subexpressions
+    are evaluated once, and the unused assignments are removed. For the
+    backends without the JIT compilation, the local variables are deleted
+    after their last use, so that the peak memory of the arrays is not
+    increased by the inlining.
+
+    Parameters
+    ----------
+    code_lines : list of str
+        The generated code lines of the function ``func_name``.
+    code_scope : dict
+        The scope of the generated code.
+    func_name : str
+        The name of the generated function.
+
+    Returns
+    -------
+    code : tuple
+        The optimized ``code_lines``, and the ``code_scope`` (with the
+        global variables of the inlined functions). They are returned
+        unchanged if the code is not the straight-line code.
+    """
+    try:
+        tree = ast.parse('\n'.join(code_lines))
+    except SyntaxError:
+        return code_lines, code_scope
+    if len(tree.body) != 1 or not isinstance(tree.body[0], ast.FunctionDef) or tree.body[0].name != func_name:
+        return code_lines, code_scope
+    func_def = tree.body[0]
+    if func_def.args.vararg or func_def.args.kwarg or getattr(func_def.args, 'posonlyargs', []):
+        return code_lines, code_scope
+    args = [a.arg for a in func_def.args.args + func_def.args.kwonlyargs]
+
+    new_scope = dict(code_scope)
+    try:
+        _check_straight_line(func_def.body, aug_assign=False)
+        used = set(new_scope) | set(args) | set(n.id for n in ast.walk(func_def) if isinstance(n, ast.Name))
+        instances = set()
+        body = _inline_all(func_def.body, new_scope, used, instances)
+        _check_straight_line(body, aug_assign=False)
+        local_names = _LocalNames(args, body)
+        # the attributes of the bound instances (such as the model parameters)
+        # are not folded, but are read at each step like the local variables
+        local_names.update(instances)
+        body = [_Folder(local_names, new_scope).visit(stmt) for stmt in body]
+        body = _eliminate_common(body, local_names, new_scope, used)
+        body = _eliminate_dead(body, new_scope)
+        if not backend.get_backend_name().startswith('numba'):
+            # Numba does not support "del", and releases the variables itself
+            body = _release(body, args)
+    except _NotOptimizable:
+        return code_lines, code_scope
+    func_def.body = body
+    code = tools.ast2code(ast.fix_missing_locations(func_def), indent=2)
+    return code.strip('\n').split('\n'), new_scope
@@ -7,3 +7,4 @@ Numerical methods for stochastic differential equations.
 from .euler_and_milstein import *
 from .srk_scalar import *
 
+from .noise import *
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from brainpy import backend
+from brainpy.integrators import caching
 from brainpy.integrators import constants
 from brainpy.integrators import utils
 
@@ -24,17 +24,17 @@ def basic_info(f, g):
 def compile_and_assign_attrs(code_lines, code_scope, show_code,
                              variables, parameters, func_name,
                              sde_type, var_type, wiener_type, dt):
-    driver_cls = backend.get_diffint_driver()
-    driver = driver_cls(code_scope=code_scope,
-                        code_lines=code_lines,
-                        func_name=func_name,
-                        show_code=show_code,
-                        uploads=dict(variables=variables,
-                                     parameters=parameters,
-                                     origin_f=code_scope['f'],
-                                     origin_g=code_scope['g'],
-                                     sde_type=sde_type,
-                                     var_type=var_type,
-                                     wiener_type=wiener_type,
-                                     dt=dt))
-    return driver.build()
+    return caching.build(code_lines=code_lines,
+                         code_scope=code_scope,
+                         func_name=func_name,
+                         show_code=show_code,
+                         uploads=dict(variables=variables,
+                                      parameters=parameters,
+                                      origin_f=code_scope['f'],
+                                      origin_g=code_scope['g'],
+                                      sde_type=sde_type,
+                                      var_type=var_type,
+                                      wiener_type=wiener_type,
+                                      dt=dt,
+                                      # whether it takes the noise buffer arguments
+                                      noise_buffer='noise' in code_scope))
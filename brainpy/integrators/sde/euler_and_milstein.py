@@ -8,6 +8,7 @@ from brainpy.backend import ops
 from brainpy.integrators import constants
 from brainpy.integrators.ast_analysis import separate_variables
 from . import common
+from . import noise
 
 __all__ = [
     'euler',
@@ -39,7 +40,7 @@ class Tools(object):
         code_lines.append('  ')
 
     @staticmethod
-    def noise_terms(code_lines, variables):
+    def noise_terms(code_lines, variables, normal_funcs):
         # num_vars = len(variables)
         # if num_vars > 1:
         #     code_lines.append(f'  all_dW = ops.normal(0.0, dt_sqrt, ({num_vars},)+ops.shape({variables[0]}_dg))')
@@ -50,8 +51,11 @@ class Tools(object):
         #     code_lines.append(f'  {var}_dW = ops.normal(0.0, dt_sqrt, ops.shape({var}))')
         # code_lines.append('  ')
 
+        begin, normal = normal_funcs
+        noise_args = ", ".join(noise.NOISE_ARGS)
+        code_lines.append(f'  {begin}(noise_state)')
         for var in variables:
-            code_lines.append(f'  {var}_dW = ops.normal(0.000, dt_sqrt, ops.shape({var}))')
+            code_lines.append(f'  {var}_dW = {normal}(0.000, dt_sqrt, ops.shape({var}), {noise_args})')
         code_lines.append('  ')
 
 
@@ -145,7 +149,7 @@ class Wrapper(object):
         code_scope['exp'] = ops.exp
 
         # 2. code lines
-        code_lines = [f'def {func_name}({", ".join(arguments)}):']
+        code_lines = [f'def {func_name}({", ".join(noise.noise_arguments(arguments))}):']
 
         # 2.1 dg
         # dg = g(x, t, *args)
@@ -154,7 +158,7 @@ class Wrapper(object):
         code_lines.append('  ')
 
         # 2.2 dW
-        Tools.noise_terms(code_lines, variables)
+        Tools.noise_terms(code_lines, variables, noise.normal_func(code_scope))
 
         # 2.3 dgdW
         # ----
@@ -183,51 +187,16 @@ class Wrapper(object):
                 sd_variables.append(v[0])
             expressions = expressions_for_returns[key]
             var_name = variables[vi]
-            diff_eq = sympy_analysis.SingleDiffEq(var_name=var_name,
-                                                  variables=sd_variables,
-                                                  expressions=expressions,
-                                                  derivative_expr=key,
-                                                  scope=code_scope,
-                                                  func_name=func_name)
-
-            f_expressions = diff_eq.get_f_expressions(substitute_vars=diff_eq.var_name)
-
-            # code lines
-            code_lines.extend([f"  {str(expr)}" for expr in f_expressions[:-1]])
-
-            # get the linear system using sympy
-            f_res = f_expressions[-1]
-            df_expr = sympy_analysis.str2sympy(f_res.code).expr.expand()
-            s_df = sympy.Symbol(f"{f_res.var_name}")
-            code_lines.append(f'  {s_df.name} = {sympy_analysis.sympy2str(df_expr)}')
-            var = sympy.Symbol(diff_eq.var_name, real=True)
-
-            # get df part
-            s_linear = sympy.Symbol(f'_{diff_eq.var_name}_linear')
-            s_linear_exp = sympy.Symbol(f'_{diff_eq.var_name}_linear_exp')
-            s_df_part = sympy.Symbol(f'_{diff_eq.var_name}_df_part')
-            if df_expr.has(var):
-                # linear
-                linear = sympy.collect(df_expr, var, evaluate=False)[var]
-                code_lines.append(f'  {s_linear.name} = {sympy_analysis.sympy2str(linear)}')
-                # linear exponential
-                linear_exp = sympy.exp(linear * dt)
-                code_lines.append(f'  {s_linear_exp.name} = {sympy_analysis.sympy2str(linear_exp)}')
-                # df part
-                df_part = (s_linear_exp - 1) / s_linear * s_df
-                code_lines.append(f'  {s_df_part.name} = {sympy_analysis.sympy2str(df_part)}')
-
-            else:
-                # linear exponential
-                code_lines.append(f'  {s_linear_exp.name} = sqrt({dt})')
-                # df part
-                code_lines.append(f'  {s_df_part.name} = {sympy_analysis.sympy2str(dt * s_df)}')
-
-            # update expression
-            update = var + s_df_part
+            lines, update = sympy_analysis.exp_euler_derivation(var_name=var_name,
+                                                                variables=sd_variables,
+                                                                expressions=expressions,
+                                                                derivative_expr=key,
+                                                                dt=dt,
+                                                                func_name=func_name)
+            code_lines.extend(lines)
 
             # The actual update step
-            code_lines.append(f'  {diff_eq.var_name}_new = {sympy_analysis.sympy2str(update)} + {var_name}_dgdW')
+            code_lines.append(f'  {var_name}_new = {update} + {var_name}_dgdW')
             code_lines.append('')
 
         # returns
@@ -248,7 +217,7 @@ class Wrapper(object):
         code_scope = {'f': f, 'g': g, vdt: dt, f'{vdt}_sqrt': dt ** 0.5, 'ops': ops}
 
         # 2. code lines
-        code_lines = [f'def {func_name}({", ".join(arguments)}):']
+        code_lines = [f'def {func_name}({", ".join(noise.noise_arguments(arguments))}):']
 
         # 2.1 df, dg
         Tools.df_and_dg(code_lines, variables, parameters)
@@ -257,7 +226,7 @@ class Wrapper(object):
         Tools.dfdt(code_lines, variables, vdt)
 
         # 2.3 dW
-        Tools.noise_terms(code_lines, variables)
+        Tools.noise_terms(code_lines, variables, noise.normal_func(code_scope))
 
         # 2.3 dgdW
         # ----
@@ -331,7 +300,7 @@ class Wrapper(object):
         code_scope = {'f': f, 'g': g, vdt: dt, f'{vdt}_sqrt': dt ** 0.5, 'ops': ops}
 
         # 2. code lines
-        code_lines = [f'def {func_name}({", ".join(arguments)}):']
+        code_lines = [f'def {func_name}({", ".join(noise.noise_arguments(arguments))}):']
 
         # 2.1 df, dg
         Tools.df_and_dg(code_lines, variables, parameters)
@@ -340,7 +309,7 @@ class Wrapper(object):
         Tools.dfdt(code_lines, variables, vdt)
 
         # 2.3 dW
-        Tools.noise_terms(code_lines, variables)
+        Tools.noise_terms(code_lines, variables, noise.normal_func(code_scope))
 
         # 2.3 dgdW
         # ----
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+
+"""
+Block-generated Gaussian noise for the SDE integrators.
+
+Drawing the Wiener increments by ``ops.normal`` at every step pays the
+call overhead and a fresh allocation for each variable. Instead, the
+increments are pre-generated in large blocks, already scaled by the
+``loc`` and the ``scale`` of the integrator, and handed out as the views
+of the block at each step.
+
+The buffer has two halves, which are refilled in turn by the vectorized
+Box–Muller transform over the uniform numbers of the counter-based random
+stream (see :py:mod:`brainpy.tools.rng`). The ``b``-th refilled half holds
+the normal numbers of the stream counters ``[b * size, (b + 1) * size)``,
+so the noise only depends on the stream key. A view is valid until its
+half is refilled. Since a half is not refilled while the integrator call
+which took the views from it is running, the views of one call are always
+valid. Once the noise of one call can not be served without refilling the
+half in use, the rest of the call gets the freshly allocated numbers.
+
+The generated integrators take the buffer by the trailing arguments
+``noise_key``, ``noise_block`` and ``noise_state``. The node drivers give
+each SDE integrator of a node (such as ``self.int_V``) its own buffer,
+keyed by the stream of the node and the integrator name (such as
+``("LIF0", "sde.int_V")``) under the seed of
+:py:func:`brainpy.tools.set_seed`: the ``numpy`` driver binds the buffer
+to the integrator, and the ``numba`` driver passes the arrays of the buffer
+into the compiled steps, in which the blocks are also refilled (the drawing
+functions are overloaded for Numba). Therefore, the noise of a node does
+not depend on the other nodes, and is the same with the ``numpy`` and the
+``numba`` backends.
+
+Without the buffer arguments (such as the integrators called out of the
+nodes), the integrators draw from the buffers shared by each ``(loc, scale)``,
+which are renewed by :py:func:`brainpy.tools.set_seed`, and the compiled
+integrators draw by ``np.random.normal``.
+"""
+
+import functools
+import sys
+
+import numpy as np
+
+from brainpy import backend
+from brainpy import errors
+from brainpy import tools
+from brainpy.backend import ops
+
+try:
+    import numba
+    from numba.extending import overload
+except ModuleNotFoundError:
+    numba = None
+
+__all__ = [
+    'WienerBuffer',
+    'set_noise_buffer',
+    'clear_noise_buffer',
+]
+
+NOISE_ARGS = ('noise_key', 'noise_block', 'noise_state')
+_SETTINGS = {'buffered': True, 'block_size': 65536}
+_BUFFERS = {}
+
+# the items of the buffer state
+_POSITION = 0  # the position in the current half
+_HALF = 1  # the current half, 0 or 1
+_COUNTER = 2  # the number of the halves generated
+_SWITCHED = 3  # whether the half is switched in this call
+
+
+@tools.numba_jit
+def _fill_normals(key, counter, loc, scale, out, start, num):
+    # the normal numbers of the counters "[counter, counter + num)" by
+    # the Box–Muller transform of the uniform numbers of the same counters
+    for i in range(0, num, 2):
+        u1 = 1. - tools.rng_uniform(key, counter + i)
+        u2 = tools.rng_uniform(key, counter + i + 1)
+        r = scale * np.sqrt(-2. * np.log(u1))
+        out[start + i] = loc + r * np.cos(2. * np.pi * u2)
+        if i + 1 < num:
+            out[start + i + 1] = loc + r * np.sin(2. * np.pi * u2)
+
+
+@tools.numba_jit
+def _take(key, block, state, loc, scale, num):
+    half = block.shape[0] // 2
+    if state[_POSITION] + num > half:
+        counter = state[_COUNTER] * half
+        state[_COUNTER] += (num + half - 1) // half
+        # the other half still holds the views of this call
+        if num > half or state[_SWITCHED]:
+            res = np.empty(num)
+            _fill_normals(key, counter, loc, scale, res, 0, num)
+            return res
+        state[_HALF] = 1 - state[_HALF]
+        state[_POSITION] = 0
+        state[_SWITCHED] = 1
+        _fill_normals(key, counter, loc, scale, block, state[_HALF] * half, half)
+    start = state[_HALF] * half + state[_POSITION]
+    state[_POSITION] += num
+    return block[start: start + num]
+
+
+class WienerBuffer(object):
+    """The buffer of the Gaussian random numbers :math:`\\mathcal{N}(loc, scale^2)`.
+
+    Parameters
+    ----------
+    key : np.uint64
+        The key of the random stream.
+    loc : float
+        The mean.
+    scale : float
+        The standard deviation, such as :math:`\\sqrt{dt}` for the Wiener increments.
+    block_size : int, optional
+        The number of the random numbers generated at once, i.e., the size of a half.
+    """
+
+    def __init__(self, key, loc=0., scale=1., block_size=None):
+        block_size = _SETTINGS['block_size'] if block_size is None else block_size
+        if block_size <= 0:
+            raise errors.IntegratorError(f'"block_size" must be positive, but got {block_size}.')
+        block_size += block_size % 2
+        self.key = np.uint64(key)
+        self.loc = loc
+        self.scale = scale
+        self.block = np.empty(2 * block_size)
+        self.state = np.zeros(4, dtype=np.int64)
+        self.state[_POSITION] = block_size
+        self.state[_HALF] = 1
+
+    def begin(self):
+        """Start a new call. The views drawn before are valid until the half is refilled."""
+        self.state[_SWITCHED] = 0
+
+    def draw(self, size=None):
+        """Draw the random numbers.
+
+        Parameters
+        ----------
+        size : int, tuple, optional
+            The shape of the random numbers.
+
+        Returns
+        -------
+        samples : float, np.ndarray
+            A float if ``size`` is ``None`` or ``()``, otherwise, the
+            view of the block with the given shape.
+        """
+        return normal(self.loc, self.scale, size, self.key, self.block, self.state)
+
+
+def set_noise_buffer(buffered=None, block_size=None):
+    """Set the block-generated noise of the SDE integrators.
+
+    Parameters
+    ----------
+    buffered : bool, optional
+        Whether to draw the noise from the pre-generated blocks. If ``False``,
+        the nodes built after this setting draw the noise by ``ops.normal``.
+    block_size : int, optional
+        The number of the random numbers generated at once.
+    """
+    if buffered is not None:
+        _SETTINGS['buffered'] = buffered
+    if block_size is not None:
+        if block_size <= 0:
+            raise errors.IntegratorError(f'"block_size" must be positive, but got {block_size}.')
+        _SETTINGS['block_size'] = block_size
+    clear_noise_buffer()
+
+
+def clear_noise_buffer():
+    """Discard the shared noise buffers. The buffers of the previous seed
+    are also discarded by :py:func:`brainpy.tools.set_seed`."""
+    _BUFFERS.clear()
+
+
+def _shared_buffer(loc, scale):
+    purpose = f'sde.normal({loc}, {scale})'
+    # the streams are renewed by "tools.set_seed()", and so are the buffers
+    stream = None if tools.get_seed() is None else tools.get_stream('global', purpose)
+    entry = _BUFFERS.get((loc, scale), None)
+    if entry is None or entry[0] is not stream:
+        key = tools.stream_key('global', purpose) if stream is None else stream.key
+        entry = _BUFFERS[(loc, scale)] = (stream, WienerBuffer(key, loc=loc, scale=scale))
+    return entry[1]
+
+
+def begin(noise_state=None):
+    """Start an integrator call, so that the views drawn in this call are kept valid."""
+    if noise_state is not None:
+        noise_state[_SWITCHED] = 0
+    else:
+        for _, buffer in _BUFFERS.values():
+            buffer.state[_SWITCHED] = 0
+
+
+def normal(loc=0., scale=1., size=None, noise_key=None, noise_block=None, noise_state=None):
+    """Draw the Gaussian random numbers like ``np.random.normal``, but from
+    the given buffer, or from the buffer shared by the ``(loc, scale)``.
+
+    Parameters
+    ----------
+    loc : float
+        The mean.
+    scale : float
+        The standard deviation.
+    size : int, tuple, optional
+        The output shape.
+    noise_key, noise_block, noise_state : optional
+        The key, the block and the state of :py:class:`WienerBuffer`.
+
+    Returns
+    -------
+    samples : float, np.ndarray
+        The drawn samples.
+    """
+    if noise_block is None:
+        if not _SETTINGS['buffered'] or backend.get_backend_name() != 'numpy':
+            return ops.normal(loc, scale, size)
+        if np.ndim(loc) or np.ndim(scale):
+            return loc + scale * normal(0., 1., size)
+        buffer = _shared_buffer(loc, scale)
+        noise_key, noise_block, noise_state = buffer.key, buffer.block, buffer.state
+    shape = () if size is None else ((size,) if isinstance(size, int) else tuple(size))
+    num = int(np.prod(shape))
+    samples = _take(noise_key, noise_block, noise_state, loc, scale, num)
+    if shape == ():
+        return float(samples[0])
+    return samples if len(shape) == 1 else samples.reshape(shape)
+
+
+def normal_func(code_scope):
+    """Get the names of the functions, which start an integrator call and draw
+    the normal random numbers in the generated code, and add the module they need
+    into ``code_scope``. The integrator must take the trailing arguments of
+    :py:func:`noise_arguments`, which are passed to the functions."""
+    code_scope['noise'] = sys.modules[__name__]
+    return 'noise.begin', 'noise.normal'
+
+
+def noise_arguments(arguments):
+    """Append the arguments of the noise buffer to the integrator ``arguments``."""
+    return list(arguments) + [f'{arg}=None' for arg in NOISE_ARGS]
+
+
+def _sde_integrators(host):
+    # the buffered SDE integrators of the host, including the static methods
+    integrators = {}
+    for klass in reversed(type(host).__mro__):
+        for attr, value in vars(klass).items():
+            if isinstance(value, staticmethod):
+                integrators[attr] = value.__func__
+    integrators.update(vars(host))
+    return {attr: value for attr, value in integrators.items()
+            if getattr(value, 'noise_buffer', False) and not attr.startswith('__')}
+
+
+def node_buffers(host, bind=False):
+    """Give each buffered SDE integrator of the node ``host`` (such as
+    ``host.int_V``) its own noise buffer, which is saved as the attribute
+    ``host.int_V_noise``.
+
+    Parameters
+    ----------
+    host : DynamicSystem
+        The node.
+    bind : bool
+        Whether to bind the buffers to the integrators, such as
+        ``host.int_V = functools.partial(int_V, noise_key=..., ...)``, which
+        is used when the steps call the integrators in Python.
+
+    Returns
+    -------
+    buffers : dict
+        The buffers of the integrator names.
+    """
+    buffers = {}
+    if not _SETTINGS['buffered']:
+        return buffers
+    for attr, integrator in _sde_integrators(host).items():
+        name = f'{attr}_noise'
+        if not isinstance(getattr(host, name, None), WienerBuffer):
+            scale = integrator.dt ** 0.5
+            key = tools.stream_key(host.rng_name, f'sde.{attr}')
+            setattr(host, name, WienerBuffer(key, loc=0., scale=scale))
+        buffer = buffers[attr] = getattr(host, name)
+        if bind and not isinstance(getattr(host, attr), functools.partial):
+            bound = functools.partial(integrator, noise_key=buffer.key,
+                                      noise_block=buffer.block, noise_state=buffer.state)
+            setattr(host, attr, functools.update_wrapper(bound, integrator))
+    return buffers
+
+
+# the implementations in the Numba compiled functions
+# ---------------------------------------------------
+
+def _is_none(value):
+    return value is None or isinstance(value, (numba.types.NoneType, numba.types.Omitted))
+
+
+if numba is not None:
+    @overload(begin)
+    def _begin_overload(noise_state=None):
+        if _is_none(noise_state):
+            def begin_none(noise_state=None):
+                pass
+
+            return begin_none
+
+        def begin_buffer(noise_state=None):
+            noise_state[_SWITCHED] = 0
+
+        return begin_buffer
+
+
+    @overload(normal)
+    def _normal_overload(loc=0., scale=1., size=None, noise_key=None, noise_block=None, noise_state=None):
+        # without the buffer, the numbers are drawn by "np.random.normal"
+        if _is_none(noise_block):
+            def normal_none(loc=0., scale=1., size=None, noise_key=None, noise_block=None, noise_state=None):
+                return np.random.normal(loc, scale, size)
+
+            return normal_none
+
+        def normal_buffer(loc=0., scale=1., size=None, noise_key=None, noise_block=None, noise_state=None):
+            num = 1
+            for s in size:
+                num *= s
+            return _take(noise_key, noise_block, noise_state, loc, scale, num).reshape(size)
+
+        return normal_buffer
@@ -5,6 +5,7 @@ from brainpy import errors
 from brainpy.backend import ops
 from brainpy.integrators import constants
 from . import common
+from . import noise
 
 __all__ = [
     'srk1w1_scalar',
@@ -15,7 +16,7 @@ __all__ = [
 
 class Tools(object):
     @staticmethod
-    def _noise_terms(code_lines, variables, vdt, triple_integral=True):
+    def _noise_terms(code_lines, variables, vdt, normal_funcs, triple_integral=True):
         # num_vars = len(variables)
         # if num_vars > 1:
         #     code_lines.append(f'  all_I1 = ops.normal(0.0, dt_sqrt, ({num_vars},)+ops.shape({variables[0]}))')
@@ -43,9 +44,12 @@ class Tools(object):
         #         code_lines.append(f'  {var}_I111 = ({var}_I1 ** 3 - 3 * {vdt} * {var}_I1) / 6')
         #     code_lines.append('  ')
 
+        begin, normal = normal_funcs
+        noise_args = ", ".join(noise.NOISE_ARGS)
+        code_lines.append(f'  {begin}(noise_state)')
         for var in variables:
-            code_lines.append(f'  {var}_I1 = ops.normal(0.000, dt_sqrt, ops.shape({var}))')
-            code_lines.append(f'  {var}_I0 = ops.normal(0.000, dt_sqrt, ops.shape({var}))')
+            code_lines.append(f'  {var}_I1 = {normal}(0.000, dt_sqrt, ops.shape({var}), {noise_args})')
+            code_lines.append(f'  {var}_I0 = {normal}(0.000, dt_sqrt, ops.shape({var}), {noise_args})')
             code_lines.append(f'  {var}_I10 = 0.5 * {vdt} * ({var}_I1 + {var}_I0 / 3.0 ** 0.5)')
             code_lines.append(f'  {var}_I11 = 0.5 * ({var}_I1 ** 2 - {vdt})')
             if triple_integral:
@@ -70,10 +74,11 @@ class Wrappers(object):
         code_scope = {'f': f, 'g': g, vdt: dt, f'{vdt}_sqrt': dt ** 0.5, 'ops': ops}
 
         # 2. code lines
-        code_lines = [f'def {func_name}({", ".join(arguments)}):']
+        code_lines = [f'def {func_name}({", ".join(noise.noise_arguments(arguments))}):']
 
         # 2.1 noise
-        Tools._noise_terms(code_lines, variables, vdt, triple_integral=True)
+        Tools._noise_terms(code_lines, variables, vdt, noise.normal_func(code_scope),
+                           triple_integral=True)
 
         # 2.2 stage 1
         Tools._state1(code_lines, variables, parameters)
@@ -148,10 +153,11 @@ class Wrappers(object):
         code_scope = {'f': f, 'g': g, vdt: dt, f'{vdt}_sqrt': dt ** 0.5, 'ops': ops}
 
         # 2. code lines
-        code_lines = [f'def {func_name}({", ".join(arguments)}):']
+        code_lines = [f'def {func_name}({", ".join(noise.noise_arguments(arguments))}):']
 
         # 2.1 noise
-        Tools._noise_terms(code_lines, variables, vdt, triple_integral=True)
+        Tools._noise_terms(code_lines, variables, vdt, noise.normal_func(code_scope),
+                           triple_integral=True)
 
         # 2.2 stage 1
         Tools._state1(code_lines, variables, parameters)
@@ -251,10 +257,11 @@ class Wrappers(object):
         code_scope = {'f': f, 'g': g, vdt: dt, f'{vdt}_sqrt': dt ** 0.5, 'ops': ops}
 
         # 2. code lines
-        code_lines = [f'def {func_name}({", ".join(arguments)}):']
+        code_lines = [f'def {func_name}({", ".join(noise.noise_arguments(arguments))}):']
 
         # 2.1 noise
-        Tools._noise_terms(code_lines, variables, vdt, triple_integral=False)
+        Tools._noise_terms(code_lines, variables, vdt, noise.normal_func(code_scope),
+                           triple_integral=False)
 
         # 2.2 stage 1
         Tools._state1(code_lines, variables, parameters)
@@ -8,6 +8,7 @@ import numpy as np
 
 from brainpy import errors
 from brainpy import tools
+from brainpy.integrators import caching
 
 try:
     import sympy
@@ -38,6 +39,9 @@ __all__ = [
     'sympy2str',
 
     'Expression',
+    'exp_euler_derivation',
+    'cached_diff',
+    'cached_solve',
     'SingleDiffEq',
 ]
 
@@ -609,3 +613,125 @@ class SingleDiffEq(object):
     @property
     def expr_names(self):
         return [expr.var_name for expr in self.expressions]
+
+
+
+def exp_euler_derivation(var_name, variables, expressions, derivative_expr, dt, func_name):
+    """Derive the exponential Euler update of a single variable.
+
+    The derivative :math:`f` is separated into the linear part :math:`A`
+    of the variable, and the update is :math:`y + (e^{A\\Delta t} - 1) / A f`.
+    The derivation is cached by :py:func:`brainpy.integrators.cached_derivation`.
+
+    Parameters
+    ----------
+    var_name : str
+        The variable name.
+    variables : list
+        The code variables.
+    expressions : list
+        The code expressions for each line.
+    derivative_expr : str
+        The final derivative expression.
+    dt : float
+        The numerical precision.
+    func_name : str
+        The integrator name.
+
+    Returns
+    -------
+    results : tuple
+        The code lines, and the update expression of the variable.
+    """
+
+    def derive():
+        diff_eq = SingleDiffEq(var_name=var_name,
+                               variables=variables,
+                               expressions=expressions,
+                               derivative_expr=derivative_expr,
+                               scope={},
+                               func_name=func_name)
+        f_expressions = diff_eq.get_f_expressions(substitute_vars=diff_eq.var_name)
+
+        # code lines
+        code_lines = [f"  {str(expr)}" for expr in f_expressions[:-1]]
+
+        # get the linear system using sympy
+        f_res = f_expressions[-1]
+        df_expr = str2sympy(f_res.code).expr.expand()
+        s_df = sympy.Symbol(f"{f_res.var_name}")
+        code_lines.append(f'  {s_df.name} = {sympy2str(df_expr)}')
+        var = sympy.Symbol(diff_eq.var_name, real=True)
+
+        # get df part
+        s_linear = sympy.Symbol(f'_{diff_eq.var_name}_linear')
+        s_linear_exp = sympy.Symbol(f'_{diff_eq.var_name}_linear_exp')
+        s_df_part = sympy.Symbol(f'_{diff_eq.var_name}_df_part')
+        if df_expr.has(var):
+            # linear
+            linear = sympy.collect(df_expr, var, evaluate=False)[var]
+            code_lines.append(f'  {s_linear.name} = {sympy2str(linear)}')
+            # linear exponential
+            linear_exp = sympy.exp(linear * dt)
+            code_lines.append(f'  {s_linear_exp.name} = {sympy2str(linear_exp)}')
+            # df part
+            df_part = (s_linear_exp - 1) / s_linear * s_df
+            code_lines.append(f'  {s_df_part.name} = {sympy2str(df_part)}')
+
+        else:
+            # linear exponential
+            code_lines.append(f'  {s_linear_exp.name} = sqrt({dt})')
+            # df part
+            code_lines.append(f'  {s_df_part.name} = {sympy2str(dt * s_df)}')
+
+        # update expression
+        update = var + s_df_part
+        return code_lines, sympy2str(update)
+
+    # "func_name" is only used in the error messages, and is not in the key,
+    # so that the same equations of the different functions share the derivation
+    code_lines, update = caching.cached_derivation(
+        'exp_euler', (var_name, variables, expressions, derivative_expr, dt), derive)
+    return list(code_lines), update
+
+
+def cached_diff(expr, symbol):
+    """Differentiate the SymPy expression with the cache.
+
+    Parameters
+    ----------
+    expr : sympy.Expr
+        The SymPy expression.
+    symbol : sympy.Symbol
+        The symbol to differentiate.
+
+    Returns
+    -------
+    result : sympy.Expr
+        The derivative expression.
+    """
+    res = caching.cached_derivation(
+        'diff', (sympy.srepr(expr), sympy.srepr(symbol)),
+        lambda: sympy.srepr(sympy.diff(expr, symbol)))
+    return sympy.sympify(res)
+
+
+def cached_solve(expr, symbol):
+    """Solve the SymPy equation ``expr = 0`` with the cache.
+
+    Parameters
+    ----------
+    expr : sympy.Expr
+        The SymPy expression.
+    symbol : sympy.Symbol
+        The symbol to solve.
+
+    Returns
+    -------
+    results : list
+        The solutions.
+    """
+    res = caching.cached_derivation(
+        'solve', (sympy.srepr(expr), sympy.srepr(symbol)),
+        lambda: [sympy.srepr(r) for r in sympy.solve(expr, symbol)])
+    return [sympy.sympify(r) for r in res]
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+
+"""
+Lookup tables of the derivative functions.
+
+Like the ``TABLE`` statement of NEURON, the subexpressions of the
+derivative function which only depend on one bounded variable (such
+as the rate functions :math:`\\alpha(V)` and :math:`\\beta(V)` of the
+gating variables) are pre-computed on a grid, and are linearly
+interpolated from the tables during the integration. Therefore, the
+transcendental functions (like ``exp``) are evaluated once at the
+table building, rather than at each step for each neuron.
+"""
+
+import ast
+import inspect
+import types
+
+import numpy as np
+
+from brainpy import errors
+from brainpy import tools
+from brainpy.integrators import utils
+
+__all__ = [
+    'tabulate',
+    'table_interp',
+]
+
+
+@tools.numba_jit
+def _interp_scalar(x, table, x_min, inv_dx):
+    pos = (x - x_min) * inv_dx
+    num = table.shape[0]
+    if pos <= 0.:
+        return table[0]
+    if pos >= num - 1:
+        return table[num - 1]
+    i = int(pos)
+    return table[i] + (table[i + 1] - table[i]) * (pos - i)
+
+
+@tools.numba_jit
+def _interp_array(x, table, x_min, inv_dx):
+    res = np.empty(x.shape)
+    for idx in np.ndindex(x.shape):
+        res[idx] = _interp_scalar(x[idx], table, x_min, inv_dx)
+    return res
+
+
+def table_interp(x, table, x_min, inv_dx):
+    """Linearly interpolate the lookup table.
+
+    The values out of the table range are clamped to the table edges.
+
+    Parameters
+    ----------
+    x : float, np.ndarray
+        The variable.
+    table : np.ndarray
+        The function values at the grid ``x_min + k / inv_dx``.
+    x_min : float
+        The start of the grid.
+    inv_dx : float
+        The inverse of the grid step.
+
+    Returns
+    -------
+    value : float, np.ndarray
+        The interpolated values.
+    """
+    if np.ndim(x):
+        return _interp_array(np.asarray(x, dtype=float), table, x_min, inv_dx)
+    else:
+        return _interp_scalar(float(x), table, x_min, inv_dx)
+
+
+try:
+    from numba.core import types as nb_types
+    from numba.extending import overload
+
+
+    @overload(table_interp)
+    def _table_interp_impl(x, table, x_min, inv_dx):
+        if isinstance(x, nb_types.Array):
+            return lambda x, table, x_min, inv_dx: _interp_array(x, table, x_min, inv_dx)
+        else:
+            return lambda x, table, x_min, inv_dx: _interp_scalar(x, table, x_min, inv_dx)
+except ModuleNotFoundError:
+    pass
+
+
+def _evaluate(code, var, xs, scope):
+    scope = dict(scope)
+    with np.errstate(all='ignore'):
+        try:
+            scope[var] = xs
+            values = np.asarray(eval(code, scope), dtype=float)
+            if values.shape != xs.shape:
+                raise ValueError
+        except Exception:
+            # the expression can not be evaluated by arrays
+            values = []
+            for x in xs:
+                scope[var] = x
+                values.append(eval(code, scope))
+            values = np.asarray(values, dtype=float)
+    return values
+
+
+def _fill_singular(values, xs, code):
+    # the removable singularities (such as "x / (1 - exp(-x))" at 0)
+    # are filled by the linear interpolation of the neighbors
+    finite = np.isfinite(values)
+    if not np.any(finite):
+        raise errors.IntegratorError(f'Cannot tabulate "{code}", which is not finite in the table range.')
+    if not np.all(finite):
+        values = values.copy()
+        values[~finite] = np.interp(xs[~finite], xs[finite], values[finite])
+    return values
+
+
+# the nodes defining the names in their own scopes ("ast.NamedExpr" since Python 3.8)
+_SCOPED_NODES = (ast.Lambda, ast.comprehension) + ((ast.NamedExpr,) if hasattr(ast, 'NamedExpr') else ())
+
+
+class _Tabulator(ast.NodeTransformer):
+    def __init__(self, tables, local_names, scope):
+        self.tables = tables
+        self.local_names = local_names
+        self.scope = scope
+        self.codes = {}  # expression code => table name
+        self.table_data = {}  # table name => table
+        self.errors = {}  # expression code => the interpolation error
+
+    def _table_var(self, node):
+        names = set()
+        has_call = False
+        for n in ast.walk(node):
+            if isinstance(n, ast.Name):
+                names.add(n.id)
+            elif isinstance(n, ast.Call):
+                has_call = True
+            elif isinstance(n, _SCOPED_NODES):
+                return None
+        local_names = names & self.local_names
+        if has_call and len(local_names) == 1:
+            var = local_names.pop()
+            if var in self.tables:
+                return var
+        return None
+
+    def visit(self, node):
+        if isinstance(node, ast.expr) and not isinstance(node, ast.Name):
+            var = self._table_var(node)
+            if var is not None:
+                return self._lookup(node, var)
+        return super(_Tabulator, self).visit(node)
+
+    def _lookup(self, node, var):
+        low, high, step = self.tables[var]
+        code = tools.ast2code(ast.fix_missing_locations(node))
+        if code not in self.codes:
+            num = int(round((high - low) / step)) + 1
+            xs = low + step * np.arange(num)
+            values = _fill_singular(_evaluate(code, var, xs, self.scope), xs, code)
+            # the maximum error of the linear interpolation at the middle points
+            mids = xs[:-1] + 0.5 * step
+            exact = _evaluate(code, var, mids, self.scope)
+            error = np.abs(exact - 0.5 * (values[:-1] + values[1:]))
+            self.errors[code] = float(np.max(error[np.isfinite(error)], initial=0.))
+            name = f'_table_{var}_{len(self.codes)}'
+            self.codes[code] = name
+            self.table_data[name] = values
+        call = ast.Call(func=ast.Name(id='table_interp', ctx=ast.Load()),
+                        args=[ast.Name(id=var, ctx=ast.Load()),
+                              ast.Name(id=self.codes[code], ctx=ast.Load()),
+                              ast.Constant(value=float(low), kind=None),
+                              ast.Constant(value=float(1. / step), kind=None)],
+                        keywords=[])
+        return ast.copy_location(call, node)
+
+
+def tabulate(f=None, tables=None, show_code=False):
+    """Replace the subexpressions of the derivative function ``f``, which
+    only depend on one of the tabulated variables, by the lookup tables.
+
+    A subexpression is tabulated if it calls some functions (such as
+    ``exp``), and it uses only one local variable (the argument or the
+    assigned variable), which is the tabulated variable. The other names
+    used by the subexpression (such as the modules and the global constants)
+    are fixed as their current values. For example,
+
+    >>> @tabulate(tables={'V': (-100., 60., 0.01)})
+    >>> def dm(m, t, V):
+    >>>     alpha = 0.1 * (V + 40) / (1 - exp(-(V + 40) / 10))
+    >>>     beta = 4.0 * exp(-(V + 65) / 18)
+    >>>     dmdt = alpha * (1 - m) - beta * m
+    >>>     return dmdt
+
+    The values out of the table range are clamped to the table edges, and
+    the non-finite values in the table (such as the removable singularity
+    of ``alpha`` at ``V = -40``) are filled by the neighbors. The maximum
+    interpolation errors (at the middle points of the grid) of each
+    tabulated subexpression are reported in the ``table_errors`` attribute
+    of the returned function.
+
+    Tables are also opt-in in the integrators, by the ``tables`` keyword:
+
+    >>> @odeint(method='exponential_euler', tables={'V': (-100., 60., 0.01)})
+    >>> def int_m(m, t, V):
+    >>>     ...
+
+    Parameters
+    ----------
+    f : callable
+        The derivative function.
+    tables : dict
+        The tabulated variables, and their table ranges and grid steps
+        ``{var: (low, high, step)}``.
+    show_code : bool
+        Whether show the tabulated code and the interpolation errors.
+
+    Returns
+    -------
+    func : callable
+        The derivative function with the lookup tables.
+    """
+    if tables is None:
+        raise errors.IntegratorError('Please provide the "tables".')
+    if f is None:
+        return lambda f: tabulate(f, tables=tables, show_code=show_code)
+
+    code = tools.deindent(tools.get_func_source(f))
+    tree = ast.parse(code)
+    func_def = tree.body[0]
+    func_def.decorator_list = []
+
+    # the local names
+    class_kw, variables, parameters, arguments = utils.get_args(f)
+    local_names = set(class_kw + variables + [p.lstrip('*') for p in parameters])
+    for node in ast.walk(func_def):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            local_names.add(node.id)
+    for var, table in tables.items():
+        if var not in local_names:
+            raise errors.IntegratorError(f'The tabulated variable "{var}" is not defined in {f}.')
+        if len(table) != 3 or not table[0] < table[1] or table[2] <= 0.:
+            raise errors.IntegratorError(f'The table of "{var}" should be "(low, high, step)", '
+                                         f'with low < high and step > 0, but we got {table}.')
+
+    # the code scope
+    closure_vars = inspect.getclosurevars(f)
+    code_scope = dict(f.__globals__)
+    code_scope.update(closure_vars.nonlocals)
+
+    # the tabulation
+    tabulator = _Tabulator(tables=tables, local_names=local_names, scope=code_scope)
+    func_def.body = [tabulator.visit(stmt) for stmt in func_def.body]
+    new_code = tools.ast2code(ast.fix_missing_locations(func_def))
+    code_scope.update(tabulator.table_data)
+    code_scope['table_interp'] = table_interp
+    if show_code:
+        print(new_code)
+        print()
+        for expr, error in tabulator.errors.items():
+            print(f'{expr}: max interpolation error {error:.3e}')
+        print()
+
+    func = utils.compile_code(new_code, code_scope, func_def.name)
+    func.table_errors = tabulator.errors
+    if inspect.ismethod(f):
+        func = types.MethodType(func, f.__self__)
+    return func
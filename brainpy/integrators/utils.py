@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import inspect
+import linecache
 from copy import deepcopy
 
 from brainpy import backend
@@ -8,8 +9,11 @@ from brainpy import errors
 
 __all__ = [
     'get_args',
+    'compile_code',
 ]
 
+_GENERATED_NO = 0
+
 
 def get_args(f):
     """Get the function arguments.
@@ -89,3 +93,33 @@ def get_args(f):
         raise ValueError('Do not find time variable "t".')
     other_args = reduced_args[len(var_names):]
     return class_kw, var_names, other_args, original_args
+
+
+def compile_code(code, code_scope, func_name):
+    """Compile the function defined by the code string.
+
+    The code is registered in the ``linecache`` with an unique file name,
+    so that the source of the compiled function can be retrieved by
+    ``inspect.getsource()``, which is needed by the integrators analyzing
+    the source code (such as the exponential Euler method).
+
+    Parameters
+    ----------
+    code : str
+        The code string which defines the function.
+    code_scope : dict
+        The scope to execute the code.
+    func_name : str
+        The function name.
+
+    Returns
+    -------
+    func : callable
+        The compiled function.
+    """
+    global _GENERATED_NO
+    _GENERATED_NO += 1
+    filename = f'<brainpy-generated-{_GENERATED_NO}>'
+    linecache.cache[filename] = (len(code), None, code.splitlines(True), filename)
+    exec(compile(code, filename, 'exec'), code_scope)
+    return code_scope[func_name]
@@ -5,5 +5,6 @@ from .connectivity import *
 from .delays import *
 from .dynamic_system import *
 from .monitors import *
+from .propagation import *
 from .drivers import *
 from .utils import *
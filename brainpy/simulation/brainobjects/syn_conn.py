@@ -34,6 +34,12 @@ class SynConn(DynamicSystem):
                     delay_name = f'{key}_delay_update'
                     setattr(self, delay_name, delay_var.update)
                     steps[delay_name] = delay_var.update
+        if hasattr(self, 'event_delays'):
+            for key, delay_var in self.event_delays.items():
+                if delay_var.update not in steps:
+                    delay_name = f'{key}_delay_update'
+                    setattr(self, delay_name, delay_var.update)
+                    steps[delay_name] = delay_var.update
 
         # initialize super class
         super(SynConn, self).__init__(steps=steps, monitors=monitors, name=name, show_code=show_code)
@@ -42,6 +48,9 @@ class SynConn(DynamicSystem):
         if hasattr(self, 'constant_delays'):
             for key, delay_var in self.constant_delays.items():
                 delay_var.name = f'{self.name}_delay_{key}'
+        if hasattr(self, 'event_delays'):
+            for key, delay_var in self.event_delays.items():
+                delay_var.name = f'{self.name}_delay_{key}'
 
     def register_constant_delay(self, key, size, delay_time):
         if not hasattr(self, 'constant_delays'):
@@ -51,6 +60,36 @@ class SynConn(DynamicSystem):
         self.constant_delays[key] = delays.ConstantDelay(size, delay_time)
         return self.constant_delays[key]
 
+    def register_event_delay(self, key, conn, delay_time, capacity=None):
+        """Register a per-synapse delay for the spike event delivery.
+
+        Parameters
+        ----------
+        key : str
+            The delay name.
+        conn : Connector
+            The instantiated connector, whose synapse ids are used.
+        delay_time : int, float, tensor, callable
+            The delay time of each synapse.
+        capacity : int, None
+            The number of events delivered at one step, see
+            :py:class:`brainpy.simulation.EventDelay`.
+
+        Returns
+        -------
+        delay : delays.EventDelay
+            The event delay.
+        """
+        if not hasattr(self, 'event_delays'):
+            self.event_delays = {}
+        if key in self.event_delays or key in getattr(self, 'constant_delays', {}):
+            raise errors.ModelDefError(f'"{key}" has been registered as a delay.')
+        self.event_delays[key] = delays.EventDelay(pre_ids=conn.pre_ids,
+                                                   num_pre=conn.num_pre,
+                                                   delay_time=delay_time,
+                                                   capacity=capacity)
+        return self.event_delays[key]
+
     def update(self, *args):
         raise NotImplementedError
 
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
 from .base import *
+from .cache import *
+from .reorder import *
 from .regular_conn import *
 from .random_conn import *
 from .measurement import *
@@ -2,12 +2,17 @@
 
 
 import abc
+import functools
+import inspect
 
 import numpy as np
 
 from brainpy import backend
 from brainpy import errors
 from brainpy.backend import ops
+from brainpy.simulation.connectivity import cache
+from brainpy.simulation.connectivity.reorder import hilbert_order
+from brainpy.simulation.connectivity.reorder import rcm_order
 
 try:
     import numba as nb
@@ -24,8 +29,10 @@ __all__ = [
     'pre_slice',
     'post_slice',
 
+    'SparseConnectivity',
     'AbstractConnector',
     'Connector',
+    'cached_connector',
 ]
 
 
@@ -57,12 +64,8 @@ def ij2mat(i, j, num_pre=None, num_post=None):
     """
     if len(i) != len(j):
         raise errors.ModelUseError('"i" and "j" must be the equal length.')
-    if num_pre is None:
-        print('WARNING: "num_pre" is not provided, the result may not be accurate.')
-        num_pre = i.max()
-    if num_post is None:
-        print('WARNING: "num_post" is not provided, the result may not be accurate.')
-        num_post = j.max()
+    num_pre = _check_num(i, num_pre, 'num_pre')
+    num_post = _check_num(j, num_post, 'num_post')
     conn_mat = ops.zeros((num_pre, num_post))
     conn_mat[i, j] = 1.
     return conn_mat
@@ -90,7 +93,54 @@ def mat2ij(conn_mat):
            ops.as_tensor(post_ids, dtype=ops.int)
 
 
-def pre2post(i, j, num_pre=None):
+def _check_num(ids, num, name):
+    if num is None:
+        print(f'WARNING: "{name}" is not provided, the result may not be accurate.')
+        num = int(np.max(ids)) + 1 if len(ids) else 0
+    return num
+
+
+def _csr(keys, num_row):
+    """Group the synapses by the row ``keys``.
+
+    Returns
+    -------
+    csr : tuple
+        The synapse indices sorted by the rows (stable, i.e., the
+        synapses in each row keep their original order), and the
+        row pointers ``indptr`` with the length of ``num_row + 1``.
+    """
+    keys = np.asarray(keys, dtype=np.int_)
+    syn_ids = np.argsort(keys, kind='stable')
+    indptr = np.zeros(num_row + 1, dtype=np.int_)
+    np.cumsum(np.bincount(keys, minlength=num_row), out=indptr[1:])
+    return syn_ids, indptr
+
+
+def _ragged(indices, indptr):
+    """Get the ragged list view of the CSR structure."""
+    if len(indptr) > 1:
+        ragged_list = np.split(ops.as_tensor(indices, dtype=ops.int), indptr[1:-1])
+    else:
+        ragged_list = []
+    if _numba_backend():
+        ragged_list_nb = nb.typed.List()
+        for l in ragged_list:
+            ragged_list_nb.append(l)
+        ragged_list = ragged_list_nb
+    return ragged_list
+
+
+def _format(indices, indptr, format):
+    if format == 'list':
+        return _ragged(indices, indptr)
+    elif format == 'csr':
+        return ops.as_tensor(indices, dtype=ops.int), ops.as_tensor(indptr, dtype=ops.int)
+    else:
+        raise errors.ModelUseError(f'Unknown format "{format}", only support "list" and "csr".')
+
+
+def pre2post(i, j, num_pre=None, format='list'):
     """Get pre2post connections from `i` and `j` indexes.
 
     Parameters
@@ -101,32 +151,25 @@ def pre2post(i, j, num_pre=None):
         The post-synaptic neuron indexes.
     num_pre : int, None
         The number of the pre-synaptic neurons.
+    format : str
+        The returned format. "list" returns the ragged list, in which
+        each element is the array of the post-synaptic indexes. "csr"
+        returns the tuple of ``(indices, indptr)``, where the post-synaptic
+        indexes of pre-synaptic neuron ``k`` are ``indices[indptr[k]: indptr[k + 1]]``.
 
     Returns
     -------
-    conn : list
+    conn : list, tuple
         The conn list of pre2post.
     """
     if len(i) != len(j):
         raise errors.ModelUseError('The length of "i" and "j" must be the same.')
-    if num_pre is None:
-        print('WARNING: "num_pre" is not provided, the result may not be accurate.')
-        num_pre = i.max()
-
-    pre2post_list = [[] for _ in range(num_pre)]
-    for pre_id, post_id in zip(i, j):
-        pre2post_list[pre_id].append(post_id)
-    pre2post_list = [ops.as_tensor(l, dtype=ops.int) for l in pre2post_list]
-
-    if _numba_backend():
-        pre2post_list_nb = nb.typed.List()
-        for pre_id in range(num_pre):
-            pre2post_list_nb.append(pre2post_list[pre_id])
-        pre2post_list = pre2post_list_nb
-    return pre2post_list
+    num_pre = _check_num(i, num_pre, 'num_pre')
+    syn_ids, indptr = _csr(i, num_pre)
+    return _format(np.asarray(j)[syn_ids], indptr, format)
 
 
-def post2pre(i, j, num_post=None):
+def post2pre(i, j, num_post=None, format='list'):
     """Get post2pre connections from `i` and `j` indexes.
 
     Parameters
@@ -137,33 +180,23 @@ def post2pre(i, j, num_post=None):
         The post-synaptic neuron indexes.
     num_post : int, None
         The number of the post-synaptic neurons.
+    format : str
+        The returned format, "list" or "csr".
 
     Returns
     -------
-    conn : list
+    conn : list, tuple
         The conn list of post2pre.
     """
 
     if len(i) != len(j):
         raise errors.ModelUseError('The length of "i" and "j" must be the same.')
-    if num_post is None:
-        print('WARNING: "num_post" is not provided, the result may not be accurate.')
-        num_post = j.max()
-
-    post2pre_list = [[] for _ in range(num_post)]
-    for pre_id, post_id in zip(i, j):
-        post2pre_list[post_id].append(pre_id)
-    post2pre_list = [ops.as_tensor(l, dtype=ops.int) for l in post2pre_list]
-
-    if _numba_backend():
-        post2pre_list_nb = nb.typed.List()
-        for post_id in range(num_post):
-            post2pre_list_nb.append(post2pre_list[post_id])
-        post2pre_list = post2pre_list_nb
-    return post2pre_list
+    num_post = _check_num(j, num_post, 'num_post')
+    syn_ids, indptr = _csr(j, num_post)
+    return _format(np.asarray(i)[syn_ids], indptr, format)
 
 
-def pre2syn(i, num_pre=None):
+def pre2syn(i, num_pre=None, format='list'):
     """Get pre2syn connections from `i` and `j` indexes.
 
     Parameters
@@ -172,31 +205,20 @@ def pre2syn(i, num_pre=None):
         The pre-synaptic neuron indexes.
     num_pre : int
         The number of the pre-synaptic neurons.
+    format : str
+        The returned format, "list" or "csr".
 
     Returns
     -------
-    conn : list
+    conn : list, tuple
         The conn list of pre2syn.
     """
-    if num_pre is None:
-        print('WARNING: "num_pre" is not provided, the result may not be accurate.')
-        num_pre = i.max()
-
-    pre2syn_list = [[] for _ in range(num_pre)]
-    for syn_id, pre_id in enumerate(i):
-        pre2syn_list[pre_id].append(syn_id)
-    pre2syn_list = [ops.as_tensor(l, dtype=ops.int) for l in pre2syn_list]
-
-    if _numba_backend():
-        pre2syn_list_nb = nb.typed.List()
-        for pre_ids in pre2syn_list:
-            pre2syn_list_nb.append(pre_ids)
-        pre2syn_list = pre2syn_list_nb
+    num_pre = _check_num(i, num_pre, 'num_pre')
+    syn_ids, indptr = _csr(i, num_pre)
+    return _format(syn_ids, indptr, format)
 
-    return pre2syn_list
 
-
-def post2syn(j, num_post=None):
+def post2syn(j, num_post=None, format='list'):
     """Get post2syn connections from `i` and `j` indexes.
 
     Parameters
@@ -205,28 +227,17 @@ def post2syn(j, num_post=None):
         The post-synaptic neuron indexes.
     num_post : int
         The number of the post-synaptic neurons.
+    format : str
+        The returned format, "list" or "csr".
 
     Returns
     -------
-    conn : list
+    conn : list, tuple
         The conn list of post2syn.
     """
-    if num_post is None:
-        print('WARNING: "num_post" is not provided, the result may not be accurate.')
-        num_post = j.max()
-
-    post2syn_list = [[] for _ in range(num_post)]
-    for syn_id, post_id in enumerate(j):
-        post2syn_list[post_id].append(syn_id)
-    post2syn_list = [ops.as_tensor(l, dtype=ops.int) for l in post2syn_list]
-
-    if _numba_backend():
-        post2syn_list_nb = nb.typed.List()
-        for pre_ids in post2syn_list:
-            post2syn_list_nb.append(pre_ids)
-        post2syn_list = post2syn_list_nb
-
-    return post2syn_list
+    num_post = _check_num(j, num_post, 'num_post')
+    syn_ids, indptr = _csr(j, num_post)
+    return _format(syn_ids, indptr, format)
 
 
 def pre_slice(i, j, num_pre=None):
@@ -249,29 +260,15 @@ def pre_slice(i, j, num_pre=None):
     # check
     if len(i) != len(j):
         raise errors.ModelUseError('The length of "i" and "j" must be the same.')
-    if num_pre is None:
-        print('WARNING: "num_pre" is not provided, the result may not be accurate.')
-        num_pre = i.max()
+    num_pre = _check_num(i, num_pre, 'num_pre')
 
     # pre2post connection
-    pre2post_list = [[] for _ in range(num_pre)]
-    for pre_id, post_id in zip(i, j):
-        pre2post_list[pre_id].append(post_id)
-    pre_ids, post_ids = [], []
-    for pre_i, posts in enumerate(pre2post_list):
-        post_ids.extend(posts)
-        pre_ids.extend([pre_i] * len(posts))
-    post_ids = ops.as_tensor(post_ids, dtype=ops.int)
-    pre_ids = ops.as_tensor(pre_ids, dtype=ops.int)
+    syn_ids, indptr = _csr(i, num_pre)
+    pre_ids = ops.as_tensor(np.asarray(i)[syn_ids], dtype=ops.int)
+    post_ids = ops.as_tensor(np.asarray(j)[syn_ids], dtype=ops.int)
 
     # pre2post slicing
-    slicing = []
-    start = 0
-    for posts in pre2post_list:
-        end = start + len(posts)
-        slicing.append([start, end])
-        start = end
-    slicing = ops.as_tensor(slicing, dtype=ops.int)
+    slicing = ops.as_tensor(np.stack([indptr[:-1], indptr[1:]], axis=1), dtype=ops.int)
 
     return pre_ids, post_ids, slicing
 
@@ -295,37 +292,187 @@ def post_slice(i, j, num_post=None):
     """
     if len(i) != len(j):
         raise errors.ModelUseError('The length of "i" and "j" must be the same.')
-    if num_post is None:
-        print('WARNING: "num_post" is not provided, the result may not be accurate.')
-        num_post = j.max()
+    num_post = _check_num(j, num_post, 'num_post')
 
     # post2pre connection
-    post2pre_list = [[] for _ in range(num_post)]
-    for pre_id, post_id in zip(i, j):
-        post2pre_list[post_id].append(pre_id)
-    pre_ids, post_ids = [], []
-    for _post_id, _pre_ids in enumerate(post2pre_list):
-        pre_ids.extend(_pre_ids)
-        post_ids.extend([_post_id] * len(_pre_ids))
-    post_ids = ops.as_tensor(post_ids, dtype=ops.int)
-    pre_ids = ops.as_tensor(pre_ids, dtype=ops.int)
+    syn_ids, indptr = _csr(j, num_post)
+    pre_ids = ops.as_tensor(np.asarray(i)[syn_ids], dtype=ops.int)
+    post_ids = ops.as_tensor(np.asarray(j)[syn_ids], dtype=ops.int)
 
     # post2pre slicing
-    slicing = []
-    start = 0
-    for pres in post2pre_list:
-        end = start + len(pres)
-        slicing.append([start, end])
-        start = end
-    slicing = ops.as_tensor(slicing, dtype=ops.int)
+    slicing = ops.as_tensor(np.stack([indptr[:-1], indptr[1:]], axis=1), dtype=ops.int)
 
     return pre_ids, post_ids, slicing
 
 
+class SparseConnectivity(object):
+    """The sparse connectivity which holds both the CSR and CSC views.
+
+    The synapses are identified by their positions in the CSR structure
+    (i.e., they are sorted by the pre-synaptic indexes). The CSC view
+    only stores the pre-synaptic indexes and a permutation to the CSR
+    positions, so that the synaptic data (such as ``weights`` and
+    ``delays``) are stored only once in the CSR order, and can be visited
+    either by the pre-synaptic neurons or by the post-synaptic neurons.
+    All the structures are contiguous NumPy arrays, which can be directly
+    passed to the Numba kernels without copying.
+
+    Parameters
+    ----------
+    indptr : np.ndarray
+        The CSR row pointers, with the shape of ``(num_pre + 1,)``.
+    indices : np.ndarray
+        The post-synaptic indexes of the synapses.
+    num_post : int
+        The number of the post-synaptic neurons.
+    weights : np.ndarray, optional
+        The synaptic weights in the CSR order.
+    delays : np.ndarray, optional
+        The synaptic delays in the CSR order.
+    syn_order : np.ndarray, optional
+        The original synapse index of each CSR synapse, if the synapses
+        are reordered from the original ``(i, j)`` order. Otherwise ``None``.
+
+    Attributes
+    ----------
+    pre_ids : np.ndarray
+        The pre-synaptic index of each synapse.
+    post_ids : np.ndarray
+        The post-synaptic index of each synapse, the same as ``indices``.
+    col_indptr : np.ndarray
+        The CSC column pointers, with the shape of ``(num_post + 1,)``.
+    col_indices : np.ndarray
+        The pre-synaptic indexes in the CSC order.
+    csc2csr : np.ndarray
+        The CSR synapse index of each CSC element.
+    """
+
+    def __init__(self, indptr, indices, num_post, weights=None, delays=None, syn_order=None):
+        self.num_pre = len(indptr) - 1
+        self.num_post = num_post
+        self.num_syn = len(indices)
+
+        # CSR
+        self.indptr = np.ascontiguousarray(indptr, dtype=ops.int)
+        self.indices = np.ascontiguousarray(indices, dtype=ops.int)
+        self.pre_ids = np.repeat(np.arange(self.num_pre, dtype=ops.int), np.diff(self.indptr))
+        self.syn_order = syn_order
+
+        # CSC
+        self.csc2csr, self.col_indptr = _csr(self.indices, num_post)
+        self.col_indices = self.pre_ids[self.csc2csr]
+
+        # synaptic data
+        self.weights = self._check_data(weights, 'weights')
+        self.delays = self._check_data(delays, 'delays')
+
+    def _check_data(self, data, name):
+        if data is None:
+            return None
+        data = np.asarray(data)
+        if data.ndim == 0:
+            return data
+        if data.shape[0] != self.num_syn:
+            raise errors.ModelUseError(f'"{name}" must have the length of {self.num_syn}, '
+                                       f'but we got {data.shape[0]}.')
+        if self.syn_order is not None:
+            data = data[self.syn_order]
+        return np.ascontiguousarray(data)
+
+    @classmethod
+    def from_ij(cls, i, j, num_pre=None, num_post=None, weights=None, delays=None):
+        """Build the sparse connectivity from the `i` and `j` indexes.
+
+        Parameters
+        ----------
+        i : list, np.ndarray
+            The pre-synaptic neuron indexes.
+        j : list, np.ndarray
+            The post-synaptic neuron indexes.
+        num_pre : int
+            The number of the pre-synaptic neurons.
+        num_post : int
+            The number of the post-synaptic neurons.
+        weights : np.ndarray, float, optional
+            The synaptic weights in the `(i, j)` order.
+        delays : np.ndarray, float, optional
+            The synaptic delays in the `(i, j)` order.
+
+        Returns
+        -------
+        sparse : SparseConnectivity
+            The sparse connectivity.
+        """
+        if len(i) != len(j):
+            raise errors.ModelUseError('The length of "i" and "j" must be the same.')
+        num_pre = _check_num(i, num_pre, 'num_pre')
+        num_post = _check_num(j, num_post, 'num_post')
+        i = np.asarray(i, dtype=ops.int)
+        j = np.asarray(j, dtype=ops.int)
+        if np.all(i[1:] >= i[:-1]):
+            indptr = np.zeros(num_pre + 1, dtype=ops.int)
+            np.cumsum(np.bincount(i, minlength=num_pre), out=indptr[1:])
+            syn_order = None
+            indices = j
+        else:
+            syn_order, indptr = _csr(i, num_pre)
+            indices = j[syn_order]
+        return cls(indptr=indptr, indices=indices, num_post=num_post,
+                   weights=weights, delays=delays, syn_order=syn_order)
+
+    def arrays(self):
+        """Get all the arrays of the structure."""
+        names = ['indptr', 'indices', 'pre_ids', 'csc2csr', 'col_indptr', 'col_indices',
+                 'weights', 'delays', 'syn_order']
+        return {n: getattr(self, n) for n in names if getattr(self, n) is not None}
+
+    @classmethod
+    def from_arrays(cls, arrays, num_post):
+        """Rebuild the structure from the arrays got by ``arrays()``
+        without any computation."""
+        sparse = cls.__new__(cls)
+        sparse.num_pre = len(arrays['indptr']) - 1
+        sparse.num_post = num_post
+        sparse.num_syn = len(arrays['indices'])
+        for name in ['weights', 'delays', 'syn_order']:
+            setattr(sparse, name, None)
+        for name, value in arrays.items():
+            setattr(sparse, name, value)
+        return sparse
+
+    def csr(self):
+        """Get the CSR view ``(indices, indptr)``."""
+        return self.indices, self.indptr
+
+    def csc(self):
+        """Get the CSC view ``(col_indices, col_indptr, csc2csr)``."""
+        return self.col_indices, self.col_indptr, self.csc2csr
+
+    def syn_ids_of_pre(self, pre_id):
+        """Get the synapse indexes of a pre-synaptic neuron."""
+        return np.arange(self.indptr[pre_id], self.indptr[pre_id + 1])
+
+    def syn_ids_of_post(self, post_id):
+        """Get the synapse indexes of a post-synaptic neuron."""
+        return self.csc2csr[self.col_indptr[post_id]: self.col_indptr[post_id + 1]]
+
+    def to_dense(self):
+        """Get the dense connectivity matrix (or the weight matrix if
+        ``weights`` is provided)."""
+        conn_mat = ops.zeros((self.num_pre, self.num_post))
+        conn_mat[self.pre_ids, self.indices] = 1. if self.weights is None else self.weights
+        return conn_mat
+
+    @property
+    def post_ids(self):
+        return self.indices
+
+
 SUPPORTED_SYN_STRUCTURE = ['pre_ids', 'post_ids', 'conn_mat',
                            'pre2post', 'post2pre',
                            'pre2syn', 'post2syn',
-                           'pre_slice', 'post_slice']
+                           'pre_slice', 'post_slice',
+                           'sparse', 'sparse_mat', 'procedural']
 
 
 class AbstractConnector(abc.ABC):
@@ -333,8 +480,97 @@ class AbstractConnector(abc.ABC):
         pass
 
 
+def _record_init_params(init):
+    @functools.wraps(init)
+    def wrapper(self, *args, **kwargs):
+        if type(self).__init__ is wrapper and getattr(type(self), '_cached_connector', None) is type(self):
+            try:
+                bound = inspect.signature(init).bind(self, *args, **kwargs)
+                bound.apply_defaults()
+                params = dict(bound.arguments)
+                params.pop(next(iter(params)))  # "self"
+                self._init_params = params
+            except TypeError:
+                self._init_params = None
+        init(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _cached_call(call):
+    @functools.wraps(call)
+    def wrapper(self, pre_size, post_size=None, *args, **kwargs):
+        # the sizes are recorded to rebuild the derived structures
+        # (such as the procedural connectivity) of the cached connector
+        self._sizes = (pre_size, post_size)
+        key = None
+        if (type(self).__call__ is wrapper and not args and not kwargs
+                and getattr(type(self), '_cached_connector', None) is type(self)):
+            key = cache.get_key(self, pre_size, post_size)
+        self._cache_key = key
+        if key is not None:
+            data = cache.load(key)
+            if data is not None:
+                arrays, attrs = data
+                for name, value in arrays.items():
+                    setattr(self, name, ops.as_tensor(value))
+                for name, value in attrs.items():
+                    setattr(self, name, value)
+                return self
+        res = call(self, pre_size, post_size, *args, **kwargs)
+        if key is not None:
+            arrays = {k: v for k, v in vars(self).items()
+                      if isinstance(v, np.ndarray) and v.dtype != object}
+            # the dense matrix can be rebuilt from the indexes
+            if 'pre_ids' in arrays and 'post_ids' in arrays:
+                arrays.pop('conn_mat', None)
+            cache.save(key, arrays, attrs={'num_pre': self.num_pre, 'num_post': self.num_post})
+        return res
+
+    return wrapper
+
+
+def cached_connector(cls):
+    """Enable the disk cache of the connector class.
+
+    When the connectivity cache is enabled by
+    :py:func:`brainpy.connect.set_conn_cache`, the connectivity generated by
+    ``__call__()`` is stored into the disk, and reloaded for the connector
+    with the same class, parameters, seed and sizes. The built-in connectors
+    are cached, and the user-defined connectors can opt in by
+
+    >>> @cached_connector
+    >>> class MyConn(Connector):
+    >>>     def __init__(self, prob, seed=None):
+    >>>         ...
+
+    The subclasses of a cached connector are not cached unless they are
+    also decorated.
+
+    Parameters
+    ----------
+    cls : type
+        The subclass of :py:class:`Connector`.
+
+    Returns
+    -------
+    cls : type
+        The connector class.
+    """
+    if '__init__' in cls.__dict__:
+        cls.__init__ = _record_init_params(cls.__dict__['__init__'])
+    if '__call__' in cls.__dict__:
+        cls.__call__ = _cached_call(cls.__dict__['__call__'])
+    cls._cached_connector = cls
+    return cls
+
+
 class Connector(AbstractConnector):
-    """Abstract connector class."""
+    """Abstract connector class.
+
+    The connectivity of the subclasses decorated by :py:func:`cached_connector`
+    can be cached in the disk by :py:func:`brainpy.connect.set_conn_cache`.
+    """
 
     def __init__(self):
         # total size of the pre/post-synaptic neurons
@@ -352,6 +588,14 @@ class Connector(AbstractConnector):
         self.post2syn = None
         self.pre_slice = None
         self.post_slice = None
+        self.sparse = None
+        self.sparse_mat = None
+        self.procedural = None
+        self._cache_key = None
+
+        # the user index of each (reordered) neuron index
+        self.pre_order = None
+        self.post_order = None
 
         # synaptic weights
         self.weights = None
@@ -417,3 +661,175 @@ class Connector(AbstractConnector):
     def make_post_slice(self):
         self.pre_ids, self.post_ids, self.post_slice = \
             post_slice(self.pre_ids, self.post_ids, self.num_post)
+
+    def make_sparse(self):
+        if self.sparse is None:
+            key = getattr(self, '_cache_key', None)
+            data = None if key is None else cache.load(key, prefix='sparse_')
+            if data is not None:
+                self.sparse = SparseConnectivity.from_arrays(data[0], num_post=self.num_post)
+                return
+            if self.pre_ids is None or self.post_ids is None:
+                self.make_mat2ij()
+            weights = self.weights if isinstance(self.weights, np.ndarray) else None
+            self.sparse = SparseConnectivity.from_ij(self.pre_ids, self.post_ids, self.num_pre,
+                                                     self.num_post, weights=weights)
+            if key is not None:
+                cache.save(key, self.sparse.arrays(), attrs={}, prefix='sparse_')
+
+    def make_sparse_mat(self):
+        if self.sparse_mat is None:
+            try:
+                from scipy import sparse
+            except ModuleNotFoundError:
+                raise errors.PackageMissingError('SciPy must be installed when using the "sparse_mat" structure.')
+            self.make_sparse()
+            if self.sparse.weights is None:
+                data = np.ones(self.sparse.num_syn)
+            else:
+                data = np.asarray(self.sparse.weights, dtype=np.float_)
+            self.sparse_mat = sparse.csr_matrix((data, self.sparse.indices, self.sparse.indptr),
+                                                shape=(self.num_pre, self.num_post))
+
+    def make_procedural(self):
+        raise errors.ModelUseError(f'{self.__class__.__name__} does not support '
+                                   f'the procedural connectivity.')
+
+    def reorder(self, method='rcm', same_population=None):
+        """Renumber the neurons for the cache locality of the synaptic
+        loops, and sort the synapses by the pre- and then the post-synaptic
+        indexes (so that the post-synaptic indexes of each pre-synaptic
+        neuron are sorted).
+
+        The neuron groups should be created in the new ordering, in which the
+        neuron ``k`` is the user neuron ``pre_order[k]`` (or ``post_order[k]``).
+        The data can be converted between the user ordering and the new
+        ordering by :py:meth:`to_user` and :py:meth:`from_user`. The derived
+        synaptic structures (such as ``pre2post``) are rebuilt by
+        ``requires()`` after the reordering.
+
+        Parameters
+        ----------
+        method : str
+            The reordering method.
+
+            - "rcm": the Reverse Cuthill–McKee ordering of the connectivity.
+            - "hilbert": the Hilbert curve ordering of the two-dimensional
+              neuron positions.
+            - "sort": keep the neuron indexes, and only sort the synapses.
+        same_population : bool, optional
+            Whether the pre- and post-synaptic neurons are renumbered with the
+            same ordering, which is required for the recurrent connections.
+            Default is ``True`` if the numbers of the pre- and post-synaptic
+            neurons are equal.
+
+        Returns
+        -------
+        connector : Connector
+            The connector itself.
+        """
+        if self.pre_ids is None or self.post_ids is None:
+            if self.conn_mat is None:
+                raise errors.ModelUseError('No stored connections to reorder.')
+            self.make_mat2ij()
+        if same_population is None:
+            same_population = self.num_pre == self.num_post
+        elif same_population and self.num_pre != self.num_post:
+            raise errors.ModelUseError(f'The same ordering requires the same number of the pre- and '
+                                       f'post-synaptic neurons, but got {self.num_pre} != {self.num_post}.')
+        pre_ids = np.asarray(self.pre_ids, dtype=np.int64)
+        post_ids = np.asarray(self.post_ids, dtype=np.int64)
+
+        # the orderings of this reordering
+        if method == 'rcm':
+            if same_population:
+                pre_order = post_order = rcm_order(pre_ids, post_ids, self.num_pre)
+            else:
+                pre_order, post_order = rcm_order(pre_ids, post_ids, self.num_pre, self.num_post)
+        elif method == 'hilbert':
+            pre_size, post_size = getattr(self, '_sizes', (self.num_pre, self.num_post))
+            pre_order = hilbert_order(pre_size)
+            post_order = pre_order if same_population else hilbert_order(post_size)
+        elif method == 'sort':
+            pre_order = np.arange(self.num_pre)
+            post_order = np.arange(self.num_post)
+        else:
+            raise errors.ModelUseError(f'Unknown reordering method "{method}", only '
+                                       f'support "rcm", "hilbert" and "sort".')
+        pre_rank = np.empty_like(pre_order)
+        pre_rank[pre_order] = np.arange(len(pre_order))
+        post_rank = np.empty_like(post_order)
+        post_rank[post_order] = np.arange(len(post_order))
+
+        # the synapses
+        pre_ids, post_ids = pre_rank[pre_ids], post_rank[post_ids]
+        syn_order = np.lexsort((post_ids, pre_ids))
+        self.pre_ids = ops.as_tensor(pre_ids[syn_order])
+        self.post_ids = ops.as_tensor(post_ids[syn_order])
+        if isinstance(self.weights, np.ndarray) and np.size(self.weights) == len(syn_order):
+            self.weights = ops.as_tensor(np.asarray(self.weights)[syn_order])
+        self.pre_order = pre_order if self.pre_order is None else self.pre_order[pre_order]
+        self.post_order = post_order if self.post_order is None else self.post_order[post_order]
+
+        # the derived structures
+        for name in SUPPORTED_SYN_STRUCTURE:
+            if name not in ['pre_ids', 'post_ids']:
+                setattr(self, name, None)
+        self._cache_key = None
+        return self
+
+    def _order_of(self, side):
+        if side == 'pre':
+            return self.pre_order
+        elif side == 'post':
+            return self.post_order
+        else:
+            raise errors.ModelUseError(f'Unknown side "{side}", only support "pre" and "post".')
+
+    def to_user(self, values, side='post', axis=-1):
+        """Convert the data in the reordered neuron indexes (such as the
+        monitored values) into the user ordering.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            The data.
+        side : str
+            The data of the "pre" or "post" synaptic neurons.
+        axis : int
+            The neuron axis of the data.
+
+        Returns
+        -------
+        values : np.ndarray
+            The data in the user ordering.
+        """
+        order = self._order_of(side)
+        if order is None:
+            return values
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        return np.take(values, rank, axis=axis)
+
+    def from_user(self, values, side='post', axis=-1):
+        """Convert the data in the user ordering (such as the inputs)
+        into the reordered neuron indexes.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            The data.
+        side : str
+            The data of the "pre" or "post" synaptic neurons.
+        axis : int
+            The neuron axis of the data.
+
+        Returns
+        -------
+        values : np.ndarray
+            The data in the reordered neuron indexes.
+        """
+        order = self._order_of(side)
+        if order is None:
+            return values
+        return np.take(values, order, axis=axis)
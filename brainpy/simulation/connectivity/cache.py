@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+
+"""
+Disk-backed cache of the connectivity.
+
+The connectivity generated by a ``Connector`` is stored in a directory
+named by the hash of the connector class, its initialization parameters,
+the pre-/post-synaptic sizes and the BrainPy version. Each array is saved
+as an ``.npy`` file, and is reloaded with ``np.load(mmap_mode='r')``, so
+that the large connectivity is not copied into the memory until it is
+used. The least recently used entries are evicted when the total size
+of the cache exceeds the limit.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from brainpy import errors
+
+__all__ = [
+    'set_conn_cache',
+    'get_conn_cache',
+    'clear_conn_cache',
+]
+
+_META_FILE = 'meta.json'
+_CACHE = {'directory': None, 'max_size': 2 ** 30}
+
+
+def set_conn_cache(directory=None, max_size=None):
+    """Set the disk cache of the connectivity.
+
+    Parameters
+    ----------
+    directory : str, None
+        The cache directory. If ``None``, the cache is disabled.
+    max_size : int, None
+        The maximum size (in bytes) of the cache directory. Default is 1 GB.
+    """
+    if directory is not None:
+        directory = os.path.abspath(os.path.expanduser(directory))
+        os.makedirs(directory, exist_ok=True)
+    _CACHE['directory'] = directory
+    if max_size is not None:
+        if max_size <= 0:
+            raise errors.ModelUseError(f'"max_size" must be positive, but we got {max_size}.')
+        _CACHE['max_size'] = max_size
+
+
+def get_conn_cache():
+    """Get the disk cache setting of the connectivity.
+
+    Returns
+    -------
+    setting : dict
+        The cache directory and the maximum size.
+    """
+    return dict(_CACHE)
+
+
+def clear_conn_cache():
+    """Remove all the cached connectivity."""
+    directory = _CACHE['directory']
+    if directory is not None and os.path.isdir(directory):
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if os.path.isfile(os.path.join(path, _META_FILE)):
+                shutil.rmtree(path, ignore_errors=True)
+
+
+def _param_repr(value):
+    """Get the stable representation of a parameter, or ``None``
+    if the parameter cannot be represented (e.g., functions)."""
+    if isinstance(value, (bool, int, float, complex, str, type(None))):
+        return repr(value)
+    elif isinstance(value, np.generic):
+        return repr(value.item())
+    elif isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return None
+        return f'array({hashlib.sha1(np.ascontiguousarray(value).tobytes()).hexdigest()}, ' \
+               f'{value.shape}, {value.dtype})'
+    elif isinstance(value, (list, tuple)):
+        items = [_param_repr(v) for v in value]
+        if any(v is None for v in items):
+            return None
+        return f'{type(value).__name__}({", ".join(items)})'
+    elif isinstance(value, dict):
+        items = [(repr(k), _param_repr(v)) for k, v in sorted(value.items(), key=lambda a: repr(a[0]))]
+        if any(v is None for _, v in items):
+            return None
+        return '{' + ', '.join(f'{k}: {v}' for k, v in items) + '}'
+    else:
+        return None
+
+
+def get_key(connector, pre_size, post_size):
+    """Get the cache key of the connector.
+
+    Returns
+    -------
+    key : str, None
+        The hash key, or ``None`` if the connectivity is not cacheable,
+        including the cache is disabled, the connector is seeded with
+        ``seed=None``, or the parameters can not be represented.
+    """
+    import brainpy
+
+    if _CACHE['directory'] is None:
+        return None
+    params = getattr(connector, '_init_params', None)
+    if params is None:
+        return None
+    if 'seed' in params and params['seed'] is None:
+        return None
+    items = []
+    for k in sorted(params.keys()):
+        r = _param_repr(params[k])
+        if r is None:
+            return None
+        items.append(f'{k}={r}')
+    sizes = (_param_repr(pre_size), _param_repr(post_size))
+    if None in sizes:
+        return None
+    cls = connector.__class__
+    text = f'{cls.__module__}.{cls.__qualname__}({", ".join(items)}), ' \
+           f'pre_size={sizes[0]}, post_size={sizes[1]}, version={brainpy.__version__}'
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def _entry_size(path):
+    size = 0
+    for name in os.listdir(path):
+        size += os.path.getsize(os.path.join(path, name))
+    return size
+
+
+def _evict():
+    directory = _CACHE['directory']
+    entries = []
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        meta = os.path.join(path, _META_FILE)
+        if os.path.isfile(meta):
+            entries.append((os.path.getmtime(meta), _entry_size(path), path))
+    total = sum(e[1] for e in entries)
+    for _, size, path in sorted(entries):
+        if total <= _CACHE['max_size']:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+
+
+def _read_meta(meta_file):
+    if not os.path.isfile(meta_file):
+        return None
+    try:
+        with open(meta_file, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save(key, arrays, attrs, prefix=''):
+    """Save the arrays and the attributes into the cache entry ``key``.
+
+    Parameters
+    ----------
+    key : str
+        The cache key.
+    arrays : dict
+        The arrays to save.
+    attrs : dict
+        The JSON-serializable attributes to save.
+    prefix : str
+        The prefix of the saved names, which is used to store the derived
+        structures into the same entry. Nothing is saved if the cache is disabled.
+    """
+    if _CACHE['directory'] is None:
+        return
+    path = os.path.join(_CACHE['directory'], key)
+    os.makedirs(path, exist_ok=True)
+    meta_file = os.path.join(path, _META_FILE)
+    meta = _read_meta(meta_file)
+    if meta is None:
+        meta = {'arrays': {}, 'attrs': {}}
+    # each file is written to a temporary file first, and then renamed, so that
+    # the interrupted or the concurrent writers never leave a truncated file,
+    # and the arrays are complete once they are listed in the meta file
+    for name, value in arrays.items():
+        tmp_file = os.path.join(path, f'{prefix}{name}.{os.getpid()}.tmp.npy')
+        np.save(tmp_file, np.asarray(value))
+        os.replace(tmp_file, os.path.join(path, f'{prefix}{name}.npy'))
+    meta['arrays'][prefix] = list(arrays.keys())
+    meta['attrs'][prefix] = attrs
+    tmp_file = meta_file + f'.{os.getpid()}.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_file, meta_file)
+    _evict()
+
+
+def load(key, prefix=''):
+    """Load the arrays and the attributes from the cache entry ``key``.
+
+    Returns
+    -------
+    data : tuple, None
+        The dict of the memory-mapped arrays and the dict of the
+        attributes, or ``None`` if the entry does not exist, or the
+        cache is disabled.
+    """
+    if _CACHE['directory'] is None:
+        return None
+    path = os.path.join(_CACHE['directory'], key)
+    meta_file = os.path.join(path, _META_FILE)
+    meta = _read_meta(meta_file)
+    if meta is None or prefix not in meta['arrays']:
+        return None
+    try:
+        arrays = {name: np.asarray(np.load(os.path.join(path, f'{prefix}{name}.npy'), mmap_mode='r'))
+                  for name in meta['arrays'][prefix]}
+    except (OSError, ValueError):
+        return None
+    # the recently used time
+    now = time.time()
+    os.utime(meta_file, (now, now))
+    return arrays, meta['attrs'][prefix]
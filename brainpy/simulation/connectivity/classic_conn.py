@@ -6,6 +6,7 @@ import numpy as np
 from brainpy import backend
 from brainpy.simulation import utils
 from brainpy.simulation.connectivity.base import Connector
+from brainpy.simulation.connectivity.base import cached_connector
 
 try:
     import numba as nb
@@ -15,6 +16,7 @@ except ModuleNotFoundError:
 __all__ = [
 ]
 
+@cached_connector
 class CompleteGraph(Connector):
     pass
 
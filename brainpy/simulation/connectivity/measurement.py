@@ -3,50 +3,224 @@
 
 import numpy as np
 
+from brainpy import errors
+from brainpy import tools
+from brainpy.tools import numba_prange
+from brainpy.simulation.connectivity.base import mat2ij
+
 __all__ = [
     'cluster_coefficient',
+    'average_path_length',
+    'degree_distribution',
+    'reciprocity',
 ]
 
 
-def cluster_coefficient(conn_mat):
-    ccs = []
-    nodes = np.arange(conn_mat.shape[0])
-    for node in nodes:
+def _get_ij(conn_mat, i, j, num):
+    if conn_mat is not None:
+        i, j = mat2ij(conn_mat)
+        num = np.shape(conn_mat)[0] if num is None else num
+    elif i is None or j is None:
+        raise errors.ModelUseError('Please provide "conn_mat", or "i" and "j".')
+    i = np.asarray(i, dtype=np.int64)
+    j = np.asarray(j, dtype=np.int64)
+    if len(i) != len(j):
+        raise errors.ModelUseError('The length of "i" and "j" must be the same.')
+    if num is None:
+        num = int(max(i.max(), j.max())) + 1 if len(i) else 0
+    return i, j, num
+
+
+def _sorted_csr(i, j, num):
+    # the CSR structure with the sorted and unique neighbors, and without self-loops
+    keys = np.unique(i[i != j] * num + j[i != j])
+    i, j = np.divmod(keys, num)
+    indptr = np.zeros(num + 1, dtype=np.int64)
+    np.cumsum(np.bincount(i, minlength=num), out=indptr[1:])
+    return indptr, j
+
+
+@tools.numba_jit(parallel=True)
+def _local_clustering(indptr, indices):
+    num = indptr.shape[0] - 1
+    ccs = np.zeros(num)
+    for u in numba_prange(num):
+        u_start, u_end = indptr[u], indptr[u + 1]
+        k = u_end - u_start
+        if k < 2:
+            continue
         triangles = 0
-        neighbor_pairs = 0
-        neighbors = np.where(conn_mat[node])[0]
-        for neighbor1 in neighbors:
-            for neighbor2 in neighbors:
-                if neighbor1 == neighbor2:
-                    continue
-                neighbor_pairs += 1
-                if conn_mat[neighbor1, neighbor2]:
+        for a in range(u_start, u_end):
+            v = indices[a]
+            # intersection of the sorted neighbors of "u" and "v"
+            p, q = u_start, indptr[v]
+            q_end = indptr[v + 1]
+            while p < u_end and q < q_end:
+                if indices[p] < indices[q]:
+                    p += 1
+                elif indices[p] > indices[q]:
+                    q += 1
+                else:
                     triangles += 1
-        ccs.append(triangles / neighbor_pairs)
-    return sum(ccs) / len(ccs)
-
-
-def average_path_length(conn_mat):
-    def _get_sample_paths():
-        node_count = len(self._random_graph)
-        sample_paths = []
-        if node_count <= 14:  # with 14 nodes, there are a maximum of 91 node combinations possible, 15 has 105
-            for node1 in list(self._random_graph.nodes):
-                for node2 in list(self._random_graph.nodes):
-                    if node1 != node2 and (node1, node2) not in sample_paths and (node2, node1) not in sample_paths:
-                        sample_paths.append((node1, node2))
-        else:
-            while len(sample_paths) < 100:
-                random_node1 = list(self._random_graph.nodes)[random.randint(0, node_count - 1)]
-                random_node2 = list(self._random_graph.nodes)[random.randint(0, node_count - 1)]
-                if (random_node1 != random_node2 and (random_node1, random_node2) not in sample_paths and
-                        (random_node2, random_node1) not in sample_paths):
-                    sample_paths.append((random_node1, random_node2))
-        return sample_paths
-
-    def _compute_average_path_length(self):
-        sample_paths = self._get_sample_paths()
-        distances = []
-        for (first_node, second_node) in sample_paths:
-            distances.append(nx.shortest_path_length(self._random_graph, first_node, second_node))
-        self._average_path_length = sum(distances) / len(distances)
+                    p += 1
+                    q += 1
+        ccs[u] = triangles / (k * (k - 1))
+    return ccs
+
+
+@tools.numba_jit(parallel=True)
+def _bfs_path_lengths(indptr, indices, sources):
+    num = indptr.shape[0] - 1
+    total = np.zeros(sources.shape[0])
+    count = np.zeros(sources.shape[0], dtype=np.int64)
+    for s in numba_prange(sources.shape[0]):
+        dist = np.full(num, -1, dtype=np.int64)
+        queue = np.empty(num, dtype=np.int64)
+        source = sources[s]
+        dist[source] = 0
+        queue[0] = source
+        head, tail = 0, 1
+        while head < tail:
+            u = queue[head]
+            head += 1
+            for a in range(indptr[u], indptr[u + 1]):
+                v = indices[a]
+                if dist[v] < 0:
+                    dist[v] = dist[u] + 1
+                    total[s] += dist[v]
+                    count[s] += 1
+                    queue[tail] = v
+                    tail += 1
+    return total, count
+
+
+def cluster_coefficient(conn_mat=None, i=None, j=None, num=None):
+    """Get the average clustering coefficient of the network.
+
+    For each node :math:`u` with :math:`k_u` (out-going) neighbors, the
+    local clustering coefficient is the fraction of the connected neighbor
+    pairs :math:`T_u / (k_u (k_u - 1))`, which is zero if :math:`k_u < 2`.
+    The triangles are counted by the intersection of the sorted neighbors.
+
+    Parameters
+    ----------
+    conn_mat : np.ndarray, optional
+        The connectivity matrix.
+    i : np.ndarray, optional
+        The pre-synaptic neuron indexes (if "conn_mat" is not provided).
+    j : np.ndarray, optional
+        The post-synaptic neuron indexes (if "conn_mat" is not provided).
+    num : int, optional
+        The number of the nodes.
+
+    Returns
+    -------
+    coefficient : float
+        The average clustering coefficient.
+    """
+    i, j, num = _get_ij(conn_mat, i, j, num)
+    if num == 0:
+        return 0.
+    indptr, indices = _sorted_csr(i, j, num)
+    return float(np.mean(_local_clustering(indptr, indices)))
+
+
+def average_path_length(conn_mat=None, i=None, j=None, num=None, num_sample=None, seed=None):
+    """Get the average shortest path length of the network.
+
+    The path lengths are computed by the breadth-first searches
+    from the source nodes, and are averaged over all the reachable
+    node pairs.
+
+    Parameters
+    ----------
+    conn_mat : np.ndarray, optional
+        The connectivity matrix.
+    i : np.ndarray, optional
+        The pre-synaptic neuron indexes (if "conn_mat" is not provided).
+    j : np.ndarray, optional
+        The post-synaptic neuron indexes (if "conn_mat" is not provided).
+    num : int, optional
+        The number of the nodes.
+    num_sample : int, optional
+        The number of the sampled source nodes. If not provided,
+        all the nodes are used as the sources.
+    seed : int, optional
+        The random seed to sample the source nodes.
+
+    Returns
+    -------
+    length : float
+        The average shortest path length.
+    """
+    i, j, num = _get_ij(conn_mat, i, j, num)
+    indptr, indices = _sorted_csr(i, j, num)
+    if num_sample is None or num_sample >= num:
+        sources = np.arange(num, dtype=np.int64)
+    else:
+        rng = np.random.RandomState(seed)
+        sources = np.asarray(rng.choice(num, num_sample, replace=False), dtype=np.int64)
+    total, count = _bfs_path_lengths(indptr, indices, sources)
+    count = count.sum()
+    return float(total.sum() / count) if count > 0 else 0.
+
+
+def degree_distribution(conn_mat=None, i=None, j=None, num=None, direction='out'):
+    """Get the degree distribution of the network.
+
+    Parameters
+    ----------
+    conn_mat : np.ndarray, optional
+        The connectivity matrix.
+    i : np.ndarray, optional
+        The pre-synaptic neuron indexes (if "conn_mat" is not provided).
+    j : np.ndarray, optional
+        The post-synaptic neuron indexes (if "conn_mat" is not provided).
+    num : int, optional
+        The number of the nodes.
+    direction : str
+        "out" for the out-degree, "in" for the in-degree.
+
+    Returns
+    -------
+    distribution : np.ndarray
+        The number of the nodes with the degree of each index.
+    """
+    i, j, num = _get_ij(conn_mat, i, j, num)
+    if direction == 'out':
+        degrees = np.bincount(i, minlength=num)
+    elif direction == 'in':
+        degrees = np.bincount(j, minlength=num)
+    else:
+        raise errors.ModelUseError(f'Unknown direction "{direction}", only support "in" and "out".')
+    return np.bincount(degrees)
+
+
+def reciprocity(conn_mat=None, i=None, j=None, num=None):
+    """Get the reciprocity of the network, i.e., the fraction of the
+    edges :math:`u \\to v` (:math:`u \\neq v`) whose reversed edges
+    :math:`v \\to u` also exist.
+
+    Parameters
+    ----------
+    conn_mat : np.ndarray, optional
+        The connectivity matrix.
+    i : np.ndarray, optional
+        The pre-synaptic neuron indexes (if "conn_mat" is not provided).
+    j : np.ndarray, optional
+        The post-synaptic neuron indexes (if "conn_mat" is not provided).
+    num : int, optional
+        The number of the nodes.
+
+    Returns
+    -------
+    reciprocity : float
+        The reciprocity.
+    """
+    i, j, num = _get_ij(conn_mat, i, j, num)
+    keys = np.unique(i[i != j] * num + j[i != j])
+    if len(keys) == 0:
+        return 0.
+    reversed_keys = (keys % num) * num + keys // num
+    pos = np.minimum(np.searchsorted(keys, reversed_keys), len(keys) - 1)
+    return float(np.mean(keys[pos] == reversed_keys))
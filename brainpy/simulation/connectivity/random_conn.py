@@ -2,10 +2,14 @@
 
 import numpy as np
 
+from brainpy import errors
 from brainpy import tools
+from brainpy.tools import numba_prange
 from brainpy.backend import ops
 from brainpy.simulation import utils
 from brainpy.simulation.connectivity.base import Connector
+from brainpy.simulation.connectivity.base import cached_connector
+from brainpy.simulation.connectivity.base import SparseConnectivity
 
 __all__ = [
     'FixedPostNum',
@@ -18,173 +22,696 @@ __all__ = [
     'ScaleFreeBA',
     'ScaleFreeBADual',
     'PowerLaw',
+    'ProceduralConnectivity',
 ]
 
 
 @tools.numba_jit
-def _prob_conn(pre_i, num_post, prob, include_self):
-    conn_i = []
-    conn_j = []
-    if include_self:
-        for j in range(num_post):
-            if np.random.random() < prob:
-                conn_i.append(pre_i)
-                conn_j.append(j)
+def _fixed_prob_row(key, i, num_post, prob, include_self, indices, start, fill):
+    # The Bernoulli trials of all the candidates are realized by the
+    # geometric skips between two successes, so that the cost is
+    # proportional to the number of synapses.
+    exclude = (not include_self) and i < num_post
+    num_candidate = num_post - 1 if exclude else num_post
+    log_q = np.log(1. - prob) if prob < 1. else 0.
+    n = 0
+    c = -1
+    while prob > 0.:
+        if prob < 1.:
+            c += 1 + int(np.floor(np.log(1. - tools.rng_uniform(key, n)) / log_q))
+        else:
+            c += 1
+        if c >= num_candidate:
+            break
+        if fill:
+            indices[start + n] = c + 1 if (exclude and c >= i) else c
+        n += 1
+    return n
+
+
+@tools.numba_jit
+def _bernoulli_row(key, i, num_post, prob, include_self, indices, start, fill):
+    n = 0
+    for j in range(num_post):
+        if tools.rng_uniform(key, j) < prob and (include_self or i != j):
+            if fill:
+                indices[start + n] = j
+            n += 1
+    return n
+
+
+@tools.numba_jit(parallel=True)
+def _fixed_prob_conn(seed, num_pre, num_post, prob, include_self, skip):
+    # Each row is sampled from its own random stream "(seed, row)",
+    # so that the rows can be generated in any order and by any
+    # number of threads with the identical results.
+    empty = np.empty(0, dtype=np.int64)
+
+    # count
+    counts = np.zeros(num_pre, dtype=np.int64)
+    for i in numba_prange(num_pre):
+        key = tools.rng_key(seed, i)
+        if skip:
+            counts[i] = _fixed_prob_row(key, i, num_post, prob, include_self, empty, 0, False)
+        else:
+            counts[i] = _bernoulli_row(key, i, num_post, prob, include_self, empty, 0, False)
+    indptr = np.zeros(num_pre + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(counts)
+
+    # fill
+    indices = np.empty(indptr[-1], dtype=np.int64)
+    for i in numba_prange(num_pre):
+        key = tools.rng_key(seed, i)
+        if skip:
+            _fixed_prob_row(key, i, num_post, prob, include_self, indices, indptr[i], True)
+        else:
+            _bernoulli_row(key, i, num_post, prob, include_self, indices, indptr[i], True)
+    return indptr, indices
+
+
+@tools.numba_jit
+def _choose_row(key, i, num, num_col, include_self, out):
+    # Choose "num" sorted and distinct integers in [0, num_col) for the row "i".
+    exclude = (not include_self) and i < num_col
+    num_candidate = num_col - 1 if exclude else num_col
+    if num * num <= 4 * num_candidate:
+        # Floyd's algorithm
+        n = 0
+        for t in range(num_candidate - num, num_candidate):
+            r = tools.rng_randint(key, n, t + 1)
+            for a in range(n):
+                if out[a] == r:
+                    r = t
+                    break
+            out[n] = r
+            n += 1
+        out.sort()
     else:
-        for j in range(num_post):
-            if np.random.random() < prob:
-                if pre_i != j:
-                    conn_i.append(pre_i)
-                    conn_j.append(j)
-    return conn_i, conn_j
+        # the selection sampling
+        n = 0
+        for c in range(num_candidate):
+            if (num_candidate - c) * tools.rng_uniform(key, c) < num - n:
+                out[n] = c
+                n += 1
+                if n == num:
+                    break
+    if exclude:
+        for a in range(num):
+            if out[a] >= i:
+                out[a] += 1
+
+
+@tools.numba_jit(parallel=True)
+def _fixed_num_conn(seed, num_row, num_col, num, include_self):
+    # Choose "num" columns for each row from the random stream "(seed, row)".
+    indices = np.empty((num_row, num), dtype=np.int64)
+    for i in numba_prange(num_row):
+        key = tools.rng_key(seed, i)
+        _choose_row(key, i, num, num_col, include_self, indices[i])
+    return indices.reshape(-1)
+
+
+@tools.numba_jit(parallel=True)
+def _bernoulli_select(seed, indptr, probs):
+    # Select the synapses of each row with the random stream "(seed, row)".
+    selected = np.zeros(probs.shape[0], dtype=np.bool_)
+    for i in numba_prange(indptr.shape[0] - 1):
+        key = tools.rng_key(seed, i)
+        for a in range(indptr[i], indptr[i + 1]):
+            selected[a] = tools.rng_uniform(key, a - indptr[i]) < probs[a]
+    return selected
+
+
+# The kinds of the spatial kernels
+_GAUSSIAN_WEIGHT = 0
+_GAUSSIAN_PROB = 1
+_DOG = 2
 
 
 @tools.numba_jit
-def _gaussian_weight(pre_i, pre_width, pre_height, num_post, post_width, post_height,
-                     w_max, w_min, sigma, normalize, include_self):
-    conn_i = []
-    conn_j = []
-    conn_w = []
-
-    # get normalized coordination
-    pre_coords = (pre_i // pre_width, pre_i % pre_width)
-    if normalize:
-        pre_coords = (pre_coords[0] / (pre_height - 1) if pre_height > 1 else 1.,
-                      pre_coords[1] / (pre_width - 1) if pre_width > 1 else 1.)
-
-    for post_i in range(num_post):
-        if (pre_i == post_i) and (not include_self):
-            continue
-
-        # get normalized coordination
-        post_coords = (post_i // post_width, post_i % post_width)
-        if normalize:
-            post_coords = (post_coords[0] / (post_height - 1) if post_height > 1 else 1.,
-                           post_coords[1] / (post_width - 1) if post_width > 1 else 1.)
-
-        # Compute Euclidean distance between two coordinates
-        distance = (pre_coords[0] - post_coords[0]) ** 2
-        distance += (pre_coords[1] - post_coords[1]) ** 2
-        # get weight and conn
-        value = w_max * np.exp(-distance / (2.0 * sigma ** 2))
-        if value > w_min:
-            conn_i.append(pre_i)
-            conn_j.append(post_i)
-            conn_w.append(value)
-    return conn_i, conn_j, conn_w
+def _kernel_value(kind, params, d2):
+    if kind == _GAUSSIAN_WEIGHT:  # params: w_max, sigma
+        return params[0] * np.exp(-d2 / (2.0 * params[1] ** 2))
+    elif kind == _GAUSSIAN_PROB:  # params: sigma
+        return np.exp(-d2 / (2.0 * params[0] ** 2))
+    else:  # params: w_max_p, w_max_n, sigma_p, sigma_n
+        return params[0] * np.exp(-d2 / (2.0 * params[2] ** 2)) - \
+               params[1] * np.exp(-d2 / (2.0 * params[3] ** 2))
 
 
 @tools.numba_jit
-def _gaussian_prob(pre_i, pre_width, pre_height, num_post, post_width, post_height,
-                   p_min, sigma, normalize, include_self):
-    conn_i = []
-    conn_j = []
-    conn_p = []
-
-    # get normalized coordination
-    pre_coords = (pre_i // pre_width, pre_i % pre_width)
+def _grid_axis(num, normalize):
+    # the spacing and the offset of the coordinates along one axis
     if normalize:
-        pre_coords = (pre_coords[0] / (pre_height - 1) if pre_height > 1 else 1.,
-                      pre_coords[1] / (pre_width - 1) if pre_width > 1 else 1.)
-
-    for post_i in range(num_post):
-        if (pre_i == post_i) and (not include_self):
-            continue
-
-        # get normalized coordination
-        post_coords = (post_i // post_width, post_i % post_width)
-        if normalize:
-            post_coords = (post_coords[0] / (post_height - 1) if post_height > 1 else 1.,
-                           post_coords[1] / (post_width - 1) if post_width > 1 else 1.)
-
-        # Compute Euclidean distance between two coordinates
-        distance = (pre_coords[0] - post_coords[0]) ** 2
-        distance += (pre_coords[1] - post_coords[1]) ** 2
-        # get weight and conn
-        value = np.exp(-distance / (2.0 * sigma ** 2))
-        if value > p_min:
-            conn_i.append(pre_i)
-            conn_j.append(post_i)
-            conn_p.append(value)
-    return conn_i, conn_j, conn_p
+        if num > 1:
+            return 1. / (num - 1), 0.
+        else:
+            return 1., 1.
+    else:
+        return 1., 0.
 
 
 @tools.numba_jit
-def _dog(pre_i, pre_width, pre_height, num_post, post_width, post_height,
-         w_max_p, w_max_n, w_min, sigma_p, sigma_n, normalize, include_self):
-    conn_i = []
-    conn_j = []
-    conn_w = []
-
-    # get normalized coordination
-    pre_coords = (pre_i // pre_width, pre_i % pre_width)
-    if normalize:
-        pre_coords = (pre_coords[0] / (pre_height - 1) if pre_height > 1 else 1.,
-                      pre_coords[1] / (pre_width - 1) if pre_width > 1 else 1.)
-
-    for post_i in range(num_post):
-        if (pre_i == post_i) and (not include_self):
-            continue
-
-        # get normalized coordination
-        post_coords = (post_i // post_width, post_i % post_width)
-        if normalize:
-            post_coords = (post_coords[0] / (post_height - 1) if post_height > 1 else 1.,
-                           post_coords[1] / (post_width - 1) if post_width > 1 else 1.)
-
-        # Compute Euclidean distance between two coordinates
-        distance = (pre_coords[0] - post_coords[0]) ** 2
-        distance += (pre_coords[1] - post_coords[1]) ** 2
-        # get weight and conn
-        value = w_max_p * np.exp(-distance / (2.0 * sigma_p ** 2)) - \
-                w_max_n * np.exp(-distance / (2.0 * sigma_n ** 2))
-        if np.abs(value) > w_min:
-            conn_i.append(pre_i)
-            conn_j.append(post_i)
-            conn_w.append(value)
-    return conn_i, conn_j, conn_w
+def _axis_range(pos, radius, num, spacing, offset, periodic):
+    # The index range of the grid points within "radius" of "pos". The
+    # returned "wrap" denotes the range covers the whole periodic axis,
+    # in which the minimum image distance should be used.
+    if np.isinf(radius):
+        return 0, num - 1, periodic
+    lo = int(np.ceil((pos - radius - offset) / spacing))
+    hi = int(np.floor((pos + radius - offset) / spacing))
+    if periodic:
+        if hi - lo + 1 >= num:
+            return 0, num - 1, True
+        return lo, hi, False
+    return max(lo, 0), min(hi, num - 1), False
 
 
 @tools.numba_jit
-def _smallworld_rewire(prob, i, all_j, include_self):
-    if np.random.random() < prob:
-        non_connected = np.where(all_j == False)[0]
-        if len(non_connected) <= 1:
-            return -1
-        # Enforce no self-loops or multiple edges
-        w = np.random.choice(non_connected)
-        while (not include_self) and w == i:
-            non_connected.remove(w)
-            w = np.random.choice(non_connected)
-        return w
-
-
-def _random_subset(seq, m, rng):
-    """Return m unique elements from seq.
-
-    This differs from random.sample which can return repeated
-    elements if seq holds repeated elements.
-
-    Note: rng is a random.Random or numpy.random.RandomState instance.
+def _axis_diff(k, pos, num, spacing, offset, wrap):
+    diff = k * spacing + offset - pos
+    if wrap:
+        period = num * spacing
+        diff = abs(diff) % period
+        diff = min(diff, period - diff)
+    return diff
+
+
+@tools.numba_jit
+def _local_row(pre_i, kind, params, threshold, radius, pre_height, pre_width, post_height,
+               post_width, normalize, periodic, include_self, indices, values, start, fill):
+    # Visit the post-synaptic neurons within the "radius" of the pre-synaptic
+    # neuron "pre_i", and count (or fill) the connections whose kernel values
+    # are larger than the "threshold".
+    pre_sy, pre_oy = _grid_axis(pre_height, normalize)
+    pre_sx, pre_ox = _grid_axis(pre_width, normalize)
+    post_sy, post_oy = _grid_axis(post_height, normalize)
+    post_sx, post_ox = _grid_axis(post_width, normalize)
+    pre_y = (pre_i // pre_width) * pre_sy + pre_oy
+    pre_x = (pre_i % pre_width) * pre_sx + pre_ox
+    r2 = radius * radius
+
+    n = 0
+    row_lo, row_hi, row_wrap = _axis_range(pre_y, radius, post_height, post_sy, post_oy, periodic)
+    col_lo, col_hi, col_wrap = _axis_range(pre_x, radius, post_width, post_sx, post_ox, periodic)
+    for row in range(row_lo, row_hi + 1):
+        dy = _axis_diff(row, pre_y, post_height, post_sy, post_oy, row_wrap)
+        post_row = row % post_height
+        for col in range(col_lo, col_hi + 1):
+            dx = _axis_diff(col, pre_x, post_width, post_sx, post_ox, col_wrap)
+            d2 = dy * dy + dx * dx
+            if d2 > r2:
+                continue
+            post_i = post_row * post_width + col % post_width
+            if (not include_self) and pre_i == post_i:
+                continue
+            value = _kernel_value(kind, params, d2)
+            if abs(value) > threshold:
+                if fill:
+                    indices[start + n] = post_i
+                    values[start + n] = value
+                n += 1
+    return n
+
+
+@tools.numba_jit(parallel=True)
+def _local_conn(kind, params, threshold, radius, pre_height, pre_width, post_height,
+                post_width, normalize, periodic, include_self):
+    num_pre = pre_height * pre_width
+    empty_i = np.empty(0, dtype=np.int64)
+    empty_v = np.empty(0, dtype=np.float64)
+
+    # count
+    counts = np.zeros(num_pre, dtype=np.int64)
+    for i in numba_prange(num_pre):
+        counts[i] = _local_row(i, kind, params, threshold, radius, pre_height, pre_width,
+                               post_height, post_width, normalize, periodic, include_self,
+                               empty_i, empty_v, 0, False)
+    indptr = np.zeros(num_pre + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(counts)
+
+    # fill
+    indices = np.empty(indptr[-1], dtype=np.int64)
+    values = np.empty(indptr[-1], dtype=np.float64)
+    for i in numba_prange(num_pre):
+        _local_row(i, kind, params, threshold, radius, pre_height, pre_width,
+                   post_height, post_width, normalize, periodic, include_self,
+                   indices, values, indptr[i], True)
+    return indptr, indices, values
+
+
+def _cutoff_radius(amplitude, sigma, threshold):
+    # the distance beyond which "amplitude * exp(-d^2 / (2 sigma^2))" <= threshold
+    if threshold <= 0.:
+        return np.inf
+    if amplitude <= threshold:
+        return 0.
+    return np.sqrt(2. * sigma ** 2 * np.log(amplitude / threshold))
+
+
+def _local_args(connector, pre_size, post_size, kind, params, threshold, radius):
+    # the arguments of "_local_row()" and "_local_conn()" after "pre_i"
+    connector.num_pre = utils.size2len(pre_size)
+    connector.num_post = utils.size2len(post_size)
+    assert len(pre_size) == 2
+    assert len(post_size) == 2
+    pre_height, pre_width = pre_size
+    post_height, post_width = post_size
+    if connector.cutoff is not None:
+        radius = min(radius, connector.cutoff)
+    return (kind, np.asarray(params, dtype=np.float_), threshold, float(radius),
+            pre_height, pre_width, post_height, post_width, connector.normalize,
+            connector.periodic_boundary, connector.include_self)
+
+
+def _local_conn_of(connector, pre_size, post_size, kind, params, threshold, radius):
+    args = _local_args(connector, pre_size, post_size, kind, params, threshold, radius)
+    indptr, post_ids, values = _local_conn(*args)
+    pre_ids = np.repeat(np.arange(connector.num_pre), np.diff(indptr))
+    return pre_ids, post_ids, values
+
+
+def _fixed_prob_row_of(seed, num_post, prob, include_self, skip):
+    @tools.numba_jit
+    def row(pre_id, indices, values):
+        key = tools.rng_key(seed, pre_id)
+        if skip:
+            return _fixed_prob_row(key, pre_id, num_post, prob, include_self, indices, 0, True)
+        else:
+            return _bernoulli_row(key, pre_id, num_post, prob, include_self, indices, 0, True)
+
+    return row
+
+
+def _gaussian_prob_row_of(seed, kind, params, threshold, radius, pre_height, pre_width,
+                          post_height, post_width, normalize, periodic, include_self):
+    @tools.numba_jit
+    def row(pre_id, indices, values):
+        # the same candidates and the same random numbers as "GaussianProb.__call__()"
+        n = _local_row(pre_id, kind, params, threshold, radius, pre_height, pre_width,
+                       post_height, post_width, normalize, periodic, include_self,
+                       indices, values, 0, True)
+        key = tools.rng_key(seed, pre_id)
+        m = 0
+        for a in range(n):
+            if tools.rng_uniform(key, a) < values[a]:
+                indices[m] = indices[a]
+                m += 1
+        return m
+
+    return row
+
+
+def _procedural_kernels(seed, num_pre, num_post, row):
+    # The synaptic weights are derived from the random
+    # streams "(seed, num_pre + pre_id)".
+
+    @tools.numba_jit
+    def propagate(spikes, weight, target):
+        indices = np.empty(num_post, dtype=np.int64)
+        values = np.empty(num_post, dtype=np.float64)
+        for i in range(spikes.shape[0]):
+            if spikes[i]:
+                n = row(i, indices, values)
+                for a in range(n):
+                    target[indices[a]] += weight
+
+    @tools.numba_jit
+    def propagate_uniform(spikes, w_min, w_max, target):
+        indices = np.empty(num_post, dtype=np.int64)
+        values = np.empty(num_post, dtype=np.float64)
+        for i in range(spikes.shape[0]):
+            if spikes[i]:
+                n = row(i, indices, values)
+                key = tools.rng_key(seed, num_pre + i)
+                for a in range(n):
+                    target[indices[a]] += w_min + (w_max - w_min) * tools.rng_uniform(key, a)
+
+    @tools.numba_jit
+    def propagate_normal(spikes, w_mean, w_std, target):
+        indices = np.empty(num_post, dtype=np.int64)
+        values = np.empty(num_post, dtype=np.float64)
+        for i in range(spikes.shape[0]):
+            if spikes[i]:
+                n = row(i, indices, values)
+                key = tools.rng_key(seed, num_pre + i)
+                for a in range(n):
+                    target[indices[a]] += w_mean + w_std * tools.rng_normal(key, a)
+
+    return propagate, propagate_uniform, propagate_normal
+
+
+class ProceduralConnectivity(object):
+    """The procedural connectivity, in which the post-synaptic targets of
+    a pre-synaptic neuron are regenerated from its random stream
+    ``(seed, pre_id)`` whenever they are needed, rather than stored.
+
+    The regenerated targets are identical to those generated by the
+    connector with the same seed, while the memory cost is independent
+    of the number of synapses. All the functions are Numba compiled,
+    and can be called in the step functions, for example,
+
+    .. code-block:: python
+
+        self.conn = bp.connect.FixedProb(0.1, seed=1, procedural=True)(pre.size, post.size)
+        self.procedural = self.conn.requires('procedural')
+
+        def update(self, _t):
+            self.procedural.propagate(self.pre.spike, self.w, self.post.g)
+
+    Parameters
+    ----------
+    num_pre : int
+        The number of the pre-synaptic neurons.
+    num_post : int
+        The number of the post-synaptic neurons.
+    seed : int
+        The random seed.
+    row : callable
+        The Numba compiled function ``row(pre_id, indices, values)`` which
+        fills the post-synaptic indexes of ``pre_id`` into ``indices``
+        (``values`` is the working buffer), and returns the number of them.
+
+    Attributes
+    ----------
+    targets : callable
+        The function ``targets(pre_id, indices, values)``, the same as ``row``.
+    propagate : callable
+        The function ``propagate(spikes, weight, target)``, which adds the
+        homogeneous ``weight`` to the ``target`` of the spiking neurons.
+    propagate_uniform : callable
+        The function ``propagate_uniform(spikes, w_min, w_max, target)``, in
+        which the weight of each synapse is uniformly distributed in
+        ``[w_min, w_max)``, and is the same at every call.
+    propagate_normal : callable
+        The function ``propagate_normal(spikes, w_mean, w_std, target)``, in
+        which the weight of each synapse is normally distributed, and is the
+        same at every call.
     """
-    targets = set()
-    while len(targets) < m:
-        x = rng.choice(seq)
-        targets.add(x)
-    return targets
+
+    def __init__(self, num_pre, num_post, seed, row):
+        self.num_pre = num_pre
+        self.num_post = num_post
+        self.seed = seed
+        self.targets = row
+        self.propagate, self.propagate_uniform, self.propagate_normal = \
+            _procedural_kernels(seed, num_pre, num_post, row)
+
+    def to_sparse(self):
+        """Generate all the connections as the :py:class:`SparseConnectivity`.
+
+        Returns
+        -------
+        sparse : SparseConnectivity
+            The sparse connectivity.
+        """
+        indices = np.empty(self.num_post, dtype=np.int64)
+        values = np.empty(self.num_post, dtype=np.float64)
+        indptr = np.zeros(self.num_pre + 1, dtype=np.int64)
+        rows = []
+        for i in range(self.num_pre):
+            n = self.targets(i, indices, values)
+            rows.append(indices[:n].copy())
+            indptr[i + 1] = indptr[i] + n
+        indices = np.concatenate(rows) if len(rows) else np.zeros(0, dtype=np.int64)
+        return SparseConnectivity(indptr, indices, self.num_post)
+
+
+@tools.numba_jit
+def _bits_test(bits, i):
+    return (bits[i >> 6] >> np.uint64(i & 63)) & np.uint64(1) != np.uint64(0)
+
+
+@tools.numba_jit
+def _bits_set(bits, i):
+    bits[i >> 6] |= np.uint64(1) << np.uint64(i & 63)
+
+
+@tools.numba_jit
+def _bits_clear(bits, i):
+    bits[i >> 6] &= ~(np.uint64(1) << np.uint64(i & 63))
+
+
+@tools.numba_jit
+def _hash_slot(table, key):
+    # Open addressing with linear probing. Return the slot of "key",
+    # or the first empty slot if "key" does not exist. "-1" denotes
+    # the empty slot, and "-2" denotes the deleted slot.
+    mask = table.shape[0] - 1
+    h = key * np.int64(-7046029254386353131)
+    slot = (h ^ (h >> 32)) & mask
+    first_deleted = -1
+    while True:
+        k = table[slot]
+        if k == key:
+            return slot
+        if k == -1:
+            return first_deleted if first_deleted >= 0 else slot
+        if k == -2 and first_deleted < 0:
+            first_deleted = slot
+        slot = (slot + 1) & mask
+
+
+@tools.numba_jit
+def _hash_table(num_key):
+    capacity = 16
+    while capacity < 4 * num_key:
+        capacity *= 2
+    return np.full(capacity, -1, dtype=np.int64)
+
+
+@tools.numba_jit
+def _smallworld_edges(seed, num_node, num_neighbor, prob, directed, include_self):
+    # the ring lattice
+    half = num_neighbor // 2
+    num_edge = 2 * num_node * half
+    pre = np.empty(num_edge, dtype=np.int64)
+    post = np.empty(num_edge, dtype=np.int64)
+    out_degree = np.zeros(num_node, dtype=np.int64)
+    in_degree = np.zeros(num_node, dtype=np.int64)
+    edges = _hash_table(num_edge)
+    k = 0
+    for j in range(1, half + 1):
+        for u in range(num_node):
+            v = (u + j) % num_node
+            pre[k], post[k] = u, v
+            pre[k + 1], post[k + 1] = v, u
+            edges[_hash_slot(edges, u * num_node + v)] = u * num_node + v
+            edges[_hash_slot(edges, v * num_node + u)] = v * num_node + u
+            out_degree[u] += 1
+            out_degree[v] += 1
+            in_degree[u] += 1
+            in_degree[v] += 1
+            k += 2
+
+    # rewire the edges in the order of neighbors and nodes,
+    # in which the node "u" draws from the random stream "(seed, u)"
+    max_degree = num_node if include_self else num_node - 1
+    keys = np.empty(num_node, dtype=np.uint64)
+    for u in range(num_node):
+        keys[u] = tools.rng_key(seed, u)
+    counters = np.zeros(num_node, dtype=np.int64)
+    k = 0
+    for j in range(1, half + 1):
+        for u in range(num_node):
+            key = keys[u]
+            # rewire "u -> v" to "u -> w" (and "v -> u" to "w -> u")
+            counters[u] += 1
+            if tools.rng_uniform(key, counters[u]) < prob and out_degree[u] < max_degree:
+                v = post[k]
+                while True:
+                    counters[u] += 1
+                    w = tools.rng_randint(key, counters[u], num_node)
+                    if (include_self or w != u) and \
+                            edges[_hash_slot(edges, u * num_node + w)] != u * num_node + w:
+                        break
+                edges[_hash_slot(edges, u * num_node + v)] = -2
+                edges[_hash_slot(edges, u * num_node + w)] = u * num_node + w
+                post[k] = w
+                in_degree[v] -= 1
+                in_degree[w] += 1
+                if not directed:
+                    edges[_hash_slot(edges, v * num_node + u)] = -2
+                    edges[_hash_slot(edges, w * num_node + u)] = w * num_node + u
+                    pre[k + 1] = w
+                    out_degree[v] -= 1
+                    out_degree[w] += 1
+            # rewire "v -> u" to "w -> u" independently for directed graphs
+            if directed:
+                counters[u] += 1
+            if directed and tools.rng_uniform(key, counters[u]) < prob and in_degree[u] < max_degree:
+                v = pre[k + 1]
+                while True:
+                    counters[u] += 1
+                    w = tools.rng_randint(key, counters[u], num_node)
+                    if (include_self or w != u) and \
+                            edges[_hash_slot(edges, w * num_node + u)] != w * num_node + u:
+                        break
+                edges[_hash_slot(edges, v * num_node + u)] = -2
+                edges[_hash_slot(edges, w * num_node + u)] = w * num_node + u
+                pre[k + 1] = w
+                out_degree[v] -= 1
+                out_degree[w] += 1
+            k += 2
+    return pre, post
+
+
+@tools.numba_jit
+def _preferential_targets(key, counter, repeated_nodes, num_repeated, m, bits, targets):
+    # Choose "m" unique nodes from the repeated-node array, in which each
+    # node is repeated once for each adjacent edge, so that the uniform
+    # choice over the array is the preferential attachment. The random
+    # numbers are drawn from the stream "key" starting at "counter", and
+    # the next counter is returned.
+    n = 0
+    while n < m:
+        x = repeated_nodes[tools.rng_randint(key, counter, num_repeated)]
+        counter += 1
+        if not _bits_test(bits, x):
+            _bits_set(bits, x)
+            targets[n] = x
+            n += 1
+    for i in range(m):
+        _bits_clear(bits, targets[i])
+    return counter
 
 
-def _get_rng(seed):
+@tools.numba_jit
+def _ba_edges(seed, num_node, m1, m2, p, directed):
+    # The (dual) Barabási–Albert model. The new node is attached with
+    # "m1" edges with the probability "p", otherwise "m2" edges. The
+    # new node "source" draws from the random stream "(seed, source)".
+    m_max = max(m1, m2)
+    num_edge = 0
+    ms = np.empty(num_node, dtype=np.int64)
+    for source in range(m_max, num_node):
+        # the first new node is attached to all the initial nodes
+        if source == m_max:
+            ms[source] = m_max
+        else:
+            ms[source] = m1 if tools.rng_uniform(tools.rng_key(seed, source), 0) < p else m2
+        num_edge += ms[source]
+    pre = np.empty(num_edge * (1 if directed else 2), dtype=np.int64)
+    post = np.empty(num_edge * (1 if directed else 2), dtype=np.int64)
+    repeated_nodes = np.empty(2 * num_edge, dtype=np.int64)
+    bits = np.zeros((num_node + 63) // 64, dtype=np.uint64)
+    targets = np.arange(m_max, dtype=np.int64)
+
+    k, num_repeated = 0, 0
+    for source in range(m_max, num_node):
+        m = ms[source]
+        if source > m_max:
+            _preferential_targets(tools.rng_key(seed, source), 1, repeated_nodes,
+                                  num_repeated, m, bits, targets)
+        for i in range(m):
+            pre[k], post[k] = source, targets[i]
+            k += 1
+            if not directed:
+                pre[k], post[k] = targets[i], source
+                k += 1
+            repeated_nodes[num_repeated] = targets[i]
+            repeated_nodes[num_repeated + 1] = source
+            num_repeated += 2
+    return pre, post
+
+
+@tools.numba_jit
+def _power_law_edges(seed, num_node, m, p, directed):
+    # The Holme and Kim algorithm. The adjacency is stored as the
+    # array-backed linked lists ("head" and "next"). The new node
+    # "source" draws from the random stream "(seed, source)".
+    num_edge = (num_node - m) * m * (1 if directed else 2)
+    pre = np.empty(num_edge, dtype=np.int64)
+    post = np.empty(num_edge, dtype=np.int64)
+    head = np.full(num_node, -1, dtype=np.int64)
+    next_ = np.empty(num_edge, dtype=np.int64)
+    repeated_nodes = np.empty(m + 2 * (num_node - m) * m, dtype=np.int64)
+    repeated_nodes[:m] = np.arange(m)
+    num_repeated = m
+    bits = np.zeros((num_node + 63) // 64, dtype=np.uint64)
+    possible_targets = np.empty(m, dtype=np.int64)
+    neighborhood = np.empty(num_node, dtype=np.int64)
+    k = 0
+    for source in range(m, num_node):
+        key = tools.rng_key(seed, source)
+        # the counters in [0, 2 * m) are used by the clustering steps
+        _preferential_targets(key, 2 * m, repeated_nodes, num_repeated, m,
+                              bits, possible_targets)
+        num_possible = m
+        # the neighbors of "source" are marked in "bits"
+        _bits_set(bits, source)
+        target = -1
+        count = 0
+        while count < m:
+            nbr = -1
+            if count > 0 and tools.rng_uniform(key, 2 * count) < p:
+                # clustering step: add triangle
+                num_nbr = 0
+                e = head[target]
+                while e >= 0:
+                    if not _bits_test(bits, post[e]):
+                        neighborhood[num_nbr] = post[e]
+                        num_nbr += 1
+                    e = next_[e]
+                if num_nbr > 0:
+                    nbr = neighborhood[tools.rng_randint(key, 2 * count + 1, num_nbr)]
+            if nbr < 0:
+                # preferential attachment step
+                while num_possible > 0:
+                    num_possible -= 1
+                    if not _bits_test(bits, possible_targets[num_possible]):
+                        nbr = possible_targets[num_possible]
+                        break
+                if nbr < 0:
+                    break
+                target = nbr
+            # add the edge "source -> nbr"
+            _bits_set(bits, nbr)
+            pre[k], post[k] = source, nbr
+            next_[k] = head[source]
+            head[source] = k
+            k += 1
+            if not directed:
+                pre[k], post[k] = nbr, source
+                next_[k] = head[nbr]
+                head[nbr] = k
+                k += 1
+            repeated_nodes[num_repeated] = nbr
+            num_repeated += 1
+            count += 1
+        # clear the marks
+        e = head[source]
+        while e >= 0:
+            _bits_clear(bits, post[e])
+            e = next_[e]
+        _bits_clear(bits, source)
+        for i in range(m):
+            repeated_nodes[num_repeated + i] = source
+        num_repeated += m
+    return pre[:k], post[:k]
+
+
+def _sorted_ij(pre_ids, post_ids):
+    order = np.lexsort((post_ids, pre_ids))
+    return np.ascontiguousarray(pre_ids[order]), np.ascontiguousarray(post_ids[order])
+
+
+def _get_seed(seed):
     if seed is None:
-        rng = np.random
-    else:
-        rng = np.random.RandomState(seed)
-    return rng
+        # the seeds of the connectors are drawn in turn from
+        # the random stream under the global seed of "tools.set_seed()"
+        seed = int(tools.get_stream('connect', 'seed').uniform() * 2 ** 53)
+    return seed
 
 
+@cached_connector
 class FixedProb(Connector):
     """Connect the post-synaptic neurons with fixed probability.
 
+    Each row is sampled from its own counter-based random stream derived
+    from ``(seed, pre_id)``, so the generation is parallelized over the
+    pre-synaptic neurons with the identical results.
+
     Parameters
     ----------
     prob : float
@@ -193,38 +720,60 @@ class FixedProb(Connector):
         Whether create (i, i) conn ?
     seed : None, int
         Seed the random generator.
+    method : str
+        The method to generate the connections.
+
+        - "csr": sample the connections row by row with the geometric
+          skips, the time and memory are O(num_synapses), and the
+          dense matrix is never created.
+        - "vector": sample each row with the Bernoulli trials.
+        - "matrix": the same as "vector", and also create the dense
+          connection matrix.
+    store : bool
+        Whether generate and store the connections. If ``False``, only
+        the :py:class:`ProceduralConnectivity` by ``requires('procedural')``
+        is available, which regenerates the same connections on the fly.
     """
 
-    def __init__(self, prob, include_self=True, seed=None, method='matrix'):
+    def __init__(self, prob, include_self=True, seed=None, method='csr', store=True):
         super(FixedProb, self).__init__()
         self.prob = prob
         self.include_self = include_self
-        self.rng = _get_rng(seed=seed)
-        assert method in ['matrix', 'vector']
+        self.seed = seed
+        self._seed = seed
+        assert method in ['csr', 'matrix', 'vector']
+        if method == 'matrix' and not store:
+            raise errors.ModelUseError('"store=False" is not supported by the "matrix" method.')
         self.method = method
+        self.store = store
 
     def __call__(self, pre_size, post_size):
         num_pre, num_post = utils.size2len(pre_size), utils.size2len(post_size)
         self.num_pre, self.num_post = num_pre, num_post
-
+        self._seed = _get_seed(self.seed)
+        if not self.store:
+            return self
+
+        indptr, post_ids = _fixed_prob_conn(self._seed, num_pre, num_post,
+                                            float(self.prob), self.include_self,
+                                            self.method == 'csr')
+        pre_ids = np.repeat(np.arange(num_pre), np.diff(indptr))
         if self.method == 'matrix':
-            prob_mat = self.rng.random(size=(num_pre, num_post))
-            if not self.include_self:
-                np.fill_diagonal(prob_mat, 1.)
-            conn_mat = np.array(prob_mat < self.prob, dtype=np.int_)
-            pre_ids, post_ids = np.where(conn_mat)
+            conn_mat = np.zeros((num_pre, num_post), dtype=np.int_)
+            conn_mat[pre_ids, post_ids] = 1
             self.conn_mat = ops.as_tensor(conn_mat)
-        else:
-            pre_ids, post_ids = [], []
-            for i in range(num_pre):
-                pres, posts = _prob_conn(i, num_post, self.prob, self.include_self)
-                pre_ids.extend(pres)
-                post_ids.extend(posts)
         self.pre_ids = ops.as_tensor(np.ascontiguousarray(pre_ids))
         self.post_ids = ops.as_tensor(np.ascontiguousarray(post_ids))
         return self
 
+    def make_procedural(self):
+        if self.procedural is None:
+            row = _fixed_prob_row_of(self._seed, self.num_post, float(self.prob),
+                                     self.include_self, self.method == 'csr')
+            self.procedural = ProceduralConnectivity(self.num_pre, self.num_post, self._seed, row)
 
+
+@cached_connector
 class FixedPreNum(Connector):
     """Connect the pre-synaptic neurons with fixed number for each
     post-synaptic neuron.
@@ -250,25 +799,26 @@ class FixedPreNum(Connector):
             raise ValueError(f'Unknown type: {type(num)}')
         self.num = num
         self.include_self = include_self
-        self.rng = _get_rng(seed=seed)
+        self.seed = seed
 
     def __call__(self, pre_size, post_size):
         num_pre, num_post = utils.size2len(pre_size), utils.size2len(post_size)
         self.num_pre, self.num_post = num_pre, num_post
         num = self.num if isinstance(self.num, int) else int(self.num * num_pre)
         assert num <= num_pre, f'"num" must be less than "num_pre", but got {num} > {num_pre}'
+        if not self.include_self and num_post > 0:
+            assert num < num_pre, f'"num" must be less than "num_pre" when excluding (i, i) conn.'
 
-        prob_mat = self.rng.random(size=(num_pre, num_post))
-        if not self.include_self:
-            np.fill_diagonal(prob_mat, 1.)
-        arg_sort = np.argsort(prob_mat, axis=0)[:num]
-        pre_ids = np.asarray(np.concatenate(arg_sort), dtype=np.int_)
-        post_ids = np.asarray(np.repeat(np.arange(num_post), num_pre), dtype=np.int_)
+        # each post-synaptic neuron chooses from the random stream "(seed, post_id)"
+        pre_ids = _fixed_num_conn(_get_seed(self.seed), num_post, num_pre, num, self.include_self)
+        post_ids = np.repeat(np.arange(num_post), num)
+        pre_ids, post_ids = _sorted_ij(pre_ids, post_ids)
         self.pre_ids = ops.as_tensor(pre_ids)
         self.post_ids = ops.as_tensor(post_ids)
         return self
 
 
+@cached_connector
 class FixedPostNum(Connector):
     """Connect the post-synaptic neurons with fixed number for each
     pre-synaptic neuron.
@@ -294,7 +844,7 @@ class FixedPostNum(Connector):
             raise ValueError(f'Unknown type: {type(num)}')
         self.num = num
         self.include_self = include_self
-        self.rng = _get_rng(seed=seed)
+        self.seed = seed
 
     def __call__(self, pre_size, post_size):
         num_pre = utils.size2len(pre_size)
@@ -303,18 +853,18 @@ class FixedPostNum(Connector):
         self.num_post = num_post
         num = self.num if isinstance(self.num, int) else int(self.num * num_post)
         assert num <= num_post, f'"num" must be less than "num_post", but got {num} > {num_post}'
+        if not self.include_self and num_pre > 0:
+            assert num < num_post, f'"num" must be less than "num_post" when excluding (i, i) conn.'
 
-        prob_mat = self.rng.random(size=(num_pre, num_post))
-        if not self.include_self:
-            np.fill_diagonal(prob_mat, 1.)
-        arg_sort = np.argsort(prob_mat, axis=1)[:, num]
-        post_ids = np.asarray(np.concatenate(arg_sort), dtype=np.int64)
-        pre_ids = np.asarray(np.repeat(np.arange(num_pre), num_post), dtype=np.int64)
+        # each pre-synaptic neuron chooses from the random stream "(seed, pre_id)"
+        post_ids = _fixed_num_conn(_get_seed(self.seed), num_pre, num_post, num, self.include_self)
+        pre_ids = np.repeat(np.arange(num_pre), num)
         self.pre_ids = ops.as_tensor(pre_ids)
         self.post_ids = ops.as_tensor(post_ids)
         return self
 
 
+@cached_connector
 class GaussianWeight(Connector):
     """Builds a Gaussian conn pattern between the two populations, where
     the weights decay with gaussian function.
@@ -344,53 +894,38 @@ class GaussianWeight(Connector):
         Whether normalize the coordination.
     include_self : bool
         Whether create the conn at the same position.
+    cutoff : float, None
+        The maximum distance of the connections. Only the post-synaptic
+        neurons within the cutoff distance (and beyond which the weight is
+        less than :math:`w_{min}`) are visited for each pre-synaptic neuron.
+    periodic_boundary : bool
+        Whether the neurons are arranged on a torus.
     """
 
-    def __init__(self, sigma, w_max, w_min=None, normalize=True, include_self=True, seed=None):
+    def __init__(self, sigma, w_max, w_min=None, normalize=True, include_self=True, seed=None,
+                 cutoff=None, periodic_boundary=False):
         super(GaussianWeight, self).__init__()
         self.sigma = sigma
         self.w_max = w_max
         self.w_min = w_max * 0.01 if w_min is None else w_min
         self.normalize = normalize
         self.include_self = include_self
+        self.cutoff = cutoff
+        self.periodic_boundary = periodic_boundary
 
     def __call__(self, pre_size, post_size):
-        num_pre = utils.size2len(pre_size)
-        num_post = utils.size2len(post_size)
-        self.num_pre = num_pre
-        self.num_post = num_post
-        assert len(pre_size) == 2
-        assert len(post_size) == 2
-        pre_height, pre_width = pre_size
-        post_height, post_width = post_size
-
-        # get the connections and weights
-        i, j, w = [], [], []
-        for pre_i in range(num_pre):
-            a = _gaussian_weight(pre_i=pre_i,
-                                 pre_width=pre_width,
-                                 pre_height=pre_height,
-                                 num_post=num_post,
-                                 post_width=post_width,
-                                 post_height=post_height,
-                                 w_max=self.w_max,
-                                 w_min=self.w_min,
-                                 sigma=self.sigma,
-                                 normalize=self.normalize,
-                                 include_self=self.include_self)
-            i.extend(a[0])
-            j.extend(a[1])
-            w.extend(a[2])
-
-        pre_ids = np.asarray(i, dtype=np.int_)
-        post_ids = np.asarray(j, dtype=np.int_)
-        w = np.asarray(w, dtype=np.float_)
+        radius = _cutoff_radius(self.w_max, self.sigma, self.w_min)
+        pre_ids, post_ids, w = _local_conn_of(self, pre_size, post_size,
+                                              kind=_GAUSSIAN_WEIGHT,
+                                              params=(self.w_max, self.sigma),
+                                              threshold=self.w_min, radius=radius)
         self.pre_ids = ops.as_tensor(pre_ids)
         self.post_ids = ops.as_tensor(post_ids)
         self.weights = ops.as_tensor(w)
         return self
 
 
+@cached_connector
 class GaussianProb(Connector):
     """Builds a Gaussian conn pattern between the two populations, where
     the conn probability decay according to the gaussian function.
@@ -408,54 +943,71 @@ class GaussianProb(Connector):
     ----------
     sigma : float
         Width of the Gaussian function.
+    p_min : float
+        The minimum connection probability. The connections with the smaller
+        probability are truncated. The default ``1e-6`` truncates the Gaussian
+        at about ``5.3 * sigma``, so that only the nearby post-synaptic neurons
+        are visited for each pre-synaptic neuron. Set ``p_min=0.`` to keep the
+        whole Gaussian, which visits all the post-synaptic neurons.
     normalize : bool
         Whether normalize the coordination.
     include_self : bool
         Whether create the conn at the same position.
-    seed : bool
-        The random seed.
+    seed : None, int
+        Seed the random generator.
+    cutoff : float, None
+        The maximum distance of the connections. Only the post-synaptic
+        neurons within the cutoff distance (and beyond which the probability
+        is less than ``p_min``) are visited for each pre-synaptic neuron.
+        Note if ``p_min=0.`` and ``cutoff`` is not given, all the post-synaptic
+        neurons will be visited.
+    periodic_boundary : bool
+        Whether the neurons are arranged on a torus.
+    store : bool
+        Whether generate and store the connections. If ``False``, only
+        the :py:class:`ProceduralConnectivity` by ``requires('procedural')``
+        is available, which regenerates the same connections on the fly.
     """
 
-    def __init__(self, sigma, p_min=0., normalize=True, include_self=True, seed=None):
+    def __init__(self, sigma, p_min=1e-6, normalize=True, include_self=True, seed=None,
+                 cutoff=None, periodic_boundary=False, store=True):
         super(GaussianProb, self).__init__()
         self.sigma = sigma
         self.p_min = p_min
         self.normalize = normalize
         self.include_self = include_self
+        self.cutoff = cutoff
+        self.periodic_boundary = periodic_boundary
+        self.seed = seed
+        self._seed = seed
+        self.store = store
+
+    def _local_args(self, pre_size, post_size):
+        radius = _cutoff_radius(1., self.sigma, self.p_min)
+        return _local_args(self, pre_size, post_size, kind=_GAUSSIAN_PROB,
+                           params=(self.sigma,), threshold=self.p_min, radius=radius)
 
     def __call__(self, pre_size, post_size):
-        self.num_pre = num_pre = utils.size2len(pre_size)
-        self.num_post = num_post = utils.size2len(post_size)
-        assert len(pre_size) == 2
-        assert len(post_size) == 2
-        pre_height, pre_width = pre_size
-        post_height, post_width = post_size
-
-        # get the connections
-        i, j, p = [], [], []  # conn_i, conn_j, probabilities
-        for pre_i in range(num_pre):
-            a = _gaussian_prob(pre_i=pre_i,
-                               pre_width=pre_width,
-                               pre_height=pre_height,
-                               num_post=num_post,
-                               post_width=post_width,
-                               post_height=post_height,
-                               p_min=self.p_min,
-                               sigma=self.sigma,
-                               normalize=self.normalize,
-                               include_self=self.include_self)
-            i.extend(a[0])
-            j.extend(a[1])
-            p.extend(a[2])
-        p = np.asarray(p, dtype=np.float_)
-        selected_idxs = np.where(np.random.random(len(p)) < p)[0]
-        i = np.asarray(i, dtype=np.int_)[selected_idxs]
-        j = np.asarray(j, dtype=np.int_)[selected_idxs]
-        self.pre_ids = ops.as_tensor(i)
-        self.post_ids = ops.as_tensor(j)
+        args = self._local_args(pre_size, post_size)
+        self._seed = _get_seed(self.seed)
+        if not self.store:
+            return self
+
+        indptr, j, p = _local_conn(*args)
+        # each row is selected with the random stream "(seed, pre_id)"
+        selected = _bernoulli_select(self._seed, indptr, p)
+        i = np.repeat(np.arange(self.num_pre), np.diff(indptr))
+        self.pre_ids = ops.as_tensor(i[selected])
+        self.post_ids = ops.as_tensor(j[selected])
         return self
 
+    def make_procedural(self):
+        if self.procedural is None:
+            row = _gaussian_prob_row_of(self._seed, *self._local_args(*self._sizes))
+            self.procedural = ProceduralConnectivity(self.num_pre, self.num_post, self._seed, row)
+
 
+@cached_connector
 class DOG(Connector):
     """Builds a Difference-Of-Gaussian (dog) conn pattern between the two populations.
 
@@ -482,54 +1034,41 @@ class DOG(Connector):
         Whether normalize the coordination.
     include_self : bool
         Whether create the conn at the same position.
+    cutoff : float, None
+        The maximum distance of the connections. Only the post-synaptic
+        neurons within the cutoff distance (and beyond which the absolute
+        weight is less than :math:`w_{min}`) are visited for each
+        pre-synaptic neuron.
+    periodic_boundary : bool
+        Whether the neurons are arranged on a torus.
     """
 
-    def __init__(self, sigmas, ws_max, w_min=None, normalize=True, include_self=True):
+    def __init__(self, sigmas, ws_max, w_min=None, normalize=True, include_self=True,
+                 cutoff=None, periodic_boundary=False):
         super(DOG, self).__init__()
         self.sigma_p, self.sigma_n = sigmas
         self.w_max_p, self.w_max_n = ws_max
         self.w_min = np.abs(ws_max[0] - ws_max[1]) * 0.01 if w_min is None else w_min
         self.normalize = normalize
         self.include_self = include_self
+        self.cutoff = cutoff
+        self.periodic_boundary = periodic_boundary
 
     def __call__(self, pre_size, post_size):
-        self.num_pre = num_pre = utils.size2len(pre_size)
-        self.num_post = num_post = utils.size2len(post_size)
-        assert len(pre_size) == 2
-        assert len(post_size) == 2
-        pre_height, pre_width = pre_size
-        post_height, post_width = post_size
-
-        # get the connections and weights
-        i, j, w = [], [], []  # conn_i, conn_j, weights
-        for pre_i in range(num_pre):
-            a = _dog(pre_i=pre_i,
-                     pre_width=pre_width,
-                     pre_height=pre_height,
-                     num_post=num_post,
-                     post_width=post_width,
-                     post_height=post_height,
-                     w_max_p=self.w_max_p,
-                     w_max_n=self.w_max_n,
-                     w_min=self.w_min,
-                     sigma_p=self.sigma_p,
-                     sigma_n=self.sigma_n,
-                     normalize=self.normalize,
-                     include_self=self.include_self)
-            i.extend(a[0])
-            j.extend(a[1])
-            w.extend(a[2])
-
-        # format connections and weights
-        i = np.asarray(i, dtype=np.int_)
-        j = np.asarray(j, dtype=np.int_)
-        w = np.asarray(w, dtype=np.float_)
+        # both Gaussian terms are below "w_min" beyond the radius
+        radius = max(_cutoff_radius(self.w_max_p, self.sigma_p, self.w_min),
+                     _cutoff_radius(self.w_max_n, self.sigma_n, self.w_min))
+        i, j, w = _local_conn_of(self, pre_size, post_size,
+                                 kind=_DOG,
+                                 params=(self.w_max_p, self.w_max_n, self.sigma_p, self.sigma_n),
+                                 threshold=self.w_min, radius=radius)
         self.pre_ids = ops.as_tensor(i)
         self.post_ids = ops.as_tensor(j)
         self.weights = ops.as_tensor(w)
         return self
 
 
+@cached_connector
 class SmallWorld(Connector):
     """Build a Watts–Strogatz small-world graph.
 
@@ -544,6 +1083,8 @@ class SmallWorld(Connector):
         Whether the graph is a directed graph.
     include_self : bool
         Whether include the node self.
+    seed : None, int
+        Seed the random generator.
 
     Notes
     -----
@@ -561,74 +1102,41 @@ class SmallWorld(Connector):
            Nature, 393, pp. 440--442, 1998.
     """
 
-    def __init__(self, num_neighbor, prob, directed=False, include_self=False):
+    def __init__(self, num_neighbor, prob, directed=False, include_self=False, seed=None):
         super(SmallWorld, self).__init__()
         self.prob = prob
         self.directed = directed
         self.num_neighbor = num_neighbor
         self.include_self = include_self
+        self.seed = seed
 
     def __call__(self, pre_size, post_size):
         assert pre_size == post_size
         if isinstance(pre_size, int) or (isinstance(pre_size, (tuple, list)) and len(pre_size) == 1):
-            num_node = pre_size[0]
+            num_node = utils.size2len(pre_size)
             self.num_pre = self.num_post = num_node
 
             if self.num_neighbor > num_node:
                 raise ValueError("num_neighbor > num_node, choose smaller num_neighbor or larger num_node")
             # If k == n, the graph is complete not Watts-Strogatz
             if self.num_neighbor == num_node:
-                conn = np.ones((num_node, num_node), dtype=bool)
+                pre_ids = np.repeat(np.arange(num_node), num_node)
+                post_ids = np.tile(np.arange(num_node), num_node)
             else:
-                conn = np.zeros((num_node, num_node), dtype=bool)
-                nodes = np.array(list(range(num_node)))  # nodes are labeled 0 to n-1
-                # connect each node to k/2 neighbors
-                for j in range(1, self.num_neighbor // 2 + 1):
-                    targets = np.concatenate([nodes[j:], nodes[0:j]])  # first j nodes are now last in list
-                    conn[nodes, targets] = True
-                    conn[targets, nodes] = True
-
-                # rewire edges from each node
-                # loop over all nodes in order (label) and neighbors in order (distance)
-                # no self loops or multiple edges allowed
-                for j in range(1, self.num_neighbor // 2 + 1):  # outer loop is neighbors
-                    targets = np.concatenate([nodes[j:], nodes[0:j]])  # first j nodes are now last in list
-                    if self.directed:
-                        # inner loop in node order
-                        for u, v in zip(nodes, targets):
-                            w = _smallworld_rewire(prob=self.prob, i=u, all_j=conn[u],
-                                                   include_self=self.include_self)
-                            if w != -1:
-                                conn[u, v] = False
-                                conn[u, w] = True
-                            w = _smallworld_rewire(prob=self.prob, i=u, all_j=conn[:, u],
-                                                   include_self=self.include_self)
-                            if w != -1:
-                                conn[v, u] = False
-                                conn[w, u] = True
-                    else:
-                        # inner loop in node order
-                        for u, v in zip(nodes, targets):
-                            w = _smallworld_rewire(prob=self.prob, i=u, all_j=conn[u],
-                                                   include_self=self.include_self)
-                            if w != -1:
-                                conn[u, v] = False
-                                conn[v, u] = False
-                                conn[u, w] = True
-                                conn[w, u] = True
+                pre_ids, post_ids = _smallworld_edges(_get_seed(self.seed), num_node,
+                                                      self.num_neighbor, self.prob,
+                                                      self.directed, self.include_self)
+                pre_ids, post_ids = _sorted_ij(pre_ids, post_ids)
         else:
             raise NotImplementedError('Currently only support 1D ring connection.')
 
-        self.conn_mat = ops.as_tensor(conn)
-        pre_ids, post_ids = np.where(conn)
-        pre_ids = np.ascontiguousarray(pre_ids)
-        post_ids = np.ascontiguousarray(post_ids)
         self.pre_ids = ops.as_tensor(pre_ids)
         self.post_ids = ops.as_tensor(post_ids)
 
         return self
 
 
+@cached_connector
 class ScaleFreeBA(Connector):
     """Build a random graph according to the Barabási–Albert preferential
     attachment model.
@@ -659,7 +1167,7 @@ class ScaleFreeBA(Connector):
         super(ScaleFreeBA, self).__init__()
         self.m = m
         self.directed = directed
-        self.rng = _get_rng(seed)
+        self.seed = seed
 
     def __call__(self, pre_size, post_size=None):
         num_node = utils.size2len(pre_size)
@@ -670,39 +1178,16 @@ class ScaleFreeBA(Connector):
             raise ValueError(f"Barabási–Albert network must have m >= 1 and "
                              f"m < n, while m = {self.m} and n = {num_node}")
 
-        # Add m initial nodes (m0 in barabasi-speak)
-        conn = np.zeros((num_node, num_node), dtype=bool)
-        # Target nodes for new edges
-        targets = list(range(self.m))
-        # List of existing nodes, with nodes repeated once for each adjacent edge
-        repeated_nodes = []
-        # Start adding the other n-m nodes. The first node is m.
-        source = self.m
-        while source < num_node:
-            # Add edges to m nodes from the source.
-            origins = [source] * self.m
-            conn[origins, targets] = True
-            if not self.directed:
-                conn[targets, origins] = True
-            # Add one node to the list for each new edge just created.
-            repeated_nodes.extend(targets)
-            # And the new node "source" has m edges to add to the list.
-            repeated_nodes.extend([source] * self.m)
-            # Now choose m unique nodes from the existing nodes
-            # Pick uniformly from repeated_nodes (preferential attachment)
-            targets = _random_subset(repeated_nodes, self.m, self.rng)
-            source += 1
-
-        self.conn_mat = ops.as_tensor(conn)
-        pre_ids, post_ids = np.where(conn)
-        pre_ids = np.ascontiguousarray(pre_ids)
-        post_ids = np.ascontiguousarray(post_ids)
+        pre_ids, post_ids = _ba_edges(_get_seed(self.seed), num_node, self.m, self.m, 1.,
+                                      self.directed)
+        pre_ids, post_ids = _sorted_ij(pre_ids, post_ids)
         self.pre_ids = ops.as_tensor(pre_ids)
         self.post_ids = ops.as_tensor(post_ids)
 
         return self
 
 
+@cached_connector
 class ScaleFreeBADual(Connector):
     """Build a random graph according to the dual Barabási–Albert preferential
     attachment model.
@@ -733,12 +1218,12 @@ class ScaleFreeBADual(Connector):
     """
 
     def __init__(self, m1, m2, p, directed=False, seed=None):
+        super(ScaleFreeBADual, self).__init__()
         self.m1 = m1
         self.m2 = m2
         self.p = p
         self.directed = directed
-        self.rng = _get_rng(seed)
-        super(ScaleFreeBADual, self).__init__()
+        self.seed = seed
 
     def __call__(self, pre_size, post_size=None):
         num_node = utils.size2len(pre_size)
@@ -754,54 +1239,22 @@ class ScaleFreeBADual(Connector):
         if self.p < 0 or self.p > 1:
             raise ValueError(f"Dual Barabási–Albert network must have 0 <= p <= 1, while p = {self.p}")
 
-        # Add max(m1,m2) initial nodes (m0 in barabasi-speak)
-        conn = np.zeros((num_node, num_node), dtype=bool)
-        # Target nodes for new edges
-        targets = list(range(max(self.m1, self.m2)))
-        # List of existing nodes, with nodes repeated once for each adjacent edge
-        repeated_nodes = []
-        # Start adding the remaining nodes.
-        source = max(self.m1, self.m2)
-        # Pick which m to use first time (m1 or m2)
-        if self.rng.random() < self.p:
-            m = self.m1
-        else:
-            m = self.m2
-        while source < num_node:
-            # Add edges to m nodes from the source.
-            origins = [source] * m
-            conn[origins, targets] = True
-            if not self.directed:
-                conn[targets, origins] = True
-            # Add one node to the list for each new edge just created.
-            repeated_nodes.extend(targets)
-            # And the new node "source" has m edges to add to the list.
-            repeated_nodes.extend([source] * m)
-            # Pick which m to use next time (m1 or m2)
-            if self.rng.random() < self.p:
-                m = self.m1
-            else:
-                m = self.m2
-            # Now choose m unique nodes from the existing nodes
-            # Pick uniformly from repeated_nodes (preferential attachment)
-            targets = _random_subset(repeated_nodes, m, self.rng)
-            source += 1
-
-        self.conn_mat = ops.as_tensor(conn)
-        pre_ids, post_ids = np.where(conn)
-        pre_ids = np.ascontiguousarray(pre_ids)
-        post_ids = np.ascontiguousarray(post_ids)
+        pre_ids, post_ids = _ba_edges(_get_seed(self.seed), num_node, self.m1, self.m2,
+                                      self.p, self.directed)
+        pre_ids, post_ids = _sorted_ij(pre_ids, post_ids)
         self.pre_ids = ops.as_tensor(pre_ids)
         self.post_ids = ops.as_tensor(post_ids)
 
         return self
 
 
+@cached_connector
 class ScaleFreeBAExtended(Connector):
     def __init__(self, ):
         raise NotImplementedError
 
 
+@cached_connector
 class PowerLaw(Connector):
     """Holme and Kim algorithm for growing graphs with powerlaw
     degree distribution and approximate average clustering.
@@ -853,7 +1306,7 @@ class PowerLaw(Connector):
         if self.p > 1 or self.p < 0:
             raise ValueError(f"p must be in [0,1], while p={self.p}")
         self.directed = directed
-        self.rng = _get_rng(seed)
+        self.seed = seed
 
     def __call__(self, pre_size, post_size=None):
         num_node = utils.size2len(pre_size)
@@ -862,50 +1315,9 @@ class PowerLaw(Connector):
 
         if self.m < 1 or num_node < self.m:
             raise ValueError(f"Must have m>1 and m<n, while m={self.m} and n={num_node}")
-        # add m initial nodes (m0 in barabasi-speak)
-        conn = np.zeros((num_node, num_node), dtype=bool)
-        repeated_nodes = list(range(self.m))  # list of existing nodes to sample from
-        # with nodes repeated once for each adjacent edge
-        source = self.m  # next node is m
-        while source < num_node:  # Now add the other n-1 nodes
-            possible_targets = _random_subset(repeated_nodes, self.m, self.rng)
-            # do one preferential attachment for new node
-            target = possible_targets.pop()
-            conn[source, target] = True
-            if not self.directed:
-                conn[target, source] = True
-            repeated_nodes.append(target)  # add one node to list for each new link
-            count = 1
-            while count < self.m:  # add m-1 more new links
-                if self.rng.random() < self.p:  # clustering step: add triangle
-                    neighbors = np.where(conn[target])[0]
-                    neighborhood = [
-                        nbr for nbr in neighbors
-                        if not conn[source, nbr] and not nbr == source
-                    ]
-                    if neighborhood:  # if there is a neighbor without a link
-                        nbr = self.rng.choice(neighborhood)
-                        conn[source, nbr] = True  # add triangle
-                        if not self.directed:
-                            conn[nbr, source] = True
-                        repeated_nodes.append(nbr)
-                        count = count + 1
-                        continue  # go to top of while loop
-                # else do preferential attachment step if above fails
-                target = possible_targets.pop()
-                conn[source, target] = True
-                if not self.directed:
-                    conn[target, source] = True
-                repeated_nodes.append(target)
-                count = count + 1
-
-            repeated_nodes.extend([source] * self.m)  # add source node to list m times
-            source += 1
-
-        self.conn_mat = ops.as_tensor(conn)
-        pre_ids, post_ids = np.where(conn)
-        pre_ids = np.ascontiguousarray(pre_ids)
-        post_ids = np.ascontiguousarray(post_ids)
+        pre_ids, post_ids = _power_law_edges(_get_seed(self.seed), num_node, self.m, self.p,
+                                             self.directed)
+        pre_ids, post_ids = _sorted_ij(pre_ids, post_ids)
         self.pre_ids = ops.as_tensor(pre_ids)
         self.post_ids = ops.as_tensor(post_ids)
 
@@ -8,6 +8,7 @@ from brainpy import tools
 from brainpy.backend import ops
 from brainpy.simulation import utils
 from brainpy.simulation.connectivity.base import Connector
+from brainpy.simulation.connectivity.base import cached_connector
 
 __all__ = [
     'One2One', 'one2one',
@@ -64,6 +65,7 @@ def _grid_n(height, width, row, n, include_self):
     return conn_i, conn_j
 
 
+@cached_connector
 class One2One(Connector):
     """
     Connect two neuron groups one by one. This means
@@ -92,6 +94,7 @@ class One2One(Connector):
 one2one = One2One()
 
 
+@cached_connector
 class All2All(Connector):
     """Connect each neuron in first group to all neurons in the
     post-synaptic neuron groups. It means this kind of conn
@@ -121,6 +124,7 @@ class All2All(Connector):
 all2all = All2All(include_self=True)
 
 
+@cached_connector
 class GridFour(Connector):
     """The nearest four neighbors conn method."""
 
@@ -160,6 +164,7 @@ class GridFour(Connector):
 grid_four = GridFour()
 
 
+@cached_connector
 class GridN(Connector):
     """The nearest (2*N+1) * (2*N+1) neighbors conn method.
 
@@ -218,6 +223,7 @@ class GridN(Connector):
         return self
 
 
+@cached_connector
 class GridEight(GridN):
     """The nearest eight neighbors conn method."""
 
@@ -2,13 +2,19 @@
 
 import math
 
+import numpy as np
+
 from brainpy import backend
+from brainpy import errors
+from brainpy import tools
 from brainpy.backend import ops
+from brainpy.simulation.connectivity.base import pre2syn
 from brainpy.simulation.utils import size2len
 
 
 __all__ = [
     'ConstantDelay',
+    'EventDelay',
 ]
 
 
@@ -85,3 +91,159 @@ class ConstantDelay(object):
     def update(self):
         self.delay_in_idx = (self.delay_in_idx + 1) % self.delay_num_step
         self.delay_out_idx = (self.delay_out_idx + 1) % self.delay_num_step
+
+
+@tools.numba_jit
+def _event_delay_push_from(queue, queue_len, cursor, delay_step, pre_indptr, pre_syn_ids, spike, start,
+                           delayed_only):
+    # push the events from the position "start" of "pre_syn_ids", and return
+    # the position at which the queue is overflowed, or -1 if all are pushed
+    num_bucket, capacity = queue.shape
+    for pre_id in range(spike.shape[0]):
+        if spike[pre_id] > 0:
+            for k in range(max(pre_indptr[pre_id], start), pre_indptr[pre_id + 1]):
+                syn_id = pre_syn_ids[k]
+                if delayed_only and delay_step[syn_id] == 0:
+                    continue
+                bucket = (cursor + delay_step[syn_id]) % num_bucket
+                n = queue_len[bucket]
+                if n >= capacity:
+                    return k
+                queue[bucket, n] = syn_id
+                queue_len[bucket] = n + 1
+    return -1
+
+
+@tools.numba_jit
+def _event_delay_push(queue, queue_len, cursor, delay_step, pre_indptr, pre_syn_ids,
+                      pending, pending_spike, spike):
+    # the compiled queues can not grow, so the overflowed position and the spikes are
+    # kept in "pending", and the rest delayed events are pushed by "EventDelay.update()"
+    k = _event_delay_push_from(queue, queue_len, cursor, delay_step, pre_indptr, pre_syn_ids, spike, 0, False)
+    if k >= 0:
+        pending[0] = k
+        for pre_id in range(spike.shape[0]):
+            pending_spike[pre_id] = spike[pre_id]
+            # the events without delay are delivered at this step, which
+            # always have the room reserved in the current bucket
+            if spike[pre_id] > 0:
+                for i in range(max(pre_indptr[pre_id], k), pre_indptr[pre_id + 1]):
+                    syn_id = pre_syn_ids[i]
+                    if delay_step[syn_id] == 0:
+                        queue[cursor, queue_len[cursor]] = syn_id
+                        queue_len[cursor] += 1
+
+
+class EventDelay(object):
+    """Per-synapse delay for the spike event delivery.
+
+    Different from :py:class:`ConstantDelay`, which buffers the whole
+    ``(max_delay, num_syn)`` history, this delay only stores the synaptic
+    events. At the spike time, the ids of the target synapses are scattered
+    into the time-bucketed queues (one bucket for each future step), and
+    at each step only the synapses in the current bucket are delivered.
+    Therefore, the memory and the computation scale with
+    `spikes x fan-out`, rather than `delay x synapses`.
+
+    >>> delay = EventDelay(pre_ids, num_pre, delay_time)
+    >>> delay.push(pre_spike)  # scatter the spikes of the pre-synaptic neurons
+    >>> for syn_id in delay.pull():  # the synapses receive events at this step
+    >>>     ...
+
+    Parameters
+    ----------
+    pre_ids : tensor
+        The pre-synaptic neuron index of each synapse.
+    num_pre : int
+        The number of the pre-synaptic neurons.
+    delay_time : int, float, tensor, callable
+        The delay time of each synapse.
+    capacity : int, None
+        The number of events can be delivered at one step. The queues grow
+        by doubling once a bucket is full, so the default is small: twice
+        the events of one bucket when each synapse receives one event per
+        delay period, plus 16. In the steps compiled by ``numba``, the push
+        stops at the full bucket and keeps the rest events, which are pushed
+        into the grown queues by :py:meth:`update` after the step. Since the
+        events of the synapses without delay are delivered at the same
+        step, the bucket of the next step always reserves the room for them.
+    """
+
+    def __init__(self, pre_ids, num_pre, delay_time, capacity=None):
+        pre_ids = np.asarray(pre_ids, dtype=np.int_)
+        self.num = len(pre_ids)
+        self.num_pre = num_pre
+
+        # delay steps of each synapse
+        dt = backend.get_dt()
+        if isinstance(delay_time, (int, float)):
+            delay_step = np.ones(self.num, dtype=np.int_) * int(round(delay_time / dt))
+        elif callable(delay_time):
+            delay_step = np.asarray([int(round(delay_time() / dt)) for _ in range(self.num)], dtype=np.int_)
+        else:
+            delay_time = np.asarray(delay_time)
+            if delay_time.shape != (self.num,):
+                raise errors.ModelUseError(f'The per-synapse delay must has the shape of ({self.num},), '
+                                           f'but we got {delay_time.shape}.')
+            delay_step = np.asarray(np.round(delay_time / dt), dtype=np.int_)
+        if self.num > 0 and delay_step.min() < 0:
+            raise errors.ModelUseError('Delay time must be non-negative.')
+        self.delay_time = delay_time
+        self.delay_step = ops.as_tensor(delay_step)
+        self.num_bucket = int(delay_step.max()) + 1 if self.num > 0 else 1
+
+        # synapse ids of each pre-synaptic neuron
+        self.pre_syn_ids, self.pre_indptr = pre2syn(pre_ids, num_pre, format='csr')
+
+        # event queues
+        if capacity is None:
+            capacity = min(self.num, 2 * math.ceil(self.num / self.num_bucket) + 16)
+        self.capacity = max(capacity, 1)
+        self.queue = ops.zeros((self.num_bucket, self.capacity), dtype=ops.int)
+        self.queue_len = ops.zeros(self.num_bucket, dtype=ops.int)
+        self.cursor = 0
+        self.num_no_delay = int(np.sum(delay_step == 0))
+        self._reserve()
+
+        # the events not pushed by the compiled steps
+        self.pending = np.array([-1], dtype=np.int_)
+        self.pending_spike = np.zeros(num_pre)
+        self.push_kernel = _event_delay_push
+        self.name = None
+
+    def _grow(self, capacity):
+        # a bucket holds each synapse at most once, so the queues never exceed the synapses
+        self.capacity = min(max(2 * self.capacity, capacity), self.num)
+        queue = ops.zeros((self.num_bucket, self.capacity), dtype=ops.int)
+        queue[:, :self.queue.shape[1]] = self.queue
+        self.queue = queue
+
+    def _reserve(self):
+        # the room of the events without delay in the current bucket
+        if self.queue_len[self.cursor] + self.num_no_delay > self.capacity:
+            self._grow(self.queue_len[self.cursor] + self.num_no_delay)
+
+    def _push_from(self, spike, start, delayed_only=False):
+        while True:
+            start = _event_delay_push_from(self.queue, self.queue_len, self.cursor, self.delay_step,
+                                           self.pre_indptr, self.pre_syn_ids, spike, start, delayed_only)
+            if start < 0:
+                break
+            self._grow(self.capacity + 1)
+
+    def push(self, spike):
+        self._push_from(spike, 0)
+
+    def pull(self):
+        return self.queue[self.cursor, :self.queue_len[self.cursor]]
+
+    def update(self):
+        # push the delayed events left by the compiled steps, whose
+        # buckets are after the current one, before moving on
+        if self.pending[0] >= 0:
+            start = self.pending[0]
+            self.pending[0] = -1
+            self._push_from(self.pending_spike, start, delayed_only=True)
+        self.queue_len[self.cursor] = 0
+        self.cursor = (self.cursor + 1) % self.num_bucket
+        self._reserve()
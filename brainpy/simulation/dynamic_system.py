@@ -4,6 +4,7 @@ from collections import OrderedDict
 
 from brainpy import backend
 from brainpy import errors
+from brainpy import tools
 from brainpy.backend import ops
 from brainpy.simulation import utils
 from brainpy.simulation.monitors import Monitor
@@ -63,6 +64,8 @@ class DynamicSystem(object):
             raise errors.ModelUseError(f'"{name}" isn\'t a valid identifier according to Python '
                                        f'language definition. Please choose another name.')
         self.name = name
+        # the name of the random streams, which does not depend on the other kinds of nodes
+        self.rng_name = tools.new_stream_name(type(self).__name__)
 
         # monitors
         # ---------
@@ -92,6 +95,29 @@ class DynamicSystem(object):
         else:
             raise errors.ModelDefError(f'Unknown setting of "target_backend": {self.target_backend}')
 
+    def _rng_stream(self):
+        # the stream is created at the first use, so that the nodes drawing no
+        # random numbers do not take the seeds from the NumPy random state
+        if self.__dict__.get('_rng_step_stream', None) is None:
+            self._rng_step_stream = tools.RandomStream(self.rng_name, 'step')
+        return self._rng_step_stream
+
+    @property
+    def rng_key(self):
+        """The key of the random stream of the node steps.
+
+        The steps draw the random numbers by the key and the counter array
+        :py:attr:`rng_counter`, such as
+        ``tools.stream_normals(self.rng_key, self.rng_counter, self.num)``,
+        which also work in the steps compiled by Numba.
+        """
+        return self._rng_stream().key
+
+    @property
+    def rng_counter(self):
+        """The counter array of the random stream of the node steps."""
+        return self._rng_stream().counter
+
     def build(self, inputs, inputs_is_formatted=False, return_code=True, mon_length=0, show_code=False):
         """Build the object for running.
 
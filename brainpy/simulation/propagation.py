@@ -0,0 +1,548 @@
+# -*- coding: utf-8 -*-
+
+"""
+Synaptic propagation kernels.
+
+The kernels compute the vector-sparse-matrix products of the pre-synaptic
+activity and the connectivity, and accumulate the results into the
+post-synaptic target, such as ``target += spike @ W``. The connectivity is
+given as the plain CSR arrays ``(indptr, indices, data)`` (for example, the
+arrays of ``conn.requires('sparse_mat')`` or of the ``SparseConnectivity``),
+or as the CSC arrays of the transposed structure. All the kernels are Numba
+compiled, so that they can be called in the step functions of the synapses.
+
+- The CSR kernels scatter the rows of the active pre-synaptic neurons.
+- The CSC kernels gather the columns of the post-synaptic neurons in
+  parallel, which are free of the write races.
+
+For the spiking networks, the event-driven kernels first compact the
+spikes into the indexes of the spiking neurons by :py:func:`spike_ids`,
+and then only visit the synapses of them. They are provided with the
+homogeneous weight (``*_homo``) or the per-synapse weights (``*_heter``),
+without or with the delays (the synapses delivered by
+:py:class:`brainpy.simulation.EventDelay`). The parallel variants partition
+the post-synaptic neurons among the threads, in which each thread only
+writes its own partition.
+
+The event-driven kernels win at the low firing rates, while the parallel
+CSC gathers win during the synchronous bursts. :py:class:`AdaptivePropagation`
+chooses between them at each step by the spike count, and the threshold is
+calibrated by a micro-benchmark at the startup.
+"""
+
+import time
+
+import numpy as np
+
+from brainpy import errors
+from brainpy import tools
+from brainpy.tools import numba_prange
+
+__all__ = [
+    'csr_spike_mv',
+    'csr_rate_mv',
+    'csc_spike_mv',
+    'csc_rate_mv',
+
+    'spike_ids',
+    'event_homo',
+    'event_heter',
+    'event_homo_parallel',
+    'event_heter_parallel',
+    'delayed_event_homo',
+    'delayed_event_heter',
+
+    'adaptive_homo',
+    'adaptive_heter',
+    'AdaptivePropagation',
+]
+
+
+@tools.numba_jit
+def csr_spike_mv(indptr, indices, data, spike, target):
+    """Accumulate ``target += spike @ W``, in which only the rows of the
+    spiking neurons are visited.
+
+    Parameters
+    ----------
+    indptr : np.ndarray
+        The row pointers of the CSR matrix ``W``.
+    indices : np.ndarray
+        The column (post-synaptic) indexes of the CSR matrix.
+    data : np.ndarray
+        The values (weights) of the CSR matrix.
+    spike : np.ndarray
+        The spikes of the pre-synaptic neurons.
+    target : np.ndarray
+        The post-synaptic target.
+    """
+    for i in range(spike.shape[0]):
+        if spike[i]:
+            for k in range(indptr[i], indptr[i + 1]):
+                target[indices[k]] += data[k]
+
+
+@tools.numba_jit
+def csr_rate_mv(indptr, indices, data, rate, target):
+    """Accumulate ``target += rate @ W``, in which ``rate`` is the
+    continuous activity of the pre-synaptic neurons.
+
+    Parameters
+    ----------
+    indptr : np.ndarray
+        The row pointers of the CSR matrix ``W``.
+    indices : np.ndarray
+        The column (post-synaptic) indexes of the CSR matrix.
+    data : np.ndarray
+        The values (weights) of the CSR matrix.
+    rate : np.ndarray
+        The activity of the pre-synaptic neurons.
+    target : np.ndarray
+        The post-synaptic target.
+    """
+    for i in range(rate.shape[0]):
+        r = rate[i]
+        if r != 0.:
+            for k in range(indptr[i], indptr[i + 1]):
+                target[indices[k]] += r * data[k]
+
+
+@tools.numba_jit(parallel=True)
+def csc_spike_mv(col_indptr, col_indices, col_data, spike, target):
+    """Accumulate ``target += spike @ W`` by gathering the columns
+    of ``W`` in parallel.
+
+    Parameters
+    ----------
+    col_indptr : np.ndarray
+        The column pointers of the CSC matrix ``W``.
+    col_indices : np.ndarray
+        The row (pre-synaptic) indexes of the CSC matrix.
+    col_data : np.ndarray
+        The values (weights) of the CSC matrix.
+    spike : np.ndarray
+        The spikes of the pre-synaptic neurons.
+    target : np.ndarray
+        The post-synaptic target.
+    """
+    for j in numba_prange(target.shape[0]):
+        s = 0.
+        for k in range(col_indptr[j], col_indptr[j + 1]):
+            if spike[col_indices[k]]:
+                s += col_data[k]
+        target[j] += s
+
+
+@tools.numba_jit(parallel=True)
+def csc_rate_mv(col_indptr, col_indices, col_data, rate, target):
+    """Accumulate ``target += rate @ W`` by gathering the columns
+    of ``W`` in parallel.
+
+    Parameters
+    ----------
+    col_indptr : np.ndarray
+        The column pointers of the CSC matrix ``W``.
+    col_indices : np.ndarray
+        The row (pre-synaptic) indexes of the CSC matrix.
+    col_data : np.ndarray
+        The values (weights) of the CSC matrix.
+    rate : np.ndarray
+        The activity of the pre-synaptic neurons.
+    target : np.ndarray
+        The post-synaptic target.
+    """
+    for j in numba_prange(target.shape[0]):
+        s = 0.
+        for k in range(col_indptr[j], col_indptr[j + 1]):
+            s += rate[col_indices[k]] * col_data[k]
+        target[j] += s
+
+
+@tools.numba_jit
+def spike_ids(spike):
+    """Get the indexes of the spiking neurons.
+
+    Parameters
+    ----------
+    spike : np.ndarray
+        The spikes of the neurons.
+
+    Returns
+    -------
+    ids : np.ndarray
+        The indexes of the spiking neurons.
+    """
+    n = 0
+    for i in range(spike.shape[0]):
+        if spike[i]:
+            n += 1
+    ids = np.empty(n, dtype=np.int64)
+    n = 0
+    for i in range(spike.shape[0]):
+        if spike[i]:
+            ids[n] = i
+            n += 1
+    return ids
+
+
+@tools.numba_jit
+def event_homo(ids, indptr, indices, weight, target):
+    """Accumulate the homogeneous ``weight`` into the post-synaptic
+    ``target`` of the spiking neurons ``ids``.
+
+    Parameters
+    ----------
+    ids : np.ndarray
+        The indexes of the spiking pre-synaptic neurons.
+    indptr : np.ndarray
+        The CSR row pointers of the connectivity.
+    indices : np.ndarray
+        The CSR post-synaptic indexes of the connectivity.
+    weight : float
+        The synaptic weight.
+    target : np.ndarray
+        The post-synaptic target.
+    """
+    for a in range(ids.shape[0]):
+        i = ids[a]
+        for k in range(indptr[i], indptr[i + 1]):
+            target[indices[k]] += weight
+
+
+@tools.numba_jit
+def event_heter(ids, indptr, indices, weights, target):
+    """Accumulate the per-synapse ``weights`` into the post-synaptic
+    ``target`` of the spiking neurons ``ids``.
+
+    Parameters
+    ----------
+    ids : np.ndarray
+        The indexes of the spiking pre-synaptic neurons.
+    indptr : np.ndarray
+        The CSR row pointers of the connectivity.
+    indices : np.ndarray
+        The CSR post-synaptic indexes of the connectivity.
+    weights : np.ndarray
+        The synaptic weights in the CSR order.
+    target : np.ndarray
+        The post-synaptic target.
+    """
+    for a in range(ids.shape[0]):
+        i = ids[a]
+        for k in range(indptr[i], indptr[i + 1]):
+            target[indices[k]] += weights[k]
+
+
+@tools.numba_jit
+def _row_range(indptr, indices, i, lo, hi):
+    # the synapses of the row "i" whose sorted post-synaptic
+    # indexes are in [lo, hi), by the binary search
+    start, end = indptr[i], indptr[i + 1]
+    row = indices[start:end]
+    return start + np.searchsorted(row, lo), start + np.searchsorted(row, hi)
+
+
+@tools.numba_jit(parallel=True)
+def event_homo_parallel(ids, indptr, indices, weight, target, num_part):
+    """The parallel version of :py:func:`event_homo`.
+
+    The post-synaptic neurons are divided into ``num_part`` contiguous
+    partitions (typically the number of the threads), and each partition
+    is computed by one thread. The post-synaptic indexes of each row must
+    be sorted (for example, by ``Connector.reorder('sort')``), so that the
+    synapses of a partition are found by the binary search.
+
+    Parameters
+    ----------
+    ids : np.ndarray
+        The indexes of the spiking pre-synaptic neurons.
+    indptr : np.ndarray
+        The CSR row pointers of the connectivity.
+    indices : np.ndarray
+        The sorted CSR post-synaptic indexes of the connectivity.
+    weight : float
+        The synaptic weight.
+    target : np.ndarray
+        The post-synaptic target.
+    num_part : int
+        The number of the partitions.
+    """
+    num_post = target.shape[0]
+    for p in numba_prange(num_part):
+        lo = p * num_post // num_part
+        hi = (p + 1) * num_post // num_part
+        for a in range(ids.shape[0]):
+            start, end = _row_range(indptr, indices, ids[a], lo, hi)
+            for k in range(start, end):
+                target[indices[k]] += weight
+
+
+@tools.numba_jit(parallel=True)
+def event_heter_parallel(ids, indptr, indices, weights, target, num_part):
+    """The parallel version of :py:func:`event_heter`.
+
+    See :py:func:`event_homo_parallel` for the partitions.
+
+    Parameters
+    ----------
+    ids : np.ndarray
+        The indexes of the spiking pre-synaptic neurons.
+    indptr : np.ndarray
+        The CSR row pointers of the connectivity.
+    indices : np.ndarray
+        The sorted CSR post-synaptic indexes of the connectivity.
+    weights : np.ndarray
+        The synaptic weights in the CSR order.
+    target : np.ndarray
+        The post-synaptic target.
+    num_part : int
+        The number of the partitions.
+    """
+    num_post = target.shape[0]
+    for p in numba_prange(num_part):
+        lo = p * num_post // num_part
+        hi = (p + 1) * num_post // num_part
+        for a in range(ids.shape[0]):
+            start, end = _row_range(indptr, indices, ids[a], lo, hi)
+            for k in range(start, end):
+                target[indices[k]] += weights[k]
+
+
+@tools.numba_jit
+def delayed_event_homo(syn_ids, post_ids, weight, target):
+    """Accumulate the homogeneous ``weight`` into the post-synaptic
+    ``target`` of the delivered synapses ``syn_ids``, such as the
+    synapses pulled from :py:class:`brainpy.simulation.EventDelay`.
+
+    Parameters
+    ----------
+    syn_ids : np.ndarray
+        The indexes of the delivered synapses.
+    post_ids : np.ndarray
+        The post-synaptic index of each synapse.
+    weight : float
+        The synaptic weight.
+    target : np.ndarray
+        The post-synaptic target.
+    """
+    for a in range(syn_ids.shape[0]):
+        target[post_ids[syn_ids[a]]] += weight
+
+
+@tools.numba_jit
+def delayed_event_heter(syn_ids, post_ids, weights, target):
+    """Accumulate the per-synapse ``weights`` into the post-synaptic
+    ``target`` of the delivered synapses ``syn_ids``.
+
+    Parameters
+    ----------
+    syn_ids : np.ndarray
+        The indexes of the delivered synapses.
+    post_ids : np.ndarray
+        The post-synaptic index of each synapse.
+    weights : np.ndarray
+        The weight of each synapse.
+    target : np.ndarray
+        The post-synaptic target.
+    """
+    for a in range(syn_ids.shape[0]):
+        s = syn_ids[a]
+        target[post_ids[s]] += weights[s]
+
+
+@tools.numba_jit(parallel=True)
+def _csc_spike_homo(col_indptr, col_indices, weight, spike, target):
+    for j in numba_prange(target.shape[0]):
+        n = 0
+        for k in range(col_indptr[j], col_indptr[j + 1]):
+            if spike[col_indices[k]]:
+                n += 1
+        target[j] += n * weight
+
+
+@tools.numba_jit
+def adaptive_homo(spike, indptr, indices, col_indptr, col_indices, weight, threshold, target):
+    """Accumulate the homogeneous ``weight`` into the post-synaptic ``target``
+    of the spiking neurons, by the event-driven scatter if the number of
+    the spikes is less than ``threshold``, otherwise by the parallel gather
+    of the CSC columns.
+
+    Parameters
+    ----------
+    spike : np.ndarray
+        The spikes of the pre-synaptic neurons.
+    indptr : np.ndarray
+        The CSR row pointers of the connectivity.
+    indices : np.ndarray
+        The CSR post-synaptic indexes of the connectivity.
+    col_indptr : np.ndarray
+        The CSC column pointers of the connectivity.
+    col_indices : np.ndarray
+        The CSC pre-synaptic indexes of the connectivity.
+    weight : float
+        The synaptic weight.
+    threshold : int
+        The threshold of the spike number.
+    target : np.ndarray
+        The post-synaptic target.
+    """
+    ids = spike_ids(spike)
+    if ids.shape[0] < threshold:
+        event_homo(ids, indptr, indices, weight, target)
+    else:
+        _csc_spike_homo(col_indptr, col_indices, weight, spike, target)
+
+
+@tools.numba_jit
+def adaptive_heter(spike, indptr, indices, weights, col_indptr, col_indices, col_weights,
+                   threshold, target):
+    """Accumulate the per-synapse ``weights`` into the post-synaptic ``target``
+    of the spiking neurons, by the event-driven scatter if the number of
+    the spikes is less than ``threshold``, otherwise by the parallel gather
+    of the CSC columns.
+
+    Parameters
+    ----------
+    spike : np.ndarray
+        The spikes of the pre-synaptic neurons.
+    indptr : np.ndarray
+        The CSR row pointers of the connectivity.
+    indices : np.ndarray
+        The CSR post-synaptic indexes of the connectivity.
+    weights : np.ndarray
+        The synaptic weights in the CSR order.
+    col_indptr : np.ndarray
+        The CSC column pointers of the connectivity.
+    col_indices : np.ndarray
+        The CSC pre-synaptic indexes of the connectivity.
+    col_weights : np.ndarray
+        The synaptic weights in the CSC order.
+    threshold : int
+        The threshold of the spike number.
+    target : np.ndarray
+        The post-synaptic target.
+    """
+    ids = spike_ids(spike)
+    if ids.shape[0] < threshold:
+        event_heter(ids, indptr, indices, weights, target)
+    else:
+        csc_spike_mv(col_indptr, col_indices, col_weights, spike, target)
+
+
+class AdaptivePropagation(object):
+    """The spike propagation which switches between the event-driven
+    scatter and the parallel CSC gather according to the activity.
+
+    At each step, the spikes are counted, and the event-driven kernel is
+    used if the number of the spikes is less than ``threshold``. The
+    threshold is calibrated by timing both the kernels on the random
+    spikes of the increasing firing fractions, and is set at the fraction
+    where the gather becomes faster. In the step functions, the kernel
+    can be called with the arrays of this object, for example,
+
+    .. code-block:: python
+
+        self.prop = AdaptivePropagation(conn.requires('sparse'), weight=0.6)
+
+        def update(self, _t):
+            bp.simulation.adaptive_homo(self.pre.spike, self.prop.indptr, self.prop.indices,
+                                        self.prop.col_indptr, self.prop.col_indices,
+                                        self.prop.weight, self.prop.threshold, self.post.g)
+
+    Parameters
+    ----------
+    sparse : SparseConnectivity
+        The sparse connectivity.
+    weight : float, np.ndarray
+        The homogeneous weight, or the per-synapse weights in the CSR order.
+        Default is the weights of ``sparse``.
+    threshold : int, optional
+        The threshold of the spike number. If not provided, it will be
+        calibrated by :py:meth:`calibrate`.
+    """
+
+    # the firing fractions to calibrate the threshold
+    CALIBRATION_FRACTIONS = (0.001, 0.003, 0.01, 0.03, 0.1, 0.3, 1.)
+
+    def __init__(self, sparse, weight=None, threshold=None):
+        self.num_pre = sparse.num_pre
+        self.num_post = sparse.num_post
+        self.indptr = sparse.indptr
+        self.indices = sparse.indices
+        self.col_indptr = sparse.col_indptr
+        self.col_indices = sparse.col_indices
+        if weight is None:
+            weight = 1. if sparse.weights is None else sparse.weights
+        self.homogeneous = np.ndim(weight) == 0
+        if self.homogeneous:
+            self.weight = float(weight)
+        else:
+            self.weight = np.asarray(weight, dtype=np.float_)
+            if self.weight.shape != (sparse.num_syn,):
+                raise errors.ModelUseError(f'The per-synapse weights must have the shape of '
+                                           f'({sparse.num_syn},), but got {self.weight.shape}.')
+            self.col_weight = self.weight[sparse.csc2csr]
+        self.threshold = self.calibrate() if threshold is None else threshold
+
+    def _event(self, spike, target):
+        ids = spike_ids(spike)
+        if self.homogeneous:
+            event_homo(ids, self.indptr, self.indices, self.weight, target)
+        else:
+            event_heter(ids, self.indptr, self.indices, self.weight, target)
+
+    def _gather(self, spike, target):
+        if self.homogeneous:
+            _csc_spike_homo(self.col_indptr, self.col_indices, self.weight, spike, target)
+        else:
+            csc_spike_mv(self.col_indptr, self.col_indices, self.col_weight, spike, target)
+
+    @staticmethod
+    def _timeit(f, spike, target, repeat=3):
+        f(spike, target)  # compile
+        best = np.inf
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            f(spike, target)
+            best = min(best, time.perf_counter() - t0)
+        return best
+
+    def calibrate(self):
+        """Calibrate the threshold of the spike number.
+
+        Returns
+        -------
+        threshold : int
+            The spike number above which the gather is faster.
+        """
+        rng = np.random.RandomState(0)
+        target = np.zeros(self.num_post)
+        threshold = self.num_pre + 1
+        prev_fraction = 0.
+        for fraction in self.CALIBRATION_FRACTIONS:
+            spike = rng.random_sample(self.num_pre) < fraction
+            if self._timeit(self._gather, spike, target) < self._timeit(self._event, spike, target):
+                # the geometric middle of the two fractions
+                if prev_fraction > 0.:
+                    fraction = np.sqrt(prev_fraction * fraction)
+                threshold = int(np.ceil(fraction * self.num_pre))
+                break
+            prev_fraction = fraction
+        return threshold
+
+    def update(self, spike, target):
+        """Accumulate the weights of the spiking neurons into ``target``.
+
+        Parameters
+        ----------
+        spike : np.ndarray
+            The spikes of the pre-synaptic neurons.
+        target : np.ndarray
+            The post-synaptic target.
+        """
+        if self.homogeneous:
+            adaptive_homo(spike, self.indptr, self.indices, self.col_indptr, self.col_indices,
+                          self.weight, self.threshold, target)
+        else:
+            adaptive_heter(spike, self.indptr, self.indices, self.weight, self.col_indptr,
+                           self.col_indices, self.col_weight, self.threshold, target)
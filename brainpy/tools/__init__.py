@@ -4,3 +4,4 @@ from .ast2code import *
 from .codes import *
 from .dicts import *
 from .decorators import *
+from .rng import *
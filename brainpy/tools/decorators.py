@@ -8,12 +8,27 @@ except ModuleNotFoundError:
 
 
 __all__ = [
-    'numba_jit'
+    'numba_jit',
+    'numba_prange',
 ]
 
 
-def numba_jit(f):
+def numba_jit(f=None, **kwargs):
+    """JIT compile the function with ``numba.njit``, if Numba is installed.
+
+    It can be used as ``@numba_jit``, or with the compilation options,
+    such as ``@numba_jit(parallel=True)``.
+    """
+    if f is None:
+        return lambda f: numba_jit(f, **kwargs)
     if numba is None:
         return f
     else:
-        return numba.njit(f)
+        return numba.njit(f, **kwargs)
+
+
+# The parallel loop in the function decorated by "numba_jit(parallel=True)".
+# Note that Numba only recognizes the parallel loop when "numba_prange" is
+# imported by name (``from brainpy.tools import numba_prange``), rather
+# than accessed as the module attribute (``tools.numba_prange``).
+numba_prange = range if numba is None else numba.prange
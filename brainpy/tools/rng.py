@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+
+"""
+Counter-based random numbers.
+
+A random number is a pure function of the stream ``key`` and the
+``counter``, i.e., ``uniform(key, counter)``, in which the key is
+derived from ``(seed, index)`` (e.g., the row index of a connectivity).
+Therefore, the random numbers of each stream can be generated
+independently, in any order, and by any number of workers, with the
+bit-identical results. The key and the counter are mixed by the
+SplitMix64 finalizer. All the functions can be called in the Numba
+compiled functions.
+
+The random streams of the simulation are identified by the node and
+the purpose (such as ``("PoissonInput0", "step")``), and keyed under
+the global seed set by :py:func:`set_seed`. The nodes are named for the
+streams by :py:func:`new_stream_name`. The steps of a node draw from the
+stream of the node by its key and its counter array (such as
+``stream_uniforms(self.rng_key, self.rng_counter, num)``), which are the
+attributes of the node, and are passed into the compiled steps by the
+``numba`` driver like the other data. Since each stream only depends on
+its own counter, the results are the same no matter whether the nodes run
+serially, in threads, or in a fused loop, and with any backend.
+"""
+
+import hashlib
+
+import numpy as np
+
+from brainpy.tools.decorators import numba_jit
+
+__all__ = [
+    'new_seed',
+    'rng_key',
+    'rng_uniform',
+    'rng_randint',
+    'rng_normal',
+    'rng_uniforms',
+    'rng_normals',
+    'stream_uniforms',
+    'stream_normals',
+    'set_seed',
+    'get_seed',
+    'stream_key',
+    'get_stream',
+    'RandomStream',
+    'new_stream_name',
+]
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+_S30 = np.uint64(30)
+_S27 = np.uint64(27)
+_S31 = np.uint64(31)
+_S11 = np.uint64(11)
+_TO_UNIT = 1. / 9007199254740992.  # 2 ** -53
+
+_seed = None
+_STREAMS = {}
+_NODE_NO = {}
+
+
+def new_seed():
+    """Get a new seed from the global NumPy random state, which is used
+    when the user does not provide the seed."""
+    return int(np.random.randint(0, np.iinfo(np.int64).max))
+
+
+@numba_jit
+def _mix64(z):
+    z = (z ^ (z >> _S30)) * _MIX1
+    z = (z ^ (z >> _S27)) * _MIX2
+    return z ^ (z >> _S31)
+
+
+@numba_jit
+def rng_key(seed, index):
+    """Get the key of the random stream ``index`` under the ``seed``.
+
+    Parameters
+    ----------
+    seed : int
+        The non-negative random seed.
+    index : int
+        The non-negative stream index, such as the neuron index.
+
+    Returns
+    -------
+    key : np.uint64
+        The stream key.
+    """
+    return _mix64(_mix64(np.uint64(seed) + _GOLDEN) ^ (np.uint64(index) * _GOLDEN))
+
+
+@numba_jit
+def rng_uniform(key, counter):
+    """Get the ``counter``-th uniform random number in ``[0, 1)`` of the stream ``key``."""
+    z = _mix64(np.uint64(key) ^ _mix64((np.uint64(counter) + np.uint64(1)) * _GOLDEN))
+    return (z >> _S11) * _TO_UNIT
+
+
+@numba_jit
+def rng_randint(key, counter, high):
+    """Get the ``counter``-th random integer in ``[0, high)`` of the stream ``key``."""
+    return min(int(rng_uniform(key, counter) * high), high - 1)
+
+
+@numba_jit
+def rng_normal(key, counter):
+    """Get the ``counter``-th standard normal random number of the stream
+    ``key``, which consumes the uniform numbers ``2 * counter`` and
+    ``2 * counter + 1`` by the Box–Muller transform."""
+    u1 = 1. - rng_uniform(key, 2 * counter)
+    u2 = rng_uniform(key, 2 * counter + 1)
+    return np.sqrt(-2. * np.log(u1)) * np.cos(2. * np.pi * u2)
+
+
+@numba_jit
+def rng_uniforms(key, counter, num):
+    """Get the uniform random numbers of the counters ``[counter, counter + num)``
+    of the stream ``key``."""
+    res = np.empty(num)
+    for i in range(num):
+        res[i] = rng_uniform(key, counter + i)
+    return res
+
+
+@numba_jit
+def rng_normals(key, counter, num):
+    """Get the standard normal random numbers of the counters
+    ``[counter, counter + num)`` of the stream ``key``, which consume
+    the uniform counters ``[2 * counter, 2 * (counter + num))``."""
+    res = np.empty(num)
+    for i in range(num):
+        res[i] = rng_normal(key, counter + i)
+    return res
+
+
+@numba_jit
+def stream_uniforms(key, counter, num):
+    """Draw ``num`` uniform random numbers in ``[0, 1)`` from the stream
+    ``key``, and advance the counter array ``counter`` in place."""
+    res = rng_uniforms(key, counter[0], num)
+    counter[0] += num
+    return res
+
+
+@numba_jit
+def stream_normals(key, counter, num):
+    """Draw ``num`` standard normal random numbers from the stream
+    ``key``, and advance the counter array ``counter`` in place."""
+    # the uniform counters consumed by the normal numbers start from the even one
+    start = (counter[0] + 1) // 2
+    res = rng_normals(key, start, num)
+    counter[0] = 2 * (start + num)
+    return res
+
+
+def set_seed(seed=None):
+    """Set the global seed of the random streams.
+
+    The streams got after this setting (by :py:func:`get_stream`, or
+    the new nodes) are keyed under the new seed.
+
+    Parameters
+    ----------
+    seed : int, optional
+        The non-negative seed. If not provided, each new stream is keyed
+        by a seed drawn from the global NumPy random state, so that the
+        results are reproduced by ``np.random.seed()``.
+    """
+    global _seed
+    _seed = seed
+    _STREAMS.clear()
+    _NODE_NO.clear()
+
+
+def get_seed():
+    """Get the global seed of the random streams.
+
+    Returns
+    -------
+    seed : int, None
+        The global seed, or ``None`` if it is not set.
+    """
+    return _seed
+
+
+def _str_index(name):
+    # the stable (across the processes) non-negative index of the string
+    return int.from_bytes(hashlib.sha1(str(name).encode()).digest()[:8], 'little') >> 1
+
+
+def stream_key(name, purpose, seed=None):
+    """Get the key of the random stream of the node ``name`` for the ``purpose``.
+
+    Parameters
+    ----------
+    name : str
+        The node name.
+    purpose : str
+        The purpose of the random numbers, such as "spike" and "noise".
+    seed : int, optional
+        The seed. If not provided, the global seed is used, or a new
+        seed is drawn if the global seed is not set.
+
+    Returns
+    -------
+    key : np.uint64
+        The stream key.
+    """
+    if seed is None and _seed is None:
+        # the new seed drawn from the NumPy random state already separates
+        # the streams, which is reproduced by "np.random.seed()" whatever the name
+        seed, name = new_seed(), ''
+    elif seed is None:
+        seed = _seed
+    # the keys are converted to "np.uint64", since Numba returns them as the Python
+    # integers, which can not be passed to the JIT compiled functions once >= 2 ** 63
+    key = np.uint64(rng_key(seed, _str_index(name)))
+    return np.uint64(rng_key(key, _str_index(purpose)))
+
+
+class RandomStream(object):
+    """The counter-based random stream of a node for a purpose.
+
+    The counter is saved in the array of one element, so that the
+    JIT compiled functions can draw from the stream by the key and
+    the counter, and advance the counter in place. For example,
+
+    >>> spike = stream_uniforms(stream.key, stream.counter, num) < prob
+
+    Parameters
+    ----------
+    name : str
+        The node name.
+    purpose : str
+        The purpose of the random numbers.
+    seed : int, optional
+        The seed. If not provided, the global seed is used, or a new
+        seed is drawn if the global seed is not set.
+    """
+
+    def __init__(self, name, purpose, seed=None):
+        self.key = stream_key(name, purpose, seed)
+        self.counter = np.zeros(1, dtype=np.int64)
+
+    def uniform(self, low=0., high=1., size=None):
+        """Draw the uniform random numbers in ``[low, high)``, like ``np.random.uniform``."""
+        shape = () if size is None else ((size,) if np.ndim(size) == 0 else tuple(size))
+        num = int(np.prod(shape))
+        res = low + (high - low) * stream_uniforms(self.key, self.counter, num)
+        return res[0] if shape == () else res.reshape(shape)
+
+    def normal(self, loc=0., scale=1., size=None):
+        """Draw the normal random numbers, like ``np.random.normal``."""
+        shape = () if size is None else ((size,) if np.ndim(size) == 0 else tuple(size))
+        num = int(np.prod(shape))
+        res = loc + scale * stream_normals(self.key, self.counter, num)
+        return res[0] if shape == () else res.reshape(shape)
+
+
+def get_stream(name, purpose):
+    """Get the shared random stream of the ``name`` and the ``purpose``
+    under the global seed. If the global seed is not set, a new stream
+    keyed by a seed drawn from the global NumPy random state is returned.
+
+    Parameters
+    ----------
+    name : str
+        The node name.
+    purpose : str
+        The purpose of the random numbers.
+
+    Returns
+    -------
+    stream : RandomStream
+        The random stream.
+    """
+    if _seed is None:
+        return RandomStream(name, purpose)
+    if (name, purpose) not in _STREAMS:
+        _STREAMS[(name, purpose)] = RandomStream(name, purpose)
+    return _STREAMS[(name, purpose)]
+
+
+def new_stream_name(prefix):
+    """Get the name of the random streams of a new node, such as ``"PoissonInput0"``.
+
+    The nodes are numbered for each ``prefix`` (such as the class name)
+    since the seed is set, rather than by the global counter of the node
+    names. Therefore, the streams of a node are not changed by the other
+    kinds of nodes created before it, and the networks built again after
+    setting the same seed get the same streams.
+
+    Parameters
+    ----------
+    prefix : str
+        The prefix of the name.
+
+    Returns
+    -------
+    name : str
+        The stream name.
+    """
+    no = _NODE_NO.get(prefix, 0)
+    _NODE_NO[prefix] = no + 1
+    return f'{prefix}{no}'
+
@@ -35,7 +35,7 @@ setup(
     packages=find_packages(exclude=['examples*', 'docs*', 'develop*', 'tests*']),
     python_requires='>=3.6',
     install_requires=[
-        'numpy>=1.15',
+        'numpy>=1.17',
         'matplotlib>=3.2',
     ],
     url='https://github.com/PKU-NIP-Lab/BrainPy',
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+import gc
+import os
+import weakref
+
+import brainpy as bp
+
+
+def _leaky(tau):
+    @bp.odeint(method='rk4')
+    def int_v(V, t, I):
+        dV = (-V + I) / tau
+        return dV
+
+    return int_v
+
+
+def test_memory_cache():
+    bp.backend.set('numpy')
+    bp.integrators.clear_integrator_cache()
+    assert _leaky(10.) is _leaky(10.)
+    assert _leaky(10.) is not _leaky(5.)
+    assert _leaky(10.)(0., 0., 1.) != _leaky(5.)(0., 0., 1.)
+    assert bp.odeint(_leaky(10.).origin_f, dt=0.2) is not _leaky(10.)
+
+    bp.integrators.set_integrator_cache(memory=False)
+    try:
+        assert _leaky(10.) is not _leaky(10.)
+    finally:
+        bp.integrators.set_integrator_cache(memory=True)
+
+
+class _Model(object):
+    def __init__(self):
+        self.int_V = bp.odeint(self.dev_V, method='rk4')
+
+    def dev_V(self, V, t, I):
+        dV = -V + I
+        return dV
+
+
+def test_memory_cache_of_methods():
+    # the integrators of the bound methods do not keep the objects alive
+    bp.integrators.clear_integrator_cache()
+    model = _Model()
+    ref = weakref.ref(model)
+    assert model.int_V(0., 0., 1.) > 0.
+    del model
+    gc.collect()
+    assert ref() is None
+
+
+def test_disk_cache(tmpdir):
+    bp.backend.set('numpy')
+    bp.integrators.clear_integrator_cache()
+    bp.integrators.set_integrator_cache(disk=True, directory=str(tmpdir))
+    try:
+        int_v = _leaky(10.)
+        assert len(os.listdir(str(tmpdir))) == 1
+        # the generated code is loaded from the disk
+        bp.integrators.clear_integrator_cache()
+        int_v2 = _leaky(10.)
+        assert int_v2 is not int_v
+        assert int_v2(1., 0., 2.) == int_v(1., 0., 2.)
+        assert int_v2.variables == ['V'] and int_v2.parameters == ['t', 'I']
+        bp.integrators.clear_integrator_cache(disk=True)
+        assert len(os.listdir(str(tmpdir))) == 0
+    finally:
+        bp.integrators.set_integrator_cache(disk=False)
+
+
+def test_sympy_cache(tmpdir):
+    import sympy
+    from brainpy.integrators import sympy_analysis
+
+    directory = bp.integrators.caching._SYMPY_SETTINGS['directory']
+    bp.integrators.set_sympy_cache(disk=True, directory=str(tmpdir))
+    try:
+        bp.integrators.clear_sympy_cache()
+        V = sympy.Symbol('V', real=True)
+        expr = sympy_analysis.str2sympy('V - V ** 3 / 3 + exp(-V) * I').expr
+        res = sympy_analysis.cached_diff(expr, V)
+        assert res == sympy.diff(expr, V)
+        assert len(os.listdir(str(tmpdir))) == 1
+        # the derivation is loaded from the disk
+        bp.integrators.clear_sympy_cache()
+        assert sympy_analysis.cached_diff(expr, V) == res
+        assert len(os.listdir(str(tmpdir))) == 1
+
+        # the exponential Euler derivation
+        lines1, update1 = sympy_analysis.exp_euler_derivation(
+            'V', [], [], '-V + I', 0.1, 'int_V')
+        bp.integrators.clear_sympy_cache()
+        lines2, update2 = sympy_analysis.exp_euler_derivation(
+            'V', [], [], '-V  +  I', 0.1, 'ode_unknown_3')
+        assert lines1 == lines2 and update1 == update2
+        # shared by the functions of the different names
+        assert len(os.listdir(str(tmpdir))) == 2
+        bp.integrators.clear_sympy_cache(disk=True)
+        assert len(os.listdir(str(tmpdir))) == 0
+    finally:
+        bp.integrators.set_sympy_cache(directory=directory)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+import brainpy as bp
+from brainpy.integrators import ConstantDelay
+from brainpy.integrators import NeutralDelay
+from brainpy.integrators import VaryingDelay
+
+
+def _exact(t, tau):
+    # solution of "dx/dt = -x(t - tau)" with "x(t) = 1" for "t <= 0",
+    # valid in "[tau, 2 * tau]"
+    return 1 - t + (t - tau) ** 2 / 2
+
+
+def test_delay_buffer():
+    xd = ConstantDelay(v0=0., delay_len=1., before_t0=lambda t: t, dt=0.1)
+    assert np.isclose(xd(-0.55), -0.55)
+    assert np.isclose(xd[-1.], -1.)
+    for i in range(1, 21):
+        xd[i * 0.1] = i * 0.1
+    assert np.isclose(xd(1.234), 1.234)
+    assert np.isclose(xd.diff(1.5), 1.)
+    # out of the history, clamped to the oldest or newest data
+    assert np.isclose(xd(-10.), xd(2. - 1.1))
+    assert np.isclose(xd(10.), 2.)
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'numba'])
+@pytest.mark.parametrize('method, interp_method, tol', [('euler', 'linear', 1e-2),
+                                                        ('rk4', 'linear', 1e-4),
+                                                        ('rk4', 'hermite', 1e-4)])
+def test_constant_delay(backend, method, interp_method, tol):
+    bp.backend.set(backend, dt=0.01)
+    tau = 0.955
+    xd = ConstantDelay(v0=1., delay_len=tau, before_t0=1., interp_method=interp_method)
+
+    @bp.ddeint(method=method, delay_vars={'x': xd})
+    def f(x, t):
+        return -xd(t - tau)
+
+    x, t = 1., 0.
+    for _ in range(180):
+        x = f(x, t, xd.data, xd.state)
+        t += 0.01
+    assert abs(x - _exact(1.8, tau)) < tol
+    bp.backend.set('numpy')
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'numba'])
+def test_varying_delay(backend):
+    bp.backend.set(backend, dt=0.01)
+    taus = np.array([0.8, 0.9, 1.0])
+    xd = VaryingDelay(v0=np.ones(3), delay_len=1., before_t0=1.)
+
+    @bp.ddeint(method='rk4', delay_vars={'x': xd}, var_type='population')
+    def f(x, t):
+        return -xd(t - taus)
+
+    x, t = np.ones(3), 0.
+    for _ in range(150):
+        x = f(x, t, xd.data, xd.state)
+        t += 0.01
+    assert np.allclose(x, _exact(1.5, taus), atol=1e-4)
+    bp.backend.set('numpy')
+
+
+def test_neutral_delay():
+    bp.backend.set('numpy', dt=0.01)
+    xd = NeutralDelay(v0=1., delay_len=0.5, before_t0=1.)
+
+    # dx/dt = -x'(t - 0.5) - x, the delayed derivative is zero before 0.5
+    @bp.ddeint(method='rk4', delay_vars={'x': xd})
+    def f(x, t):
+        return -xd.diff(t - 0.5) - x
+
+    x, t = 1., 0.
+    for _ in range(40):
+        x = f(x, t, xd.data, xd.state)
+        t += 0.01
+    assert abs(x - np.exp(-0.4)) < 1e-5
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+import brainpy as bp
+
+ENa, EK, EL = 50., -77., -54.387
+
+
+def dm(m, t, V):
+    alpha = 0.1 * (V + 40) / (1 - np.exp(-(V + 40) / 10))
+    beta = 4.0 * np.exp(-(V + 65) / 18)
+    dmdt = alpha * (1 - m) - beta * m
+    return dmdt
+
+
+def dn(n, t, V):
+    alpha = 0.01 * (V + 55) / (1 - np.exp(-(V + 55) / 10))
+    beta = 0.125 * np.exp(-(V + 65) / 80)
+    dndt = alpha * (1 - n) - beta * n
+    return dndt
+
+
+def dV(V, t, m, n, Iext, gNa=120., gK=36., gL=0.03):
+    I_Na = (gNa * m ** 3.0 * 0.6) * (V - ENa)
+    I_K = (gK * n ** 4.0) * (V - EK)
+    I_leak = gL * (V - EL)
+    dVdt = (- I_Na - I_K - I_leak + Iext) / 1.
+    return dVdt
+
+
+def test_joint_eq():
+    f = bp.integrators.joint_eq(dV, dm, dn)
+    assert f.joint_eqs == (dV, dm, dn)
+    class_kw, variables, parameters, arguments = bp.integrators.utils.get_args(f)
+    assert variables == ['V', 'm', 'n']
+    assert parameters == ['t', 'Iext', 'gNa', 'gK', 'gL']
+    # the shared local variables are renamed
+    source = bp.tools.get_func_source(f)
+    assert 'alpha_dm' in source and 'alpha_dn' in source
+
+    V = np.linspace(-80.5, 40., 10)
+    m = np.linspace(0., 1., 10)
+    n = np.linspace(1., 0., 10)
+    dV_, dm_, dn_ = f(V, m, n, 0., 10.)
+    assert np.allclose(dV_, dV(V, 0., m, n, 10.))
+    assert np.allclose(dm_, dm(m, 0., V))
+    assert np.allclose(dn_, dn(n, 0., V))
+
+    with pytest.raises(bp.errors.IntegratorError):
+        bp.integrators.joint_eq(dm, dm)
+    with pytest.raises(bp.errors.IntegratorError):
+        bp.integrators.joint_eq()
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'numba'])
+@pytest.mark.parametrize('method', ['euler', 'exponential_euler'])
+def test_odeint_joint_eq(backend, method):
+    bp.backend.set(backend, dt=0.01)
+    try:
+        int_joint = bp.odeint(bp.integrators.joint_eq(dV, dm, dn), method=method)
+        int_V = bp.odeint(dV, method=method)
+        int_m = bp.odeint(dm, method=method)
+        int_n = bp.odeint(dn, method=method)
+        V = np.linspace(-80.5, 40., 100)
+        m = np.linspace(0., 1., 100)
+        n = np.linspace(1., 0., 100)
+        # the variables of the one-step methods are updated by the same values
+        V2, m2, n2 = int_joint(V, m, n, 0., 10.)
+        assert np.allclose(V2, int_V(V, 0., m, n, 10.))
+        assert np.allclose(m2, int_m(m, 0., V))
+        assert np.allclose(n2, int_n(n, 0., V))
+        # the scalar variables
+        V3, m3, n3 = int_joint(V[0], m[0], n[0], 0., 10.)
+        assert np.allclose([V3, m3, n3], [V2[0], m2[0], n2[0]])
+        # the loop over the elements with the Numba backend
+        assert hasattr(int_joint, 'element_f') == (backend == 'numba')
+    finally:
+        bp.backend.set('numpy')
@@ -64,3 +64,29 @@ def test():
     # lorenz_system(ode.bs, dt=0.01, tol=0.001)
     lorenz_system(ode.heun_euler, dt=0.01, tol=0.001)
 
+
+
+def test_element_adaptive():
+    bp.backend.set('numba')
+    # a few stiff elements in the population
+    tau = np.where(np.arange(50) % 10 == 0, 0.02, 5.)
+
+    def derivative(V, w, t, tau, I):
+        dV = (-V + I - w) / tau
+        dw = (V - w) / 10.
+        return dV, dw
+
+    integral = ode.rkf45(derivative, tol=1e-6, adaptive='element',
+                         var_type=bp.POPU_VAR, dt=0.1)
+    reference = ode.rk4(derivative, dt=0.001)
+    V, w, dts = np.zeros(50), np.zeros(50), 0.1
+    V_ref, w_ref = np.zeros(50), np.zeros(50)
+    for i in range(20):
+        V, w, dts = integral(V, w, i * 0.1, tau, 1., dts)
+        for j in range(100):
+            V_ref, w_ref = reference(V_ref, w_ref, i * 0.1 + j * 0.001, tau, 1.)
+    assert np.allclose(V, V_ref, atol=1e-5)
+    assert np.allclose(w, w_ref, atol=1e-5)
+    # only the stiff elements reduce their step sizes
+    assert np.all(dts[tau == 5.] >= 0.1)
+    assert np.all(dts[tau == 0.02] < 0.1)
@@ -55,3 +55,25 @@ def test4():
     f = lambda s, t, tau: -s / tau
     with pytest.raises(bp.errors.AnalyzerError) as excinfo:
         exp_euler_wrapper(f=f, show_code=True, dt=0.01, var_type='SCALAR', im_return=())
+
+
+def test_system_var():
+    import numpy as np
+    bp.backend.set('numpy')
+
+    # the FitzHugh-Nagumo model of two neurons
+    def derivative(x, t, I):
+        v, w = x
+        dv = v - v ** 3 / 3 - w + I
+        dw = 0.08 * (v + 0.7 - 0.8 * w)
+        return np.array([dv, dw])
+
+    integral = exp_euler_wrapper(f=derivative, show_code=False, dt=0.1, var_type=bp.SYSTEM_VAR, im_return=())
+    reference = bp.ode.rk4(derivative, dt=0.001, var_type=bp.SYSTEM_VAR)
+    x = np.array([[-1., 0.], [1., 0.5]])
+    x_ref = x.copy()
+    for i in range(100):
+        x = integral(x, i * 0.1, 0.5)
+        for j in range(100):
+            x_ref = reference(x_ref, i * 0.1 + j * 0.001, 0.5)
+    assert np.allclose(x, x_ref, atol=1e-3)
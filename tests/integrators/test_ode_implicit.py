@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+import brainpy as bp
+from brainpy.integrators import ode
+
+
+def stiff_derivative(x, y, t, I):
+    dx = (-x + np.cos(t) - y) / 0.01
+    dy = (x - y) / 5. + I
+    return dx, dy
+
+
+def _reference(I, duration):
+    integral = ode.rk4(stiff_derivative, dt=0.001)
+    x, y = np.zeros(len(I)), np.zeros(len(I))
+    for i in range(int(round(duration / 0.001))):
+        x, y = integral(x, y, i * 0.001, I)
+    return x, y
+
+
+@pytest.mark.parametrize('method', [ode.backward_euler, ode.bdf, ode.rosenbrock_w])
+@pytest.mark.parametrize('jacobian', ['full', 'diagonal'])
+def test_stiff_population(method, jacobian):
+    bp.backend.set('numba')
+    I = np.array([0., 0.1, 0.2])
+    x_ref, y_ref = _reference(I, 5.)
+
+    # the step size is ten times of the stability limit of the explicit methods
+    integral = method(stiff_derivative, dt=0.1, jacobian=jacobian, var_type=bp.POPU_VAR)
+    x, y = np.zeros(3), np.zeros(3)
+    x_prev, y_prev = None, None
+    for i in range(50):
+        if method is ode.bdf:
+            x, y, x_prev, y_prev = integral(x, y, i * 0.1, I, x_prev, y_prev)
+        else:
+            x, y = integral(x, y, i * 0.1, I)
+    assert np.allclose(x, x_ref, atol=2e-2)
+    assert np.allclose(y, y_ref, atol=2e-2)
+
+
+def test_scalar_variable():
+    bp.backend.set('numpy')
+
+    def derivative(v, t, tau):
+        dv = -v / tau
+        return dv
+
+    for method in [ode.backward_euler, ode.rosenbrock_w]:
+        integral = method(derivative, dt=0.1)
+        v = 1.
+        for i in range(10):
+            v = integral(v, i * 0.1, 0.01)
+        assert 0. <= v < 1e-3
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+import brainpy as bp
+from brainpy.integrators import optimize_code
+
+ENa = 50.
+
+
+def dev_hh(V, m, t, gNa, Iext):
+    alpha = 0.1 * (V + 40) / (1 - np.exp(-(V + 40) / 10))
+    beta = 4.0 * np.exp(-(V + 65) / 18)
+    dmdt = alpha * (1 - m) - beta * m
+    dVdt = -gNa * m ** 3 * (V - ENa) + Iext
+    return dVdt, dmdt
+
+
+def dev_abs(x, t, p=2.):
+    if x > 0:
+        dx = -p * x
+    else:
+        dx = p * x
+    return dx
+
+
+def test_optimize_code():
+    code_lines = ['def int_x(x, t, p):',
+                  '  dx_k1 = f(x, t, p)',
+                  '  k2_x_arg = x + dt * dx_k1 * 0.5',
+                  '  k2_t_arg = t + dt * 0.5',
+                  '  dx_k2 = f(k2_x_arg, k2_t_arg, p)',
+                  '  x_new = x + dt * dx_k2',
+                  '  return x_new']
+
+    def f(x, t, p):
+        a = np.exp(-p * 2.)
+        dx = -a * x
+        return dx
+
+    code_lines2, code_scope2 = optimize_code(code_lines, {'f': f, 'dt': 0.1}, 'int_x')
+    code = '\n'.join(code_lines2)
+    # the inlined derivative, the parameter-only expression is evaluated once,
+    # and the unused stage time is removed
+    assert 'f(' not in code
+    assert code.count('np.exp') == 1
+    assert 'k2_t_arg' not in code
+    assert code_scope2['np'] is np
+    exec(code, code_scope2)
+    assert code_scope2['int_x'](1., 0., 0.5) == 1. + 0.1 * f(1. + 0.1 * f(1., 0., 0.5) * 0.5, 0., 0.5)
+
+    # the functions with the control flows are not inlined
+    code_lines3, _ = optimize_code(code_lines, {'f': dev_abs, 'dt': 0.1}, 'int_x')
+    assert sum('f(' in line for line in code_lines3) == 2
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'numba'])
+@pytest.mark.parametrize('method', ['rk2', 'rk4', 'rkf45'])
+def test_odeint_optimize(backend, method):
+    bp.backend.set(backend, dt=0.01)
+    try:
+        int_f = bp.odeint(dev_hh, method=method)
+        int_f_opt = bp.odeint(dev_hh, method=method, optimize=True)
+        V = np.linspace(-80.5, 40., 100)
+        m = np.linspace(0., 1., 100)
+        r1 = int_f(V, m, 0., 120., 10.)
+        r2 = int_f_opt(V, m, 0., 120., 10.)
+        for a, b in zip(r1, r2):
+            assert np.allclose(a, b, rtol=1e-12)
+    finally:
+        bp.backend.set('numpy')
+
+
+class _HH(object):
+    def __init__(self, gNa=120.):
+        self.gNa = gNa
+        self.int_hh = bp.odeint(self.dev_hh, method='rk4')
+        self.int_hh_opt = bp.odeint(self.dev_hh, method='rk4', optimize=True)
+
+    def dev_hh(self, V, m, t, Iext):
+        alpha = 0.1 * (V + 40) / (1 - np.exp(-(V + 40) / 10))
+        beta = 4.0 * np.exp(-(V + 65) / 18)
+        dmdt = alpha * (1 - m) - beta * m
+        dVdt = -self.gNa * m ** 3 * (V - ENa) + Iext
+        return dVdt, dmdt
+
+
+def test_odeint_optimize_methods():
+    bp.backend.set('numpy', dt=0.01)
+    hh = _HH()
+    V = np.linspace(-80.5, 40., 100)
+    m = np.linspace(0., 1., 100)
+    for a, b in zip(hh.int_hh(V, m, 0., 10.), hh.int_hh_opt(V, m, 0., 10.)):
+        assert np.allclose(a, b, rtol=1e-12)
+    # the parameters of the instance are not folded
+    hh.gNa = 60.
+    for a, b in zip(hh.int_hh(V, m, 0., 10.), hh.int_hh_opt(V, m, 0., 10.)):
+        assert np.allclose(a, b, rtol=1e-12)
+
+
+def test_sdeint_optimize():
+    def f(x, t, p):
+        dx = -p * x
+        return dx
+
+    def g(x, t, p):
+        dg = 0.1 * x
+        return dg
+
+    x = np.linspace(-1., 1., 10)
+    for method in ['milstein', 'srk1w1_scalar']:
+        int_x = bp.sdeint(f, g=g, method=method)
+        int_x_opt = bp.sdeint(f, g=g, method=method, optimize=True)
+        bp.tools.set_seed(1)
+        x1 = int_x(x, 0., 2.)
+        bp.tools.set_seed(1)
+        x2 = int_x_opt(x, 0., 2.)
+        assert np.allclose(x1, x2, rtol=1e-12)
+    bp.tools.set_seed(None)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+import brainpy as bp
+from brainpy.integrators.sde import noise
+
+
+def test_wiener_buffer():
+    key = bp.tools.stream_key('NG1', 'noise', seed=1)
+    buffer = noise.WienerBuffer(key, loc=1., scale=0.5, block_size=1000)
+    samples = []
+    for _ in range(200):
+        buffer.begin()
+        samples.append(buffer.draw((30, 3)).copy())
+    assert all(s.shape == (30, 3) for s in samples)
+    samples = np.concatenate([s.flatten() for s in samples])
+    assert abs(samples.mean() - 1.) < 0.05
+    assert abs(samples.std() - 0.5) < 0.05
+    assert isinstance(buffer.draw(), float)
+
+    # the views of one call are kept valid while the halves are refilled
+    buffer.begin()
+    views = [buffer.draw(300) for _ in range(10)]
+    copies = [view.copy() for view in views]
+    buffer.draw(5000)
+    assert all(np.all(view == copy) for view, copy in zip(views, copies))
+
+    # the numbers only depend on the stream key
+    other = noise.WienerBuffer(key, loc=1., scale=0.5, block_size=1000)
+    assert np.all(other.draw(10) == noise.WienerBuffer(key, loc=1., scale=0.5, block_size=1000).draw(10))
+    with pytest.raises(bp.errors.IntegratorError):
+        noise.WienerBuffer(key, block_size=0)
+
+
+def test_buffered_sde():
+    bp.backend.set('numpy')
+    sigma = 0.5
+
+    def f(V, t):
+        return -V
+
+    def g(V, t):
+        return sigma
+
+    int_v = bp.sdeint(f=f, g=g, method='euler', dt=0.01)
+    bp.tools.set_seed(1)
+    V = np.zeros(2000)
+    for _ in range(500):
+        V = int_v(V, 0.)
+    # the stationary variance of the Ornstein-Uhlenbeck process
+    assert abs(V.var() - sigma ** 2 / 2) < 0.02
+    assert noise._BUFFERS
+
+    # reproducible after setting the seed, with the rest of the block discarded
+    bp.tools.set_seed(1)
+    V1 = int_v(np.zeros(10), 0.)
+    bp.tools.set_seed(1)
+    V2 = int_v(np.zeros(10), 0.)
+    assert np.all(V1 == V2)
+
+    # also buffered without the global seed
+    bp.tools.set_seed(None)
+    noise.clear_noise_buffer()
+    int_v(np.zeros(10), 0.)
+    assert noise._BUFFERS
+
+
+class _Noisy(bp.NeuGroup):
+    target_backend = ['numpy', 'numba']
+
+    def __init__(self, size, **kwargs):
+        self.V = np.zeros(size)
+        self.int_V = bp.sdeint(f=self.f, g=self.g, method='milstein')
+        super(_Noisy, self).__init__(size=size, **kwargs)
+
+    @staticmethod
+    def f(V, t):
+        dV = -V
+        return dV
+
+    @staticmethod
+    def g(V, t):
+        return 1.
+
+    def update(self, _t):
+        self.V = self.int_V(self.V, _t)
+
+
+def test_node_noise():
+    res = {}
+    for backend in ['numpy', 'numba']:
+        bp.backend.set(backend, dt=0.1)
+        bp.tools.set_seed(1)
+        node = _Noisy(1000, monitors=['V'])
+        node.run(50.)
+        # the steps draw from the buffer of the node, which is refilled in the compiled steps
+        assert isinstance(node.int_V_noise, noise.WienerBuffer)
+        assert node.int_V_noise.state[2] == 8
+        res[backend] = node.mon.V
+    assert np.allclose(res['numpy'], res['numba'])
+    bp.tools.set_seed(None)
+    bp.backend.set('numpy')
+
+
+def test_array_scale():
+    bp.tools.set_seed(1)
+    try:
+        samples = noise.normal(0., np.ones(3), 3)
+        assert samples.shape == (3,)
+    finally:
+        bp.tools.set_seed(None)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+import brainpy as bp
+
+
+def dev_m(m, t, V):
+    alpha = 0.1 * (V + 40) / (1 - np.exp(-(V + 40) / 10))
+    beta = 4.0 * np.exp(-(V + 65) / 18)
+    dmdt = alpha * (1 - m) - beta * m
+    return dmdt
+
+
+def test_tabulate():
+    f = bp.integrators.tabulate(dev_m, tables={'V': (-100., 60., 0.01)})
+    assert len(f.table_errors) == 2
+    assert max(f.table_errors.values()) < 1e-5
+    V = np.linspace(-90., 50., 1001)
+    m = np.random.rand(1001)
+    assert np.allclose(f(m, 0., V), dev_m(m, 0., V), atol=1e-5)
+    # the removable singularity and the clamped values
+    assert np.isfinite(f(0.5, 0., -40.))
+    assert f(0.5, 0., -200.) == f(0.5, 0., -100.)
+
+    with pytest.raises(bp.errors.IntegratorError):
+        bp.integrators.tabulate(dev_m, tables={'x': (-100., 60., 0.01)})
+    with pytest.raises(bp.errors.IntegratorError):
+        bp.integrators.tabulate(dev_m, tables={'V': (60., -100., 0.01)})
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'numba'])
+def test_odeint_tables(backend):
+    bp.backend.set(backend, dt=0.01)
+    try:
+        int_m = bp.odeint(dev_m, method='exponential_euler')
+        int_m_tab = bp.odeint(dev_m, method='exponential_euler',
+                              tables={'V': (-100., 60., 0.01)})
+        assert len(int_m_tab.table_errors) == 2
+        V = np.linspace(-90., 50., 100)
+        m1 = m2 = np.full(100, 0.1)
+        for _ in range(100):
+            m1 = int_m(m1, 0., V)
+            m2 = int_m_tab(m2, 0., V)
+        assert np.allclose(m1, m2, atol=1e-5)
+    finally:
+        bp.backend.set('numpy')
+
+
+class _Channel(object):
+    def __init__(self):
+        self.int_m = bp.odeint(self.dev_m, method='exponential_euler',
+                               tables={'V': (-100., 60., 0.01)})
+
+    def dev_m(self, m, t, V):
+        alpha = 0.1 * (V + 40) / (1 - np.exp(-(V + 40) / 10))
+        beta = 4.0 * np.exp(-(V + 65) / 18)
+        dmdt = alpha * (1 - m) - beta * m
+        return dmdt
+
+
+def test_tables_of_methods():
+    bp.backend.set('numpy', dt=0.01)
+    f = bp.integrators.tabulate(_Channel().dev_m, tables={'V': (-100., 60., 0.01)})
+    assert len(f.table_errors) == 2
+    V = np.linspace(-90., 50., 11)
+    assert np.allclose(f(0.1, 0., V), dev_m(0.1, 0., V), atol=1e-5)
+    int_m = _Channel().int_m
+    assert np.allclose(int_m(0.1, 0., V), bp.odeint(dev_m, method='exponential_euler')(0.1, 0., V),
+                       atol=1e-5)
+
+
+def test_tables_cache():
+    bp.backend.set('numpy', dt=0.01)
+    int_m1 = bp.odeint(dev_m, method='exponential_euler', tables={'V': (-100., 60., 0.01)})
+    int_m2 = bp.odeint(dev_m, method='exponential_euler', tables={'V': (-100., 60., 0.01)})
+    int_m3 = bp.odeint(dev_m, method='exponential_euler', tables={'V': (-100., 60., 0.1)})
+    assert int_m1 is int_m2
+    assert int_m1 is not int_m3
+    assert int_m1.table_errors == int_m2.table_errors
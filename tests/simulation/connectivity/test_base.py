@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from brainpy.simulation.connectivity import base
+
+i = np.array([2, 0, 2, 1, 0])
+j = np.array([1, 1, 0, 2, 2])
+
+
+def test_pre2post():
+    pre2post = base.pre2post(i, j, 4)
+    assert len(pre2post) == 4
+    assert [list(p) for p in pre2post] == [[1, 2], [2], [1, 0], []]
+
+    indices, indptr = base.pre2post(i, j, 4, format='csr')
+    assert list(indices) == [1, 2, 2, 1, 0]
+    assert list(indptr) == [0, 2, 3, 5, 5]
+
+
+def test_post2pre():
+    post2pre = base.post2pre(i, j)
+    assert len(post2pre) == 3
+    assert [list(p) for p in post2pre] == [[2], [2, 0], [1, 0]]
+
+
+def test_pre2syn_and_post2syn():
+    syn_ids, indptr = base.pre2syn(i, 3, format='csr')
+    assert list(syn_ids) == [1, 4, 3, 0, 2]
+    assert list(indptr) == [0, 2, 3, 5]
+    assert [list(p) for p in base.post2syn(j, 3)] == [[2], [0, 1], [3, 4]]
+
+
+def test_slice():
+    pre_ids, post_ids, slicing = base.pre_slice(i, j, 3)
+    assert list(pre_ids) == [0, 0, 1, 2, 2]
+    assert list(post_ids) == [1, 2, 2, 1, 0]
+    assert slicing.tolist() == [[0, 2], [2, 3], [3, 5]]
+
+    pre_ids, post_ids, slicing = base.post_slice(i, j, 3)
+    assert list(post_ids) == [0, 1, 1, 2, 2]
+    assert slicing.tolist() == [[0, 1], [1, 3], [3, 5]]
+
+
+def test_ij2mat_size():
+    conn_mat = base.ij2mat(i, j)
+    assert conn_mat.shape == (3, 3)
+
+
+def test_sparse_connectivity():
+    w = np.arange(5.)
+    sparse = base.SparseConnectivity.from_ij(i, j, 3, 3, weights=w)
+    assert list(sparse.indptr) == [0, 2, 3, 5]
+    assert list(sparse.indices) == [1, 2, 2, 1, 0]
+    assert list(sparse.pre_ids) == [0, 0, 1, 2, 2]
+    assert list(sparse.weights) == [1., 4., 3., 0., 2.]
+    assert list(sparse.syn_order) == [1, 4, 3, 0, 2]
+
+    # CSC view visits the synapses by the post-synaptic neurons
+    col_indices, col_indptr, csc2csr = sparse.csc()
+    assert list(col_indptr) == [0, 1, 3, 5]
+    assert list(col_indices) == [2, 0, 2, 0, 1]
+    assert np.array_equal(sparse.indices[csc2csr], [0, 1, 1, 2, 2])
+    assert list(sparse.weights[sparse.syn_ids_of_post(1)]) == [1., 0.]
+    assert list(sparse.weights[sparse.syn_ids_of_pre(0)]) == [1., 4.]
+    assert np.array_equal(sparse.to_dense(), [[0., 1., 4.], [0., 0., 3.], [2., 0., 0.]])
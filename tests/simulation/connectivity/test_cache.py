@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import numpy as np
+
+import brainpy as bp
+
+
+def test_conn_cache(tmp_path):
+    bp.connect.set_conn_cache(str(tmp_path))
+    try:
+        conn1 = bp.connect.FixedProb(0.1, seed=1)(100, 200)
+        sparse1 = conn1.requires('sparse')
+        assert len(os.listdir(tmp_path)) == 1
+
+        conn2 = bp.connect.FixedProb(0.1, seed=1)(100, 200)
+        assert conn2._cache_key == conn1._cache_key
+        assert np.array_equal(conn1.pre_ids, conn2.pre_ids)
+        assert np.array_equal(conn1.post_ids, conn2.post_ids)
+        assert not conn2.pre_ids.flags.writeable  # memory-mapped
+        sparse2 = conn2.requires('sparse')
+        assert np.array_equal(sparse1.col_indptr, sparse2.col_indptr)
+
+        # different parameters or sizes
+        assert bp.connect.FixedProb(0.1, seed=2)(100, 200)._cache_key != conn1._cache_key
+        assert bp.connect.FixedProb(0.1, seed=1)(100, 100)._cache_key != conn1._cache_key
+        # un-seeded connectors are not cached
+        assert bp.connect.FixedProb(0.1)(100, 200)._cache_key is None
+        assert len(os.listdir(tmp_path)) == 3
+
+        # LRU eviction
+        bp.connect.set_conn_cache(str(tmp_path), max_size=1)
+        bp.connect.FixedProb(0.1, seed=3)(10, 10)
+        assert len(os.listdir(tmp_path)) == 0
+
+        bp.connect.clear_conn_cache()
+    finally:
+        bp.connect.set_conn_cache(None, max_size=2 ** 30)
+
+
+def test_conn_cache_disabled(tmp_path):
+    bp.connect.set_conn_cache(str(tmp_path))
+    try:
+        conn = bp.connect.FixedProb(0.1, seed=1)(50, 50)
+        assert conn._cache_key is not None
+        # the derived structures are not cached after disabling the cache
+        bp.connect.set_conn_cache(None)
+        sparse = conn.requires('sparse')
+        assert sparse.num_syn == len(conn.pre_ids)
+        # no temporary file is left
+        entry = os.path.join(str(tmp_path), conn._cache_key)
+        assert all(name.endswith(('.npy', '.json')) and '.tmp' not in name for name in os.listdir(entry))
+    finally:
+        bp.connect.set_conn_cache(None, max_size=2 ** 30)
+
+
+class _UserConn(bp.connect.FixedProb):
+    pass
+
+
+@bp.connect.cached_connector
+class _CachedUserConn(bp.connect.FixedProb):
+    pass
+
+
+def test_conn_cache_opt_in(tmp_path):
+    bp.connect.set_conn_cache(str(tmp_path))
+    try:
+        # the user-defined connectors are only cached by the decorator
+        assert _UserConn(0.1, seed=1)(50, 50)._cache_key is None
+        assert _CachedUserConn(0.1, seed=1)(50, 50)._cache_key is not None
+        assert bp.connect.GridEight()((5, 5))._cache_key is not None
+    finally:
+        bp.connect.set_conn_cache(None, max_size=2 ** 30)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from brainpy.simulation.connectivity import measurement
+
+
+def _dense_cluster_coefficient(conn_mat):
+    ccs = []
+    for node in range(conn_mat.shape[0]):
+        neighbors = [n for n in np.where(conn_mat[node])[0] if n != node]
+        k = len(neighbors)
+        if k < 2:
+            ccs.append(0.)
+            continue
+        triangles = sum(conn_mat[a, b] for a in neighbors for b in neighbors if a != b)
+        ccs.append(triangles / (k * (k - 1)))
+    return np.mean(ccs)
+
+
+def _dense_average_path_length(conn_mat):
+    num = conn_mat.shape[0]
+    # Floyd–Warshall
+    dist = np.where(conn_mat, 1., np.inf)
+    np.fill_diagonal(dist, 0.)
+    for k in range(num):
+        dist = np.minimum(dist, dist[:, k:k + 1] + dist[k:k + 1, :])
+    mask = np.isfinite(dist) & ~np.eye(num, dtype=bool)
+    return dist[mask].mean()
+
+
+def test_cluster_coefficient():
+    rng = np.random.RandomState(0)
+    for prob in [0.05, 0.2, 0.5]:
+        conn_mat = rng.random((60, 60)) < prob
+        res = measurement.cluster_coefficient(conn_mat)
+        assert np.isclose(res, _dense_cluster_coefficient(conn_mat))
+        i, j = np.where(conn_mat)
+        assert np.isclose(measurement.cluster_coefficient(i=i, j=j, num=60), res)
+
+
+def test_average_path_length():
+    rng = np.random.RandomState(1)
+    for prob in [0.03, 0.1]:
+        conn_mat = rng.random((50, 50)) < prob
+        res = measurement.average_path_length(conn_mat)
+        assert np.isclose(res, _dense_average_path_length(conn_mat))
+
+    # the sampled sources
+    ring = np.roll(np.eye(100, dtype=bool), 1, axis=1)
+    assert np.isclose(measurement.average_path_length(ring, num_sample=10, seed=0), 50.)
+
+
+def test_degree_distribution_and_reciprocity():
+    i = np.array([0, 0, 1, 2, 2, 3])
+    j = np.array([1, 2, 0, 0, 3, 3])
+    out_dist = measurement.degree_distribution(i=i, j=j, num=5, direction='out')
+    assert np.array_equal(out_dist, [1, 2, 2])
+    in_dist = measurement.degree_distribution(i=i, j=j, num=5, direction='in')
+    assert np.array_equal(in_dist, [1, 2, 2])
+    # 0<->1, 0<->2 are reciprocal; 2->3 is not; the self-loop is ignored
+    assert np.isclose(measurement.reciprocity(i=i, j=j), 4 / 5)
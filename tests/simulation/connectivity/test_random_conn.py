@@ -23,3 +23,162 @@ def test():
     conn = conn(pre_size=5, post_size=3)
 
     print(conn.requires('pre2post'))
+
+
+def test_fixed_prob_csr():
+    import numpy as np
+
+    conn = bp.connect.FixedProb(0.1, include_self=False, seed=123)(1000, 800)
+    pre_ids, post_ids = conn.requires('pre_ids', 'post_ids')
+    assert abs(len(pre_ids) - 1000 * 799 * 0.1) < 5 * np.sqrt(1000 * 799 * 0.1)
+    assert np.all(pre_ids != post_ids)
+    assert np.all(np.diff(pre_ids) >= 0)
+    assert post_ids.max() < 800
+
+    conn2 = bp.connect.FixedProb(0.1, include_self=False, seed=123)(1000, 800)
+    assert np.array_equal(conn2.pre_ids, pre_ids)
+    assert np.array_equal(conn2.post_ids, post_ids)
+
+    conn = bp.connect.FixedProb(1., include_self=False)(4, 4)
+    assert np.array_equal(conn.requires('conn_mat'), 1 - np.eye(4))
+
+
+def _brute_force_gaussian(size, sigma, w_min, periodic):
+    import numpy as np
+
+    h, w = size
+    ys, xs = np.divmod(np.arange(h * w), w)
+    dy = np.abs(ys[:, None] - ys[None, :])
+    dx = np.abs(xs[:, None] - xs[None, :])
+    if periodic:
+        dy = np.minimum(dy, h - dy)
+        dx = np.minimum(dx, w - dx)
+    weights = np.exp(-(dy ** 2 + dx ** 2) / (2 * sigma ** 2))
+    return np.where(weights > w_min, weights, 0.)
+
+
+def test_gaussian_weight_local():
+    import numpy as np
+
+    for periodic in [True, False]:
+        conn = bp.connect.GaussianWeight(sigma=1.5, w_max=1., normalize=False,
+                                         periodic_boundary=periodic)((8, 11), (8, 11))
+        conn_mat = np.zeros((88, 88))
+        conn_mat[conn.pre_ids, conn.post_ids] = conn.weights
+        assert np.allclose(conn_mat, _brute_force_gaussian((8, 11), 1.5, 0.01, periodic))
+
+    # cutoff
+    conn = bp.connect.GaussianWeight(sigma=1.5, w_max=1., normalize=False, cutoff=1.)((8, 11), (8, 11))
+    assert np.all(conn.weights >= np.exp(-1 / (2 * 1.5 ** 2)) - 1e-12)
+
+
+def test_gaussian_prob_local():
+    import numpy as np
+
+    # the default "p_min" truncates the Gaussian, and only the nearby neurons are visited
+    conn = bp.connect.GaussianProb(sigma=1.5, normalize=False, seed=1)
+    radius = conn._local_args((30, 30), (30, 30))[3]
+    assert np.isfinite(radius) and radius < 10.
+    conn = conn((30, 30), (30, 30))
+    dist2 = (conn.pre_ids // 30 - conn.post_ids // 30) ** 2 + (conn.pre_ids % 30 - conn.post_ids % 30) ** 2
+    assert np.all(dist2 <= radius ** 2)
+    # the whole Gaussian
+    conn = bp.connect.GaussianProb(sigma=1.5, p_min=0., normalize=False, seed=1)
+    assert np.isinf(conn._local_args((30, 30), (30, 30))[3])
+
+
+def test_graph_generators():
+    import numpy as np
+
+    n = 200
+    for directed in [False, True]:
+        for conn in [bp.connect.SmallWorld(num_neighbor=4, prob=0.3, directed=directed, seed=1),
+                     bp.connect.ScaleFreeBA(m=3, directed=directed, seed=1),
+                     bp.connect.ScaleFreeBADual(m1=2, m2=4, p=0.5, directed=directed, seed=1),
+                     bp.connect.PowerLaw(m=3, p=0.5, directed=directed, seed=1)]:
+            conn = conn(n, n)
+            keys = conn.pre_ids * n + conn.post_ids
+            assert np.all(np.diff(keys) > 0)  # sorted and without multiple edges
+            assert np.all(conn.pre_ids != conn.post_ids)
+            if not directed:
+                assert np.array_equal(np.sort(conn.post_ids * n + conn.pre_ids), keys)
+
+    conn = bp.connect.ScaleFreeBA(m=3, seed=1)(n, n)
+    assert len(conn.pre_ids) == 2 * 3 * (n - 3)
+    conn = bp.connect.SmallWorld(num_neighbor=4, prob=0.3, seed=1)(n, n)
+    assert len(conn.pre_ids) == 4 * n
+
+
+def test_row_streams():
+    import numpy as np
+    from brainpy import tools
+    from brainpy.simulation.connectivity import random_conn
+
+    # each row only depends on "(seed, row)", so the rows can be
+    # generated independently and in any order
+    conn = bp.connect.FixedProb(0.05, include_self=False, seed=7)(300, 400)
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(conn.pre_ids, minlength=300))])
+    buffer = np.empty(400, dtype=np.int64)
+    for i in reversed(range(300)):
+        key = np.uint64(tools.rng_key(7, i))
+        n = random_conn._fixed_prob_row(key, i, 400, 0.05, False, buffer, 0, True)
+        assert np.array_equal(buffer[:n], conn.post_ids[indptr[i]: indptr[i + 1]])
+
+    # the same probability matrix for the "vector" and "matrix" methods
+    conn1 = bp.connect.FixedProb(0.2, seed=3, method='vector')(50, 60)
+    conn2 = bp.connect.FixedProb(0.2, seed=3, method='matrix')(50, 60)
+    assert np.array_equal(conn1.post_ids, conn2.post_ids)
+    assert np.array_equal(np.where(conn2.conn_mat)[1], conn2.post_ids)
+
+
+def test_fixed_num():
+    import numpy as np
+
+    for num in [5, 150]:
+        conn = bp.connect.FixedPostNum(num, include_self=False, seed=2)(200, 200)
+        post_ids = conn.post_ids.reshape((200, num))
+        assert np.all(np.diff(post_ids, axis=1) > 0)
+        assert np.all(post_ids != np.arange(200)[:, None])
+
+        conn = bp.connect.FixedPreNum(num, include_self=False, seed=2)(200, 300)
+        assert np.all(np.bincount(conn.post_ids, minlength=300) == num)
+        assert np.all(np.diff(conn.pre_ids * 300 + conn.post_ids) > 0)
+        assert np.all(conn.pre_ids != conn.post_ids)
+
+    # uniform choices
+    conn = bp.connect.FixedPostNum(3, seed=1)(20000, 10)
+    assert np.allclose(np.bincount(conn.post_ids) / 20000, 0.3, atol=0.02)
+
+
+def test_procedural():
+    import numpy as np
+
+    for conn in [bp.connect.FixedProb(0.05, include_self=False, seed=3),
+                 bp.connect.FixedProb(0.05, seed=3, method='vector'),
+                 bp.connect.GaussianProb(sigma=2., p_min=0.01, normalize=False, seed=3)]:
+        conn = conn((20, 15), (20, 15))
+        procedural = conn.requires('procedural')
+
+        # the same connections as the stored ones
+        sparse = procedural.to_sparse()
+        assert np.array_equal(sparse.pre_ids, conn.pre_ids)
+        assert np.array_equal(sparse.post_ids, conn.post_ids)
+
+        spikes = np.random.rand(300) < 0.3
+        g = np.zeros(300)
+        procedural.propagate(spikes, 0.5, g)
+        assert np.allclose(g, 0.5 * spikes @ conn.requires('conn_mat'))
+
+        # the derived weights are the same at every call
+        g1, g2 = np.zeros(300), np.zeros(300)
+        procedural.propagate_uniform(spikes, 1., 2., g1)
+        procedural.propagate_uniform(spikes, 1., 2., g2)
+        assert np.array_equal(g1, g2)
+        assert np.all((g1 >= g) & (g1 <= 4 * g))
+
+    # nothing is stored
+    conn = bp.connect.FixedProb(0.05, seed=3, store=False)(300, 300)
+    assert conn.pre_ids is None
+    sparse = conn.requires('procedural').to_sparse()
+    conn2 = bp.connect.FixedProb(0.05, seed=3)(300, 300)
+    assert np.array_equal(sparse.post_ids, conn2.post_ids)
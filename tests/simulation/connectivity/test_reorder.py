@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+import brainpy as bp
+
+
+def test_rcm_order():
+    num = 1000
+    rng = np.random.RandomState(0)
+    i = np.repeat(np.arange(num), 6)
+    j = (i + rng.randint(-10, 11, len(i))) % num
+    perm = rng.permutation(num)
+    i, j = perm[i], perm[j]
+
+    order = bp.connect.rcm_order(i, j, num)
+    assert np.array_equal(np.sort(order), np.arange(num))
+    rank = np.argsort(order)
+    assert np.abs(rank[i] - rank[j]).max() < 50
+
+    pre_order, post_order = bp.connect.rcm_order(i, j, num, num)
+    assert np.array_equal(np.sort(pre_order), np.arange(num))
+    assert np.array_equal(np.sort(post_order), np.arange(num))
+
+
+def test_hilbert_order():
+    order = bp.connect.hilbert_order((8, 8))
+    y, x = np.divmod(order, 8)
+    assert np.all(np.abs(np.diff(y)) + np.abs(np.diff(x)) == 1)
+    assert np.array_equal(bp.connect.hilbert_order(10), np.arange(10))
+
+
+def test_connector_reorder():
+    conn = bp.connect.FixedProb(0.02, seed=1)(300, 300)
+    conn_mat = conn.requires('conn_mat').copy()
+    conn.reorder('rcm')
+    assert conn.requires('pre2post') is not None
+    new_mat = conn.requires('conn_mat')
+    assert np.array_equal(new_mat, conn_mat[np.ix_(conn.pre_order, conn.post_order)])
+    keys = conn.pre_ids * 300 + conn.post_ids
+    assert np.all(np.diff(keys) > 0)
+
+    # the same propagation in the user ordering
+    spikes = np.random.rand(300) < 0.2
+    g = conn.from_user(spikes, side='pre') @ new_mat
+    assert np.allclose(conn.to_user(g), spikes @ conn_mat)
+
+    # the weights follow the synapses
+    conn = bp.connect.GaussianWeight(1.5, 1., normalize=False)((10, 12), (10, 12))
+    weights = conn.requires('conn_mat').copy()
+    weights[conn.pre_ids, conn.post_ids] = conn.weights
+    conn.reorder('hilbert')
+    order = conn.pre_order
+    new_weights = np.zeros((120, 120))
+    new_weights[conn.pre_ids, conn.post_ids] = conn.weights
+    assert np.allclose(new_weights, weights[np.ix_(order, order)])
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+import brainpy as bp
+from brainpy.simulation.delays import EventDelay
+
+
+class IndexConn(bp.connect.Connector):
+    def __init__(self, i, j):
+        super(IndexConn, self).__init__()
+        self.pre_ids = bp.ops.as_tensor(i)
+        self.post_ids = bp.ops.as_tensor(j)
+
+    def __call__(self, pre_size, post_size):
+        self.num_pre = bp.size2len(pre_size)
+        self.num_post = bp.size2len(post_size)
+        return self
+
+
+class Spiker(bp.NeuGroup):
+    target_backend = ['numpy', 'numba']
+
+    def __init__(self, size, period, **kwargs):
+        self.period = period
+        self.spike = bp.ops.zeros(size)
+        self.input = bp.ops.zeros(size)
+        super(Spiker, self).__init__(size=size, **kwargs)
+
+    def update(self, _i):
+        for i in range(self.num):
+            if _i % self.period[i] == 0:
+                self.spike[i] = 1.
+            else:
+                self.spike[i] = 0.
+
+
+class Receiver(bp.NeuGroup):
+    target_backend = ['numpy', 'numba']
+
+    def __init__(self, size, **kwargs):
+        self.input = bp.ops.zeros(size)
+        self.received = bp.ops.zeros(size)
+        super(Receiver, self).__init__(size=size, **kwargs)
+
+    def update(self, _t):
+        for i in range(self.num):
+            self.received[i] = self.input[i]
+            self.input[i] = 0.
+
+
+class DelayedSyn(bp.TwoEndConn):
+    target_backend = ['numpy', 'numba']
+
+    def __init__(self, pre, post, conn, delay, capacity=None, **kwargs):
+        self.conn = conn(pre.size, post.size)
+        self.post_ids = self.conn.requires('post_ids')
+        self.delay = self.register_event_delay('spk', self.conn, delay_time=delay, capacity=capacity)
+        super(DelayedSyn, self).__init__(pre=pre, post=post, **kwargs)
+
+    def update(self, _t):
+        self.delay.push(self.pre.spike)
+        for syn_id in self.delay.pull():
+            self.post.input[self.post_ids[syn_id]] += 1.
+
+
+def _expected(period, i, j, delay_step, num_post, num_step):
+    res = np.zeros((num_step, num_post))
+    for step in range(num_step):
+        for s in range(len(i)):
+            sent = step - delay_step[s]
+            if sent >= 0 and sent % period[i[s]] == 0:
+                res[step, j[s]] += 1.
+    return res
+
+
+def test_event_delay_kernel():
+    bp.backend.set('numpy', dt=0.1)
+    pre_ids = np.array([0, 0, 1, 2, 2, 2])
+    delay = EventDelay(pre_ids, num_pre=3, delay_time=np.array([0., 0.1, 0.2, 0.3, 0.1, 0.]))
+    assert delay.num_bucket == 4
+    delay.push(np.array([1., 0., 1.]))
+    assert sorted(delay.pull().tolist()) == [0, 5]
+    delay.update()
+    assert sorted(delay.pull().tolist()) == [1, 4]
+    delay.update()
+    assert delay.pull().tolist() == []
+    delay.update()
+    assert delay.pull().tolist() == [3]
+    delay.update()
+    assert delay.pull().tolist() == []
+
+
+def _run_network(backend, capacity=None):
+    bp.backend.set(backend, dt=0.1)
+    rng = np.random.RandomState(123)
+    i = rng.randint(0, 5, 40)
+    j = rng.randint(0, 4, 40)
+    delay_time = rng.randint(0, 8, 40) * 0.1
+    period = np.array([2, 3, 5, 7, 1])
+
+    pre = Spiker(5, period=period)
+    post = Receiver(4, monitors=['received'])
+    syn = DelayedSyn(pre, post, conn=IndexConn(i, j), delay=delay_time, capacity=capacity)
+    net = bp.Network(pre, syn, post)
+    net.run(3.)
+    expected = _expected(period, i, j, np.round(delay_time / 0.1).astype(int), 4, 30)
+    return post.mon.received, expected, syn.delay
+
+
+def test_event_delay_numpy():
+    res, expected, _ = _run_network('numpy')
+    assert np.allclose(res, expected)
+
+
+def test_event_delay_numba():
+    res, expected, delay = _run_network('numba')
+    assert np.allclose(res, expected)
+    assert delay.capacity < delay.num
+    bp.backend.set('numpy')
+
+
+def test_event_delay_overflow():
+    # the overflowed events are pushed after the compiled steps
+    for backend in ['numpy', 'numba']:
+        res, expected, delay = _run_network(backend, capacity=1)
+        assert np.allclose(res, expected)
+        assert 1 < delay.capacity < delay.num
+    bp.backend.set('numpy')
+
+
+def test_event_delay_grow():
+    bp.backend.set('numpy', dt=0.1)
+    pre_ids = np.repeat(np.arange(10), 20)
+    delay = EventDelay(pre_ids, num_pre=10, delay_time=np.tile(np.arange(20) * 0.1, 10))
+    assert delay.capacity < delay.num
+    # all the synapses receive the events at the same step
+    spike = np.ones(10)
+    for _ in range(19):
+        delay.push(spike)
+        delay.update()
+    delay.push(spike)
+    assert delay.capacity == delay.num
+    assert sorted(delay.pull().tolist()) == list(range(delay.num))
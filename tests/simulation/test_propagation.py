@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+import brainpy as bp
+from brainpy.simulation import propagation
+
+
+def test_sparse_mv():
+    conn = bp.connect.GaussianWeight(sigma=2., w_max=1., normalize=False)((10, 12), (10, 12))
+    sparse_mat = conn.requires('sparse_mat')
+    weights = sparse_mat.toarray()
+    assert sparse_mat.shape == (120, 120)
+    assert np.allclose(weights[conn.pre_ids, conn.post_ids], conn.weights)
+
+    csc = sparse_mat.tocsc()
+    spike = np.random.rand(120) < 0.2
+    rate = np.random.rand(120)
+    for kernel, mat, x in [(propagation.csr_spike_mv, sparse_mat, spike),
+                           (propagation.csr_rate_mv, sparse_mat, rate),
+                           (propagation.csc_spike_mv, csc, spike),
+                           (propagation.csc_rate_mv, csc, rate)]:
+        target = np.ones(120)
+        kernel(mat.indptr, mat.indices, mat.data, x, target)
+        assert np.allclose(target, 1. + x @ weights)
+
+    # the connection without weights
+    conn = bp.connect.FixedProb(0.1, seed=1)(50, 60)
+    assert np.array_equal(conn.requires('sparse_mat').toarray(), conn.requires('conn_mat'))
+
+
+def test_event_kernels():
+    conn = bp.connect.FixedProb(0.1, seed=1)(300, 400)
+    sparse = conn.requires('sparse')
+    conn_mat = conn.requires('conn_mat')
+    weights = np.random.rand(sparse.num_syn)
+    weight_mat = np.zeros((300, 400))
+    weight_mat[sparse.pre_ids, sparse.indices] = weights
+
+    spike = np.random.rand(300) < 0.2
+    ids = propagation.spike_ids(spike)
+    assert np.array_equal(ids, np.where(spike)[0])
+
+    for kernel, w, expected in [(propagation.event_homo, 0.5, 0.5 * spike @ conn_mat),
+                                (propagation.event_heter, weights, spike @ weight_mat)]:
+        target = np.zeros(400)
+        kernel(ids, sparse.indptr, sparse.indices, w, target)
+        assert np.allclose(target, expected)
+
+    for kernel, w, expected in [(propagation.event_homo_parallel, 0.5, 0.5 * spike @ conn_mat),
+                                (propagation.event_heter_parallel, weights, spike @ weight_mat)]:
+        for num_part in [1, 3, 7]:
+            target = np.zeros(400)
+            kernel(ids, sparse.indptr, sparse.indices, w, target, num_part)
+            assert np.allclose(target, expected)
+
+
+def test_delayed_event_kernels():
+    conn = bp.connect.FixedProb(0.1, seed=1)(30, 40)
+    pre_ids, post_ids = conn.requires('pre_ids', 'post_ids')
+    delay_time = np.random.randint(0, 5, len(pre_ids)) * bp.backend.get_dt()
+    weights = np.random.rand(len(pre_ids))
+    delay = bp.simulation.EventDelay(pre_ids, 30, delay_time)
+
+    spikes = np.random.rand(10, 30) < 0.2
+    targets = np.zeros((10, 40))
+    for t in range(10):
+        delay.push(spikes[t])
+        propagation.delayed_event_heter(delay.pull(), post_ids, weights, targets[t])
+        delay.update()
+
+    # the reference
+    expected = np.zeros((10, 40))
+    steps = np.asarray(np.round(delay_time / bp.backend.get_dt()), dtype=int)
+    for t in range(10):
+        for s in np.where(spikes[t][pre_ids])[0]:
+            if t + steps[s] < 10:
+                expected[t + steps[s], post_ids[s]] += weights[s]
+    assert np.allclose(targets, expected)
+
+
+def test_adaptive_propagation():
+    conn = bp.connect.FixedProb(0.1, seed=1)(300, 400)
+    sparse = conn.requires('sparse')
+    conn_mat = np.zeros((300, 400))
+    conn_mat[sparse.pre_ids, sparse.indices] = 1.
+    weights = np.random.rand(sparse.num_syn)
+    weight_mat = np.zeros((300, 400))
+    weight_mat[sparse.pre_ids, sparse.indices] = weights
+
+    prop = propagation.AdaptivePropagation(sparse, weights)
+    assert 0 < prop.threshold <= 301
+    for threshold in [0, 301, prop.threshold]:
+        homo = propagation.AdaptivePropagation(sparse, 0.5, threshold=threshold)
+        heter = propagation.AdaptivePropagation(sparse, weights, threshold=threshold)
+        for fraction in [0.01, 0.5, 1.]:
+            spike = np.random.rand(300) < fraction
+            target = np.zeros(400)
+            homo.update(spike, target)
+            assert np.allclose(target, 0.5 * spike @ conn_mat)
+            target = np.zeros(400)
+            heter.update(spike, target)
+            assert np.allclose(target, spike @ weight_mat)
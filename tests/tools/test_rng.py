@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+import brainpy as bp
+from brainpy import tools
+
+
+def test_stream_key():
+    assert tools.stream_key('NG1', 'spike', seed=1) == tools.stream_key('NG1', 'spike', seed=1)
+    assert tools.stream_key('NG1', 'spike', seed=1) != tools.stream_key('NG2', 'spike', seed=1)
+    assert tools.stream_key('NG1', 'spike', seed=1) != tools.stream_key('NG1', 'noise', seed=1)
+    assert tools.stream_key('NG1', 'spike', seed=1) != tools.stream_key('NG1', 'spike', seed=2)
+
+
+def test_random_stream():
+    stream = tools.RandomStream('NG1', 'noise', seed=1)
+    samples = stream.normal(1., 2., (200, 100))
+    assert abs(samples.mean() - 1.) < 0.05 and abs(samples.std() - 2.) < 0.05
+    uniforms = stream.uniform(size=10000)
+    assert 0. <= uniforms.min() and uniforms.max() < 1.
+
+    # the numbers only depend on the stream, not on the interleaving of the streams
+    s1 = tools.RandomStream('NG1', 'noise', seed=1)
+    s2 = tools.RandomStream('NG2', 'noise', seed=1)
+    serial = [s1.normal(size=5) for _ in range(3)] + [s2.normal(size=5) for _ in range(3)]
+    s1 = tools.RandomStream('NG1', 'noise', seed=1)
+    s2 = tools.RandomStream('NG2', 'noise', seed=1)
+    fused = []
+    for _ in range(3):
+        fused.append((s1.normal(size=5), s2.normal(size=5)))
+    assert np.all(np.array(serial[:3]) == np.array([a for a, _ in fused]))
+    assert np.all(np.array(serial[3:]) == np.array([b for _, b in fused]))
+
+
+def test_stream_in_jit():
+    @tools.numba_jit
+    def draw(key, counter, num):
+        return tools.stream_uniforms(key, counter, num), tools.stream_normals(key, counter, num)
+
+    s1 = tools.RandomStream('NG1', 'spike', seed=1)
+    s2 = tools.RandomStream('NG1', 'spike', seed=1)
+    uniforms, normals = draw(s1.key, s1.counter, 9)
+    assert np.all(uniforms == s2.uniform(size=9))
+    assert np.all(normals == s2.normal(size=9))
+    assert s1.counter[0] == s2.counter[0] == 28
+
+
+def test_global_seed():
+    bp.backend.set('numpy')
+    tools.set_seed(1)
+    a = bp.ops.normal(0., 1., 10)
+    tools.set_seed(1)
+    b = bp.ops.normal(0., 1., 10)
+    assert np.all(a == b)
+    tools.set_seed(None)
+
+
+class _Noisy(bp.NeuGroup):
+    target_backend = ['numpy', 'numba']
+
+    def __init__(self, size, **kwargs):
+        self.V = np.zeros(size)
+        self.int_V = bp.sdeint(f=self.f, g=self.g, method='euler')
+        super(_Noisy, self).__init__(size=size, **kwargs)
+
+    @staticmethod
+    def f(V, t):
+        dV = -V
+        return dV
+
+    @staticmethod
+    def g(V, t):
+        return 1.
+
+    def update(self, _t):
+        self.V = self.int_V(self.V, _t) + 0.1 * tools.stream_normals(self.rng_key, self.rng_counter, self.num)
+
+
+class _Other(_Noisy):
+    pass
+
+
+def test_node_streams():
+    bp.backend.set('numpy', dt=0.1)
+    tools.set_seed(1)
+    p1 = bp.inputs.PoissonInput(100, freqs=200., monitors=['spike'])
+    n1 = _Noisy(10, monitors=['V'])
+    bp.Network(p1, n1).run(10.)
+
+    # the other kinds of nodes created and run before do not change the random numbers
+    tools.set_seed(1)
+    _Other(10).run(10.)
+    bp.inputs.SpikeTimeInput(2, times=[1., 2.], indices=[0, 1])
+    p2 = bp.inputs.PoissonInput(100, freqs=200., monitors=['spike'])
+    n2 = _Noisy(10, monitors=['V'])
+    bp.Network(n2, p2).run(10.)
+    assert np.any(p1.mon.spike)
+    assert np.all(p1.mon.spike == p2.mon.spike)
+    assert np.all(n1.mon.V == n2.mon.V)
+    tools.set_seed(None)
+
+
+def _run_streams(backend):
+    bp.backend.set(backend, dt=0.1)
+    tools.set_seed(1)
+    p = bp.inputs.PoissonInput(100, freqs=200., monitors=['spike'])
+    n = _Noisy(10, monitors=['V'])
+    bp.Network(p, n).run(10.)
+    tools.set_seed(None)
+    return p.mon.spike, n.mon.V
+
+
+def test_node_streams_numba():
+    # the compiled steps draw from the same streams of the nodes
+    spike1, V1 = _run_streams('numpy')
+    spike2, V2 = _run_streams('numba')
+    bp.backend.set('numpy')
+    assert np.any(spike1)
+    assert np.all(spike1 == spike2)
+    assert np.allclose(V1, V2)